@@ -0,0 +1,163 @@
+# benchmarks/announce_latency.py
+# Replays recorded YouTube API / Discord HTTP exchanges (benchmarks/fixtures/*.json, see
+# utils/replay.py for recording) against YouTubeMonitor, MessageManagement and RoleButton on
+# a virtual clock, with no network access. Reports end-to-end latency per scenario (stream
+# went live -> announcement sent, announcement due -> sent, button click -> role changed)
+# and the API calls and YouTube quota it took. Runs are deterministic, so --max-latency can
+# gate CI on latency regressions.
+#
+#   python -m benchmarks.announce_latency [fixtures...] [--phases 10] [--max-latency 600]
+#
+# --phases replays the YouTube scenario with the first poll spread evenly over one check
+# interval, since when the stream goes live relative to the poll decides the latency.
+import argparse
+import asyncio
+import glob
+import os
+import statistics
+import sys
+import tempfile
+from dataclasses import replace
+
+import cogs.youtube_monitor
+from cogs.message_management import MessageManagement
+from cogs.role_buttons import RoleButton, RoleMenuEntry
+from cogs.youtube_monitor import YouTubeMonitor
+from config import BotConfig
+from utils.http_client import HTTPClient
+from utils.member_cache import MemberLRU
+from utils.quota import YouTubeKeyPool
+from utils.replay import (ReplayBot, ReplayDiscord, ReplayGoogleService, ReplayGuild, ReplayInteraction,
+                          ReplayLog, ReplayMember, ReplayRole, ReplayTextChannel, VirtualClock, load_fixture)
+from utils.resilience import Resilience
+from utils.role_queue import RoleToggleQueue
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+class Result:
+    def __init__(self, latencies: list, replay_log: ReplayLog, quota_units: int):
+        self.latencies = latencies # Seconds, one per announcement/click; None if it never happened
+        self.calls = replay_log.counts()
+        self.quota_units = quota_units
+
+def make_bot(fixture: dict, clock: VirtualClock, replay_log: ReplayLog):
+    config = replace(BotConfig(), **fixture.get("config", {}))
+    discord_replay = ReplayDiscord(fixture["exchanges"], clock, replay_log)
+    resilience = Resilience.from_config(config)
+    youtube_keys = YouTubeKeyPool(
+        ["replay"], resilience, config.youtube_daily_quota,
+        client_factory=lambda api_key: ReplayGoogleService(fixture["exchanges"], "youtube", clock, replay_log)
+    )
+    bot = ReplayBot(config, youtube_keys=youtube_keys, member_cache=MemberLRU(config.member_cache_lru_size),
+                    resilience=resilience, http_client=HTTPClient.from_config(config))
+    bot.role_queue = RoleToggleQueue.from_config(config, bot.member_cache)
+    return bot, discord_replay
+
+async def youtube_live(fixture: dict, clock: VirtualClock, replay_log: ReplayLog, phase: float) -> Result:
+    bot, discord_replay = make_bot(fixture, clock, replay_log)
+    events = fixture["events"]
+    guild = ReplayGuild(events.get("guild_id", 1))
+    channel_id = bot.config.youtube_monitor_discord_channel_id
+    bot.channels[channel_id] = ReplayTextChannel(channel_id, guild, discord_replay)
+
+    cog = YouTubeMonitor(bot)
+
+    # Polls run the loop body on the check interval directly, tasks.Loop schedules on wall-clock time
+    interval = bot.config.youtube_monitor_check_interval_minutes * 60
+    next_poll = phase
+    while next_poll < events["duration"]:
+        await asyncio.sleep(next_poll - clock.elapsed())
+        await cog.monitor_loop.coro(cog)
+        next_poll += interval
+
+    sent = [call["done"] for call in replay_log.calls if call["method"] == "POST /channels/{channel_id}/messages"]
+    return Result([sent[0] - events["live_at"] if sent else None], replay_log, bot.youtube_keys.used)
+
+async def scheduled_announcement(fixture: dict, clock: VirtualClock, replay_log: ReplayLog, phase: float) -> Result:
+    bot, discord_replay = make_bot(fixture, clock, replay_log)
+    events = fixture["events"]
+    guild = ReplayGuild(events["guild_id"])
+    bot.channels[events["channel_id"]] = ReplayTextChannel(events["channel_id"], guild, discord_replay)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bot.config.announcement_db_path = os.path.join(tmp, "announcements.db")
+        cog = MessageManagement(bot)
+        due = clock.start + events["due_at"]
+        announcement_id = await cog.store.add(guild.id, events["channel_id"], 0, "Replay", None, "Replayed announcement",
+                                              None, None, None, due)
+        cog.scheduler.start()
+        cog.scheduler.schedule(announcement_id, due)
+        await asyncio.sleep(events["duration"])
+        await cog.cog_unload()
+
+    sent = [call["done"] for call in replay_log.calls if call["method"] == "POST /channels/{channel_id}/messages"]
+    return Result([sent[0] - events["due_at"] if sent else None], replay_log, bot.youtube_keys.used)
+
+async def role_toggle(fixture: dict, clock: VirtualClock, replay_log: ReplayLog, phase: float) -> Result:
+    bot, discord_replay = make_bot(fixture, clock, replay_log)
+    events = fixture["events"]
+    guild = ReplayGuild(events["guild_id"])
+    role = guild.roles[events["role_id"]] = ReplayRole(events["role_id"], events["role_name"])
+    button = RoleButton(RoleMenuEntry(role_id=role.id, label=role.name, menu_id="replay"))
+
+    clicked_at = {}
+    for click in sorted(events["clicks"], key=lambda c: c["at"]):
+        await asyncio.sleep(click["at"] - clock.elapsed())
+        member = guild.members[click["member_id"]] = ReplayMember(click["member_id"], guild, discord_replay)
+        clicked_at[member.id] = clock.elapsed()
+        await button.callback(ReplayInteraction(bot, guild, member))
+    await asyncio.sleep(events["duration"] - clock.elapsed())
+    await bot.role_queue.close()
+
+    changed = {call["member_id"]: call["done"] for call in replay_log.calls if call["service"] == "discord"}
+    latencies = [changed[member_id] - at if member_id in changed else None for member_id, at in clicked_at.items()]
+    return Result(latencies, replay_log, bot.youtube_keys.used)
+
+SCENARIOS = {
+    "youtube_live": youtube_live,
+    "scheduled_announcement": scheduled_announcement,
+    "role_toggle": role_toggle,
+}
+
+def run_fixture(path: str, phases: int) -> list:
+    fixture = load_fixture(path)
+    scenario = SCENARIOS[fixture["scenario"]]
+    runs = phases if fixture["scenario"] == "youtube_live" else 1
+    interval = replace(BotConfig(), **fixture.get("config", {})).youtube_monitor_check_interval_minutes * 60
+    results = []
+    for run in range(runs):
+        clock = VirtualClock(fixture["recorded_at"])
+        replay_log = ReplayLog(clock)
+        results.append(clock.run(scenario(fixture, clock, replay_log, interval * run / runs), cogs.youtube_monitor))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("fixtures", nargs="*", help="Fixture files (default: benchmarks/fixtures/*.json)")
+    parser.add_argument("--phases", type=int, default=10)
+    parser.add_argument("--max-latency", type=float, help="Fail when any scenario's worst latency is above this (seconds)")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.fixtures or sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.json"))):
+        results = run_fixture(path, args.phases)
+        latencies = [latency for result in results for latency in result.latencies]
+        missed = latencies.count(None)
+        measured = sorted(latency for latency in latencies if latency is not None)
+        name = os.path.splitext(os.path.basename(path))[0]
+        if measured:
+            print(f"{name}: {len(measured)} sent, latency p50 {statistics.median(measured):.2f}s "
+                  f"max {measured[-1]:.2f}s" + (f", {missed} never sent" if missed else ""))
+        else:
+            print(f"{name}: nothing sent")
+        calls = ", ".join(f"{call} x{count}" for call, count in sorted(results[0].calls.items()))
+        print(f"  calls per run: {calls or 'none'}; YouTube quota {results[0].quota_units} units")
+
+        if missed or (args.max_latency is not None and measured and measured[-1] > args.max_latency):
+            failed = True
+    if failed:
+        print("Latency budget exceeded or announcements missed!")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/calendar_sync.py
+# Runs CalendarSync against the in-memory fake Calendar API and reports how many events
+# each sync transfers: one full sync, then incremental syncs after a few edits, a
+# token expiry, and a check that the store matches the fake calendar after each step.
+#
+#   python -m benchmarks.calendar_sync [--events 5000] [--changes 20]
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from utils.calendar_store import CalendarStore
+from utils.calendar_sync import CalendarSync
+from utils.fake_calendar import FakeCalendarService
+
+CALENDAR_ID = "primary"
+
+def make_event(i: int, base: datetime) -> dict:
+    if i % 10 == 0:
+        day = (base + timedelta(days=i % 365)).date()
+        return {"summary": f"All-day {i}", "start": {"date": day.isoformat()},
+                "end": {"date": (day + timedelta(days=1)).isoformat()}}
+    start = base + timedelta(hours=i * 3)
+    return {"summary": f"Stream {i}", "location": "Twitch",
+            "start": {"dateTime": start.isoformat()}, "end": {"dateTime": (start + timedelta(hours=2)).isoformat()}}
+
+async def verify(store: CalendarStore, fake: FakeCalendarService):
+    stored = {e.id for e in await store.events_between(0, 1e12, CALENDAR_ID)}
+    live = {event_id for event_id, event in fake._events.items() if event["status"] != "cancelled"}
+    assert stored == live, f"store out of sync: {len(stored ^ live)} mismatched events"
+
+async def run(events: int, changes: int):
+    fake = FakeCalendarService()
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    ids = [fake.upsert(make_event(i, base))["id"] for i in range(events)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CalendarStore(os.path.join(tmp, "calendar.db"))
+        sync = CalendarSync(store, CALENDAR_ID, "America/Toronto", service_factory=lambda: fake)
+
+        async def step(label: str):
+            sent, requests = fake.items_sent, fake.requests
+            started = time.perf_counter()
+            result = await sync.sync()
+            elapsed = (time.perf_counter() - started) * 1000
+            await verify(store, fake)
+            print(f"{label:<24} {'full' if result.full else 'incr':<5} {fake.items_sent - sent:>7} events "
+                  f"{fake.requests - requests:>3} requests {elapsed:>8.1f} ms")
+
+        await step("initial")
+        await step("no changes")
+
+        rng = random.Random(0)
+        for n in rng.sample(range(events), changes):
+            fake.upsert({**make_event(n + 1, base), "id": ids[n], "summary": "Rescheduled"})
+        for n in rng.sample(range(events), changes // 2):
+            fake.delete(ids[n])
+        fake.upsert(make_event(events + 1, base))
+        await step(f"{changes} edits + deletes")
+
+        fake.expire_tokens()
+        await step("expired token")
+        store.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--changes", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.events, args.changes))
+
+if __name__ == "__main__":
+    main()
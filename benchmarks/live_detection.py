@@ -0,0 +1,146 @@
+# benchmarks/live_detection.py
+# Runs the Twitch and Kick live-status providers against the local stand-in server
+# (utils/fake_live_platforms.py) through the shared HTTP client, with no network access:
+# one polling round sequentially vs concurrently, per-platform rate limiting, Twitch token
+# refresh, and the monitor's "first platform to go live is announced" flow, checking that
+# every reported status matches the server's.
+#
+#   python -m benchmarks.live_detection [--channels 20] [--latency 0.05]
+import argparse
+import asyncio
+import time
+from dataclasses import replace
+
+import aiohttp
+
+from cogs.youtube_monitor import YouTubeMonitor
+from config import BotConfig
+from utils.fake_live_platforms import FakeLivePlatforms
+from utils.http_client import HTTPClient
+from utils.live_providers import KickProvider, RateLimiter, TwitchProvider
+from utils.quota import YouTubeKeyPool
+from utils.replay import ReplayBot, ReplayDiscord, ReplayGuild, ReplayLog, ReplayTextChannel, VirtualClock
+from utils.resilience import Resilience
+
+CHANNEL_ID = 111
+
+def twitch(fake: FakeLivePlatforms, channel: str, http, resilience, limiter=None) -> TwitchProvider:
+    return TwitchProvider(channel, f"https://www.twitch.tv/{channel}", http, resilience, "client-id", "client-secret",
+                          limiter, base_url=fake.twitch_api_url, auth_url=fake.twitch_auth_url)
+
+def kick(fake: FakeLivePlatforms, channel: str, http, resilience, limiter=None) -> KickProvider:
+    return KickProvider(channel, f"https://kick.com/{channel}", http, resilience, limiter, base_url=fake.kick_api_url)
+
+async def polling(fake: FakeLivePlatforms, http: HTTPClient, channels: int):
+    resilience = Resilience()
+    # Generous caps here, the rate limit run below checks pacing on its own
+    limiters = {"Twitch": RateLimiter(6000), "Kick": RateLimiter(6000)}
+    providers = [twitch(fake, f"streamer{i}", http, resilience, limiters["Twitch"]) for i in range(channels)]
+    providers += [kick(fake, f"streamer{i}", http, resilience, limiters["Kick"]) for i in range(channels)]
+    for i in range(0, channels, 2):
+        fake.go_live("Twitch", f"streamer{i}")
+        fake.go_live("Kick", f"streamer{i + 1}")
+    await providers[0]._access_token() # Token fetch isn't part of a round
+
+    started = time.perf_counter()
+    for provider in providers:
+        await provider.check()
+    sequential = time.perf_counter() - started
+
+    requests_before = sum(fake.requests.values())
+    started = time.perf_counter()
+    statuses = await asyncio.gather(*(provider.check() for provider in providers))
+    concurrent = time.perf_counter() - started
+
+    for provider, status in zip(providers, statuses):
+        expected = fake.streams.get((provider.platform, provider.channel))
+        assert (status is not None) == (expected is not None), f"{provider.platform}/{provider.channel} status mismatch"
+        assert status is None or status.stream_id == expected["id"]
+    live = sum(status is not None for status in statuses)
+    print(f"polling: {len(providers)} channels ({live} live), round {sequential * 1000:.0f}ms sequential, "
+          f"{concurrent * 1000:.0f}ms concurrent; {sum(fake.requests.values()) - requests_before} requests per round")
+
+async def rate_limit(fake: FakeLivePlatforms, http: HTTPClient, per_minute: float, calls: int):
+    provider = kick(fake, "paced", http, Resilience(), RateLimiter(per_minute))
+    started = time.perf_counter()
+    await asyncio.gather(*(provider.check() for _ in range(calls)))
+    elapsed = time.perf_counter() - started
+    floor = (calls - 1) * 60 / per_minute
+    assert elapsed >= floor * 0.95, f"{calls} calls took {elapsed:.2f}s, under the {floor:.2f}s the limit allows"
+    print(f"rate limit: {calls} concurrent checks at {per_minute:.0f}/min took {elapsed:.2f}s (at least {floor:.2f}s)")
+
+async def token_refresh(fake: FakeLivePlatforms, http: HTTPClient):
+    provider = twitch(fake, "tokens", http, Resilience())
+    fake.go_live("Twitch", "tokens")
+    assert await provider.check() is not None
+    fake.expire_tokens()
+    try:
+        await provider.check()
+        raise AssertionError("A revoked token was accepted")
+    except aiohttp.ClientResponseError as e:
+        assert e.status == 401
+    assert await provider.check() is not None, "No new token fetched after a 401"
+    print("token refresh: 401 on a revoked token, recovered on the next check")
+
+async def first_platform_wins(fake: FakeLivePlatforms, http: HTTPClient):
+    """Kick goes live first, then Twitch: one announcement for Kick, edited to add Twitch."""
+    config = replace(BotConfig(), youtube_monitor_enabled=True, youtube_monitor_discord_channel_id=CHANNEL_ID,
+                     youtube_monitor_platform_links={"Twitch": "https://www.twitch.tv/both", "Kick": "https://kick.com/both",
+                                                     "TikTok": "https://www.tiktok.com/@both/live"})
+    clock = VirtualClock(time.time()) # Only timestamps the replay log, this run is on real time
+    replay_log = ReplayLog(clock)
+    discord_replay = ReplayDiscord([
+        {"service": "discord", "method": "POST", "path": "/channels/{channel_id}/messages", "latency": 0.0,
+         "status": 200, "response": {"id": "1"}},
+        {"service": "discord", "method": "PATCH", "path": "/channels/{channel_id}/messages/{message_id}", "latency": 0.0,
+         "status": 200, "response": {"id": "1"}},
+    ], clock, replay_log)
+    resilience = Resilience.from_config(config)
+    bot = ReplayBot(config, http_client=http, resilience=resilience, youtube_keys=YouTubeKeyPool([], resilience))
+    bot.channels[CHANNEL_ID] = ReplayTextChannel(CHANNEL_ID, ReplayGuild(1), discord_replay)
+    cog = YouTubeMonitor(bot)
+    cog.providers = [twitch(fake, "both", http, resilience), kick(fake, "both", http, resilience)]
+
+    async def poll():
+        await cog.monitor_loop.coro(cog)
+        return [call["method"].split()[0] for call in replay_log.calls]
+
+    assert await poll() == [] # Baseline, nothing live
+    fake.go_live("Kick", "both")
+    assert await poll() == ["POST"], "Kick going live wasn't announced"
+    assert "kick.com" in cog.announcement.content and "twitch.tv" not in cog.announcement.content
+    fake.go_live("Twitch", "both")
+    assert await poll() == ["POST", "PATCH"], "Twitch going live second should edit, not announce"
+    assert "twitch.tv" in cog.announcement.content
+    fake.go_offline("Kick", "both")
+    fake.go_offline("Twitch", "both")
+    await poll()
+    fake.go_live("Twitch", "both")
+    calls = await poll()
+    assert calls[-1] == "POST" and calls.count("POST") == 2, "A new session wasn't announced"
+    print(f"first platform wins: {calls.count('POST')} announcements, {calls.count('PATCH')} edits "
+          f"(Kick first, Twitch added then removed, then a new Twitch-only session)")
+
+async def run(channels: int, latency: float):
+    async with FakeLivePlatforms(latency=latency) as fake:
+        http = HTTPClient()
+        try:
+            await polling(fake, http, channels)
+            await rate_limit(fake, http, per_minute=120, calls=5)
+            await token_refresh(fake, http)
+            await first_platform_wins(fake, http)
+            stats = http.stats()
+            print(f"http: {stats['requests']} requests on {stats['connections_created']} connections "
+                  f"({stats['connections_reused']} reused); served Twitch {fake.requests['Twitch']}, Kick {fake.requests['Kick']}")
+        finally:
+            await http.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=20, help="Channels per platform in the polling round")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the stand-in server adds to each response")
+    args = parser.parse_args()
+    asyncio.run(run(args.channels, args.latency))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/member_cache_startup.py
+# Compares startup member processing time and RSS for the "full" and "lru" member cache
+# modes on a synthetic large guild. Each mode runs in its own subprocess so RSS is isolated.
+#
+#   python -m benchmarks.member_cache_startup [--members 200000] [--active 2000]
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+import discord
+from discord.state import ChunkRequest, ConnectionState
+
+from utils.member_cache import MemberLRU
+
+GUILD_ID = 1
+CHUNK_SIZE = 1000 # Members per GUILD_MEMBERS_CHUNK, same as the gateway
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * 4096 / 1e6
+
+def member_payload(i: int) -> dict:
+    return {
+        "user": {"id": str(10_000 + i), "username": f"viewer{i}", "discriminator": "0",
+                 "global_name": None, "avatar": None},
+        "roles": [str(500 + i % 3)] if i % 4 == 0 else [],
+        "joined_at": "2024-01-01T00:00:00+00:00",
+        "deaf": False, "mute": False, "flags": 0,
+    }
+
+def make_state(mode: str) -> ConnectionState:
+    intents = discord.Intents.default()
+    intents.members = True
+    flags = discord.MemberCacheFlags.none() if mode == "lru" else discord.MemberCacheFlags.from_intents(intents)
+    return ConnectionState(
+        dispatch=lambda *args, **kwargs: None, handlers={}, hooks={}, http=None,
+        intents=intents, member_cache_flags=flags, chunk_guilds_at_startup=mode == "full",
+    )
+
+async def run_mode(mode: str, members: int, active: int) -> dict:
+    state = make_state(mode)
+    state.loop = asyncio.get_running_loop()
+    guild = discord.Guild(data={"id": str(GUILD_ID), "name": "Synthetic", "member_count": members,
+                                "roles": [], "channels": []}, state=state)
+    state._add_guild(guild)
+    baseline = rss_mb()
+    started = time.perf_counter()
+
+    if mode == "full":
+        # What discord.py does at startup with chunking on: every member arrives and is cached
+        request = ChunkRequest(GUILD_ID, 0, state.loop, state._get_guild, cache=True)
+        state._chunk_requests[request.nonce] = request
+        chunk_count = (members + CHUNK_SIZE - 1) // CHUNK_SIZE
+        for index in range(chunk_count):
+            state.parse_guild_members_chunk({
+                "guild_id": str(GUILD_ID), "nonce": request.nonce,
+                "chunk_index": index, "chunk_count": chunk_count,
+                "members": [member_payload(i) for i in range(index * CHUNK_SIZE, min(members, (index + 1) * CHUNK_SIZE))],
+            })
+        cached = len(guild.members)
+    else:
+        # No chunking: only members that interact with the bot are built and remembered
+        cache = MemberLRU(maxsize=active)
+        for i in range(active):
+            cache.remember(discord.Member(data=member_payload(i), guild=guild, state=state))
+        cached = len(cache)
+
+    return {
+        "mode": mode,
+        "seconds": time.perf_counter() - started,
+        "cached_members": cached,
+        "rss_mb": rss_mb() - baseline,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Member cache startup benchmark")
+    parser.add_argument("--members", type=int, default=200_000)
+    parser.add_argument("--active", type=int, default=2000, help="Active members kept by the LRU")
+    parser.add_argument("--mode", choices=["full", "lru"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(asyncio.run(run_mode(args.mode, args.members, args.active))))
+        return
+
+    print(f"Synthetic guild with {args.members:,} members, {args.active:,} active")
+    for mode in ("full", "lru"):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.member_cache_startup", "--mode", mode,
+             "--members", str(args.members), "--active", str(args.active)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        print(f"{mode:>5}: {result['seconds']:.2f}s member processing, "
+              f"{result['cached_members']:,} cached, +{result['rss_mb']:.0f} MB RSS")
+
+if __name__ == "__main__":
+    main()
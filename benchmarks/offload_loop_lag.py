@@ -0,0 +1,81 @@
+# benchmarks/offload_loop_lag.py
+# Measures event-loop lag while a large chat payload is parsed and written as a transcript,
+# with the transforms inline on the loop vs offloaded to the process pool.
+#
+#   python -m benchmarks.offload_loop_lag [--messages 200000] [--workers 2]
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from utils.offload import ProcessOffload
+from utils.transcript_formats import convert_transcript_file, write_chat_payload
+
+TICK = 0.005 # Expected interval of the lag probe, in seconds
+
+def make_payload(count: int) -> str:
+    actions = []
+    for i in range(count):
+        actions.append({"addChatItemAction": {"item": {"liveChatTextMessageRenderer": {
+            "authorName": {"simpleText": f"viewer{i % 500}"},
+            "message": {"runs": [{"text": f"message number {i} "}, {"text": "pog"}]},
+            "timestampUsec": str(1_700_000_000_000_000 + i * 250_000),
+        }}}})
+    return json.dumps({"actions": actions})
+
+async def probe(lags: list, stop: asyncio.Event):
+    """Sleep for TICK repeatedly and record how late each wake-up is."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(TICK)
+        lags.append(max(0.0, loop.time() - start - TICK))
+
+async def run_case(offload: ProcessOffload, payload: str) -> dict:
+    lags = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(0.05) # Let the probe settle
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Same path as the cog: parse into a columnar spool, then convert it, so only file names cross IPC
+        spool = os.path.join(tmp, "chat.lsct")
+        details = {"title": "Benchmark"}
+        summary = await offload.run(write_chat_payload, payload, spool, "columnar", "bench", details)
+        await offload.run(convert_transcript_file, spool, os.path.join(tmp, "transcript.txt"), "text", "bench", details)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    return {
+        "messages": summary.count,
+        "elapsed_s": elapsed,
+        "lag_p50_ms": statistics.median(lags_ms),
+        "lag_p99_ms": lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))],
+        "lag_max_ms": lags_ms[-1],
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description="Event-loop lag with and without the process-pool offload")
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    payload = make_payload(args.messages)
+    print(f"Payload: {args.messages:,} messages, {len(payload) / 1e6:.1f} MB")
+
+    for label, offload in (("inline", ProcessOffload(0)), ("offload", ProcessOffload(args.workers))):
+        if offload.enabled:
+            await offload.run(len, "") # Warm up the pool so spawn time isn't measured
+        result = await run_case(offload, payload)
+        offload.shutdown()
+        print(f"{label:>8}: total {result['elapsed_s']:.2f}s | loop lag p50 {result['lag_p50_ms']:.1f}ms "
+              f"p99 {result['lag_p99_ms']:.1f}ms max {result['lag_max_ms']:.1f}ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
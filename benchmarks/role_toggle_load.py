@@ -0,0 +1,110 @@
+# benchmarks/role_toggle_load.py
+# Simulates a burst of RoleButton clicks against a fake guild whose role routes are slow,
+# and reports acknowledgement latency (click -> interaction response) and queue drain time.
+#
+#   python -m benchmarks.role_toggle_load [--clicks 500] [--api-latency 0.25]
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from cogs.role_buttons import RoleButton, RoleMenuEntry
+from utils.member_cache import MemberLRU
+from utils.role_queue import RoleToggleQueue
+
+class FakeRole:
+    def __init__(self, role_id: int, name: str):
+        self.id = role_id
+        self.name = name
+
+class FakeMember:
+    def __init__(self, member_id: int, guild, api_latency: float):
+        self.id = member_id
+        self.guild = guild
+        self.roles = []
+        self.guild_permissions = SimpleNamespace(manage_messages=False)
+        self._api_latency = api_latency
+
+    async def add_roles(self, role, reason=None):
+        await asyncio.sleep(self._api_latency)
+        self.guild.api_calls += 1
+        if role not in self.roles:
+            self.roles.append(role)
+
+    async def remove_roles(self, role, reason=None):
+        await asyncio.sleep(self._api_latency)
+        self.guild.api_calls += 1
+        if role in self.roles:
+            self.roles.remove(role)
+
+class FakeGuild:
+    def __init__(self, role: FakeRole):
+        self.id = 1
+        self.role = role
+        self.members = {}
+        self.api_calls = 0
+
+    def get_role(self, role_id):
+        return self.role if role_id == self.role.id else None
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+class FakeResponse:
+    def __init__(self, clicked_at: float, latencies: list):
+        self._clicked_at = clicked_at
+        self._latencies = latencies
+
+    async def send_message(self, content, ephemeral=False):
+        self._latencies.append(time.perf_counter() - self._clicked_at)
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+async def main():
+    parser = argparse.ArgumentParser(description="Role toggle burst load test")
+    parser.add_argument("--clicks", type=int, default=500)
+    parser.add_argument("--members", type=int, default=300)
+    parser.add_argument("--api-latency", type=float, default=0.25, help="Seconds per add/remove_roles call")
+    parser.add_argument("--rate", type=float, default=50.0, help="Role changes applied per second")
+    args = parser.parse_args()
+
+    role = FakeRole(1234, "Stream Pings")
+    guild = FakeGuild(role)
+    for member_id in range(args.members):
+        guild.members[member_id] = FakeMember(member_id, guild, args.api_latency)
+
+    member_cache = MemberLRU()
+    queue = RoleToggleQueue(rate_per_second=args.rate, member_cache=member_cache)
+    client = SimpleNamespace(role_queue=queue, member_cache=member_cache)
+    button = RoleButton(RoleMenuEntry(role_id=role.id, label="Toggle", menu_id="bench"))
+
+    latencies = []
+    async def click(member_id):
+        clicked_at = time.perf_counter()
+        interaction = SimpleNamespace(
+            guild=guild,
+            user=guild.members[member_id],
+            client=client,
+            response=FakeResponse(clicked_at, latencies),
+        )
+        await button.callback(interaction)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(click(random.randrange(args.members)) for _ in range(args.clicks)))
+    while queue.pending_count():
+        await asyncio.sleep(0.01)
+    drained = time.perf_counter() - started
+    await queue.close()
+
+    ms = [lat * 1000 for lat in latencies]
+    print(f"{args.clicks} clicks from {args.members} members, {args.api_latency * 1000:.0f}ms role route latency")
+    print(f"ack latency: p50 {statistics.median(ms):.2f}ms p99 {percentile(ms, 0.99):.2f}ms max {max(ms):.2f}ms")
+    print(f"role API calls: {guild.api_calls} (coalesced {queue.coalesced}, skipped {queue.skipped}) "
+          f"drained in {drained:.1f}s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+# benchmarks/startup_imports.py
+# Measures startup import time with `python -X importtime`. It imports main.py plus the cog
+# modules setup_hook would load for a config, then fails (exit 1) when the total goes over
+# the budget or a module in LAZY_MODULES was imported. CI runs it on every push.
+#
+# The budget is relative to a bare `import discord` measured in the same run, so a slower
+# machine raises both together; --budget-ms adds a fixed cap on top for local checks.
+#
+#   python -m benchmarks.startup_imports [--budget-ratio 1.6] [--budget-ms 500] [--all-cogs] [--top 15]
+#
+# --all-cogs imports every extension, as startup did before disabled cogs were skipped.
+import argparse
+import re
+import subprocess
+import sys
+
+# Startup measured ~1.15-1.3x a bare `import discord` for the default config, headroom for noisy runners
+DEFAULT_BUDGET_RATIO = 1.6
+# Only imported by the features that use them, never by main.py itself
+LAZY_MODULES = (
+    "googleapiclient.discovery", # First YouTube/Calendar API call
+    "utils.quota", # First use of bot.youtube_keys
+    "utils.offload", # YouTubeFeatures cog
+    "utils.metadata_cache", # First use of bot.metadata_cache
+)
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def _importtime(script: str) -> list:
+    """Run `script` in a fresh interpreter and return (cumulative_us, self_us, depth, module) rows."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((int(cumulative_us), int(self_us), len(indent) // 2, module))
+    return rows
+
+def total_ms(rows: list) -> float:
+    # Top-level imports only, nested ones are already counted in their parent's cumulative time
+    return sum(cumulative for cumulative, _, depth, _ in rows if depth == 0) / 1000
+
+def measure(all_cogs: bool) -> list:
+    """Import main.py and the cogs it would load, returning importtime rows."""
+    return _importtime(
+        "import importlib, main\n"
+        "from config import BotConfig\n"
+        f"names = [n for n, _ in main.EXTENSIONS] if {all_cogs} else main.enabled_extensions(BotConfig())\n"
+        "for name in names:\n"
+        "    importlib.import_module(name)\n"
+    )
+
+def baseline_ms() -> float:
+    """A bare `import discord`, the floor any startup pays on this machine."""
+    return total_ms(_importtime("import discord\n"))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ratio", type=float, default=DEFAULT_BUDGET_RATIO,
+                        help="Budget as a multiple of a bare `import discord` measured in the same run")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Also fail above this many milliseconds")
+    parser.add_argument("--all-cogs", action="store_true")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows = measure(args.all_cogs)
+    startup_ms = total_ms(rows)
+    discord_ms = baseline_ms()
+    budget_ms = discord_ms * args.budget_ratio
+    if args.budget_ms is not None:
+        budget_ms = min(budget_ms, args.budget_ms)
+
+    print(f"Heaviest imports ({'all cogs' if args.all_cogs else 'enabled cogs'}):")
+    for cumulative, _, depth, module in sorted(rows, key=lambda r: r[0], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {'  ' * depth}{module}")
+    print(f"Total import time: {startup_ms:.1f} ms, {startup_ms / discord_ms:.2f}x a bare `import discord` "
+          f"({discord_ms:.1f} ms); budget {budget_ms:.0f} ms")
+
+    imported = {module for *_, module in rows}
+    eager = [module for module in LAZY_MODULES if module in imported]
+    if eager and not args.all_cogs:
+        print(f"Imported at startup, should only be imported by the features using them: {', '.join(eager)}")
+        sys.exit(1)
+    if startup_ms > budget_ms:
+        print("Over budget!")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# cogs/daily_summary.py
+import asyncio
+import logging
+from datetime import datetime, time as dt_time, timedelta
+from typing import List, Optional
+
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+from googleapiclient.errors import HttpError
+
+from utils.calendar_store import CalendarEvent
+from utils.perf import track_task
+from utils.sharding import owns_channel
+
+log = logging.getLogger(__name__)
+
+MAX_EMBED_FIELDS = 25
+
+class DailySummary(commands.Cog):
+    """
+    Keeps the bot's local copy of the Google Calendar up to date with incremental syncs
+    and posts the day's events to the daily summary channel at the configured time.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = bot.config
+        self.store = bot.calendar_store
+        self.calendar = bot.calendar
+        self._summary_task: Optional[asyncio.Task] = None
+
+    async def cog_load(self):
+        if self.calendar.enabled:
+            self.sync_loop.change_interval(minutes=self.config.calendar_sync_interval_minutes)
+            self.sync_loop.start()
+        else:
+            log.info("Calendar sync NOT started: calendar_id or Google credentials not configured.")
+        self.restart()
+
+    async def cog_unload(self):
+        self.sync_loop.cancel()
+        if self._summary_task:
+            self._summary_task.cancel()
+
+    def restart(self):
+        """(Re)schedule the daily summary, called again whenever its settings change."""
+        if self._summary_task:
+            self._summary_task.cancel()
+        self._summary_task = asyncio.create_task(self._summary_loop())
+
+    def _owns_calendar_channels(self) -> bool:
+        """Calendar work runs in the process serving the summary or notification channel's guild."""
+        return (owns_channel(self.bot, self.config.daily_summary_channel_id)
+                or owns_channel(self.bot, self.config.event_notification_channel_id))
+
+    @tasks.loop(minutes=15) # Default interval, will be updated in cog_load
+    @track_task("calendar-sync")
+    async def sync_loop(self):
+        if not self._owns_calendar_channels():
+            return
+        try:
+            await self.calendar.sync()
+        except HttpError as e:
+            log.error(f"Calendar sync failed: {e}")
+        except Exception as e:
+            log.exception(f"Unexpected error during calendar sync: {e}")
+
+    @sync_loop.before_loop
+    async def before_sync_loop(self):
+        await self.bot.wait_until_ready() # Channel ownership is only known once guilds are cached
+
+    # --- Daily summary ---
+    def _next_run(self, now: datetime) -> datetime:
+        hour, minute = (int(part) for part in self.config.daily_summary_time.split(":"))
+        tz = self.calendar.tz
+        run_date = now.astimezone(tz).date()
+        while True:
+            # Localized per date so the wall-clock time holds across DST changes
+            run_at = tz.localize(datetime.combine(run_date, dt_time(hour, minute)))
+            if run_at > now:
+                return run_at
+            run_date += timedelta(days=1)
+
+    async def _summary_loop(self):
+        await self.bot.wait_until_ready()
+        if not owns_channel(self.bot, self.config.daily_summary_channel_id):
+            return # Posted by the process serving the summary channel's guild
+        while self.config.daily_summary_enabled and self.config.daily_summary_channel_id:
+            try:
+                run_at = self._next_run(datetime.now(self.calendar.tz))
+            except ValueError:
+                log.error(f"Invalid daily_summary_time '{self.config.daily_summary_time}', daily summary disabled")
+                return
+            log.info(f"Next daily summary at {run_at.isoformat()}")
+            await asyncio.sleep((run_at - datetime.now(self.calendar.tz)).total_seconds())
+            try:
+                await self.post_summary(run_at)
+            except Exception as e:
+                log.exception(f"Failed to post daily summary: {e}")
+
+    async def events_for_day(self, day: datetime) -> List[CalendarEvent]:
+        tz = self.calendar.tz
+        start = tz.localize(datetime.combine(day.date(), dt_time.min))
+        end = tz.localize(datetime.combine(day.date() + timedelta(days=1), dt_time.min))
+        return await self.store.events_between(start.timestamp(), end.timestamp(), self.calendar.calendar_id)
+
+    def build_summary_embed(self, day: datetime, events: List[CalendarEvent]) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"📅 Upcoming Events — {day.strftime('%A, %B %d')}",
+            color=discord.Color.blue()
+        )
+        for event in events[:MAX_EMBED_FIELDS]:
+            if event.all_day:
+                when = "All day"
+            else:
+                when = f"<t:{int(event.start_ts)}:t> – <t:{int(event.end_ts)}:t>"
+            details = [when]
+            if event.location:
+                details.append(f"📍 {event.location}")
+            if event.html_link:
+                details.append(f"[View in calendar]({event.html_link})")
+            embed.add_field(name=event.summary[:256], value="\n".join(details)[:1024], inline=False)
+        if len(events) > MAX_EMBED_FIELDS:
+            embed.set_footer(text=f"...and {len(events) - MAX_EMBED_FIELDS} more")
+        return embed
+
+    async def post_summary(self, day: datetime):
+        channel = self.bot.get_channel(self.config.daily_summary_channel_id)
+        if not channel:
+            log.warning(f"Daily summary channel {self.config.daily_summary_channel_id} not found")
+            return
+
+        if self.calendar.enabled:
+            # Incremental, so this only transfers what changed since the last periodic sync
+            try:
+                await self.calendar.sync()
+            except Exception as e:
+                log.warning(f"Calendar sync before daily summary failed, using stored events: {e}")
+
+        events = await self.events_for_day(day)
+        if not events:
+            log.info("No events today, skipping daily summary")
+            return
+
+        role_mention = f"<@&{self.config.daily_summary_role_id}>" if self.config.daily_summary_role_id else None
+        await self.bot.resilience.call(
+            "discord.send", channel.send,
+            content=role_mention,
+            embed=self.build_summary_embed(day, events),
+            allowed_mentions=discord.AllowedMentions(roles=True),
+            max_attempts=1
+        )
+
+    @app_commands.command(
+        name="calendar-sync",
+        description="Sync calendar changes now and show sync status (bot owner only)"
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def calendar_sync(self, interaction: discord.Interaction):
+        if interaction.user.id != self.bot.owner_id:
+            await interaction.response.send_message(
+                "❌ You need to be the bot owner to use this command!",
+                ephemeral=True
+            )
+            return
+        if not self.calendar.enabled:
+            await interaction.response.send_message(
+                "❌ Calendar sync isn't configured. Set `calendar_id` and a Google API key or credentials file.",
+                ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        try:
+            result = await self.calendar.sync()
+        except HttpError as e:
+            await interaction.followup.send(f"❌ Calendar sync failed: {e.reason}", ephemeral=True)
+            return
+
+        stats = await self.store.stats(self.calendar.calendar_id)
+        today = await self.events_for_day(datetime.now(self.calendar.tz))
+        await interaction.followup.send(
+            f"✅ {'Full' if result.full else 'Incremental'} sync: {result.updated} updated, "
+            f"{result.deleted} deleted in {result.pages} request(s).\n"
+            f"Stored events: {stats['events']:,} ({stats['full_syncs']} full / "
+            f"{stats['incremental_syncs']} incremental syncs so far). Events today: {len(today)}.",
+            ephemeral=True
+        )
+
+async def setup(bot):
+    await bot.add_cog(DailySummary(bot))
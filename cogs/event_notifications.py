@@ -0,0 +1,136 @@
+# cogs/event_notifications.py
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import discord
+from discord.ext import commands
+
+from utils.calendar_store import CalendarEvent
+from utils.resilience import deadline
+from utils.sharding import owns_channel
+from utils.timer_heap import TimerHeap
+
+log = logging.getLogger(__name__)
+
+LATE_GRACE_SECONDS = 300 # Reminders this late (e.g. the bot was down) are dropped rather than sent
+
+class EventNotifications(commands.Cog):
+    """
+    Posts reminders before calendar events start.
+
+    Every upcoming (event, offset) reminder sits in a TimerHeap keyed by its due time, so one
+    task sleeps until the next reminder. The index is loaded from the calendar store once at
+    startup, then updated from each sync's changes only.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = bot.config
+        self.calendar = bot.calendar
+        self.offsets: List[int] = sorted({max(0, int(m)) for m in self.config.event_notification_offsets_minutes}, reverse=True)
+        self.events: Dict[str, CalendarEvent] = {} # Events that still have reminders pending
+        self.scheduler = TimerHeap(self._fire, name="event-notifications")
+        self._load_task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.calendar.enabled and self.config.event_notification_channel_id and self.offsets)
+
+    async def cog_load(self):
+        if not self.enabled:
+            log.info("Event notifications NOT started: calendar or notification channel not configured.")
+            return
+        self.calendar.add_listener(self._on_calendar_changes)
+        self._load_task = asyncio.create_task(self._load())
+
+    async def cog_unload(self):
+        self.calendar.remove_listener(self._on_calendar_changes)
+        if self._load_task:
+            self._load_task.cancel()
+        await self.scheduler.stop()
+
+    async def _load(self):
+        await self.bot.wait_until_ready()
+        if not owns_channel(self.bot, self.config.event_notification_channel_id):
+            log.info("Event notification channel is served by another shard process, notifier idle")
+            self.calendar.remove_listener(self._on_calendar_changes)
+            return
+        events = await self.calendar.store.upcoming_events(time.time(), self.calendar.calendar_id)
+        for event in events:
+            self._schedule(event)
+        self.scheduler.start()
+        log.info(f"Event notifications: {len(self.scheduler)} reminder(s) scheduled for {len(self.events)} event(s)")
+
+    # --- Index maintenance ---
+    def _schedule(self, event: CalendarEvent):
+        self._unschedule(event.id)
+        now = time.time()
+        for offset in self.offsets:
+            due = event.start_ts - offset * 60
+            if due >= now:
+                self.scheduler.schedule((event.id, offset), due)
+                self.events[event.id] = event
+
+    def _unschedule(self, event_id: str):
+        if self.events.pop(event_id, None):
+            for offset in self.offsets:
+                self.scheduler.cancel((event_id, offset))
+
+    def _on_calendar_changes(self, full: bool, events: List[CalendarEvent], deleted_ids: List[str]):
+        """Sync listener: apply only the changed events to the reminder index."""
+        if full:
+            for event_id in list(self.events):
+                self._unschedule(event_id)
+        for event_id in deleted_ids:
+            self._unschedule(event_id)
+        for event in events:
+            self._schedule(event)
+
+    # --- Posting ---
+    def _describe(self, event: CalendarEvent, offset: int) -> str:
+        if offset == 0:
+            return f"🔴 **{event.summary}** is starting now!"
+        # Wall-clock time in the calendar's timezone, pytz picks the right DST abbreviation
+        local_start = datetime.fromtimestamp(event.start_ts, self.calendar.tz)
+        if event.all_day:
+            return f"⏰ **{event.summary}** is on {local_start.strftime('%A, %B %d')}."
+        return (f"⏰ **{event.summary}** starts <t:{int(event.start_ts)}:R> "
+                f"({local_start.strftime('%I:%M %p %Z').lstrip('0')}).")
+
+    async def _fire(self, item: Tuple[str, int], due: float):
+        event_id, offset = item
+        event = self.events.get(event_id)
+        if event is None:
+            return
+        if offset == self.offsets[-1]:
+            self.events.pop(event_id, None) # Smallest offset is always the event's last reminder
+
+        late = time.time() - due
+        if late > LATE_GRACE_SECONDS:
+            log.info(f"Skipping reminder for {event.summary!r}, {late:.0f}s late")
+            return
+
+        channel = self.bot.get_channel(self.config.event_notification_channel_id)
+        if not channel:
+            log.warning(f"Event notification channel {self.config.event_notification_channel_id} not found")
+            return
+
+        embed = discord.Embed(description=self._describe(event, offset), color=discord.Color.orange())
+        if event.location:
+            embed.add_field(name="Where", value=event.location[:1024])
+        if event.html_link:
+            embed.add_field(name="Details", value=f"[View in calendar]({event.html_link})")
+        role_id = self.config.event_notification_role_id
+        with deadline(LATE_GRACE_SECONDS - late): # Past the grace period the reminder is stale, don't keep trying
+            await self.bot.resilience.call(
+                "discord.send", channel.send,
+                content=f"<@&{role_id}>" if role_id else None,
+                embed=embed,
+                allowed_mentions=discord.AllowedMentions(roles=True),
+                max_attempts=1
+            )
+
+async def setup(bot):
+    await bot.add_cog(EventNotifications(bot))
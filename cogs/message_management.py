@@ -2,11 +2,55 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from typing import Optional
+from typing import Optional, List, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import re
+import time
+import pytz
+from utils.announcement_store import AnnouncementStore
+from utils.resilience import CircuitOpenError
+from utils.sharding import owns_guild
+from utils.timer_heap import TimerHeap
+
+log = logging.getLogger(__name__)
+
+REPEAT_INTERVALS = {
+    "once": 0,
+    "daily": 24 * 60 * 60,
+    "weekly": 7 * 24 * 60 * 60,
+}
+
+def next_occurrence(last_run: float, interval: int, tz: pytz.BaseTzInfo, now: float) -> float:
+    """
+    Next run strictly after `now`, stepping in local time so a daily 09:00 stays at 09:00
+    across DST changes. Missed occurrences are skipped, not replayed.
+    """
+    local = datetime.fromtimestamp(last_run, tz).replace(tzinfo=None)
+    # Jump over the missed ones, stopping short by up to one period since a DST change moves them an hour
+    periods = max(1, int((now - last_run) // interval))
+    next_run = tz.localize(local + timedelta(seconds=interval * periods)).timestamp()
+    while next_run <= now:
+        periods += 1
+        next_run = tz.localize(local + timedelta(seconds=interval * periods)).timestamp()
+    return next_run
 
 class MessageManagement(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.store = AnnouncementStore(bot.config.announcement_db_path)
+        self.scheduler = TimerHeap(self._fire_scheduled, name="announcements")
+        self._load_task = None
+
+    async def cog_load(self):
+        self._load_task = asyncio.create_task(self._load_scheduled())
+
+    async def cog_unload(self):
+        if self._load_task:
+            self._load_task.cancel()
+        await self.scheduler.stop()
+        self.store.close()
         
     @app_commands.command(
         name="say",
@@ -58,10 +102,47 @@ class MessageManagement(commands.Cog):
                 ephemeral=True
             )
             
+    def _parse_color(self, color: Optional[str]) -> int:
+        """Parse a hex color code, falling back to the default blue."""
+        if color:
+            try:
+                # Handle hex color codes
+                if color.startswith('#'):
+                    return int(color[1:], 16)
+                return int(color.replace('0x', ''), 16)
+            except ValueError:
+                pass
+        return discord.Color.blue().value
+
+    def _build_embed(self, message: str, title: Optional[str], color: int,
+                     author_name: str, author_avatar: Optional[str]) -> discord.Embed:
+        embed = discord.Embed(description=message, color=color)
+        if title:
+            embed.title = title
+        # Add footer with author info
+        embed.set_footer(text=f"Announcement by {author_name}", icon_url=author_avatar)
+        return embed
+
+    def _parse_send_at(self, send_at: str) -> Optional[float]:
+        """Parse 'YYYY-MM-DD HH:MM' in the configured announcement timezone to an epoch timestamp."""
+        try:
+            naive = datetime.strptime(send_at.strip(), "%Y-%m-%d %H:%M")
+        except ValueError:
+            return None
+        tz = pytz.timezone(self.bot.config.announcement_timezone)
+        return tz.localize(naive).timestamp()
+
     @app_commands.command(
         name="announce",
         description="Send an announcement message with optional ping and embed"
     )
+    @app_commands.describe(
+        send_at="Schedule for later: YYYY-MM-DD HH:MM (bot announcement timezone)",
+        repeat="Repeat a scheduled announcement"
+    )
+    @app_commands.choices(repeat=[
+        app_commands.Choice(name=name, value=name) for name in REPEAT_INTERVALS
+    ])
     @app_commands.default_permissions(manage_messages=True)
     async def announce(
         self,
@@ -70,7 +151,9 @@ class MessageManagement(commands.Cog):
         channel: Optional[discord.TextChannel] = None,
         title: Optional[str] = None,
         ping_role: Optional[discord.Role] = None,
-        color: Optional[str] = None
+        color: Optional[str] = None,
+        send_at: Optional[str] = None,
+        repeat: Optional[str] = None
     ):
         if not interaction.user.guild_permissions.manage_messages:
             await interaction.response.send_message(
@@ -96,33 +179,19 @@ class MessageManagement(commands.Cog):
                 ephemeral=True
             )
             return
+
+        color_value = self._parse_color(color)
+
+        if send_at or REPEAT_INTERVALS.get(repeat or "once"):
+            await self._schedule_announcement(
+                interaction, target_channel, message, title, ping_role, color_value, send_at, repeat
+            )
+            return
             
         try:
-            # Create embed
-            embed = discord.Embed(description=message)
-            
-            # Add optional title if provided
-            if title:
-                embed.title = title
-                
-            # Set color if provided, otherwise use default blue
-            if color:
-                try:
-                    # Handle hex color codes
-                    if color.startswith('#'):
-                        color_value = int(color[1:], 16)
-                    else:
-                        color_value = int(color.replace('0x', ''), 16)
-                    embed.color = color_value
-                except ValueError:
-                    embed.color = discord.Color.blue()
-            else:
-                embed.color = discord.Color.blue()
-                
-            # Add footer with author info
-            embed.set_footer(
-                text=f"Announcement by {interaction.user.display_name}",
-                icon_url=interaction.user.display_avatar.url
+            embed = self._build_embed(
+                message, title, color_value,
+                interaction.user.display_name, interaction.user.display_avatar.url
             )
             
             # Prepare ping message if role is provided
@@ -149,5 +218,404 @@ class MessageManagement(commands.Cog):
                 ephemeral=True
             )
 
+    async def _schedule_announcement(self, interaction: discord.Interaction, target_channel: discord.TextChannel,
+                                     message: str, title: Optional[str], ping_role: Optional[discord.Role],
+                                     color_value: int, send_at: Optional[str], repeat: Optional[str]):
+        interval = REPEAT_INTERVALS.get(repeat or "once", 0)
+        if send_at:
+            next_run = self._parse_send_at(send_at)
+            if next_run is None:
+                await interaction.response.send_message(
+                    "❌ Invalid time! Please use YYYY-MM-DD HH:MM format (e.g., 2025-01-31 18:00)",
+                    ephemeral=True
+                )
+                return
+            if next_run <= time.time():
+                await interaction.response.send_message("❌ That time is in the past!", ephemeral=True)
+                return
+        else:
+            # Repeating without a start time: first run one interval from now
+            next_run = time.time() + interval
+
+        announcement_id = await self.store.add(
+            guild_id=interaction.guild.id,
+            channel_id=target_channel.id,
+            author_id=interaction.user.id,
+            author_name=interaction.user.display_name,
+            author_avatar=interaction.user.display_avatar.url,
+            message=message,
+            title=title,
+            color=color_value,
+            ping_role_id=ping_role.id if ping_role else None,
+            next_run=next_run,
+            interval_seconds=interval
+        )
+        self.scheduler.schedule(announcement_id, next_run)
+
+        repeat_text = f", repeating {repeat}" if interval else ""
+        await interaction.response.send_message(
+            f"✅ Announcement #{announcement_id} scheduled in {target_channel.mention} for "
+            f"<t:{int(next_run)}:F>{repeat_text}.",
+            ephemeral=True
+        )
+
+    async def _fire_scheduled(self, announcement_id: int, due: float):
+        """TimerHeap callback: send a due announcement and reschedule it if it repeats."""
+        announcement = await self.store.get(announcement_id)
+        if not announcement:
+            return # Cancelled after it was scheduled
+
+        channel = self.bot.get_channel(announcement.channel_id)
+        if not channel:
+            log.error(f"Scheduled announcement #{announcement_id}: channel {announcement.channel_id} not found.")
+        else:
+            embed = self._build_embed(
+                announcement.message, announcement.title, announcement.color,
+                announcement.author_name, announcement.author_avatar
+            )
+            ping_content = f"<@&{announcement.ping_role_id}> " if announcement.ping_role_id else ""
+            try:
+                await self.bot.resilience.call("discord.send", channel.send, ping_content, embed=embed, max_attempts=1)
+                log.info(f"Sent scheduled announcement #{announcement_id} ({time.time() - due:.2f}s after due).")
+            except (discord.HTTPException, CircuitOpenError) as e:
+                log.error(f"Failed to send scheduled announcement #{announcement_id}: {e}")
+
+        if announcement.recurring:
+            next_run = self._next_occurrence(announcement.next_run, announcement.interval_seconds)
+            await self.store.set_next_run(announcement_id, next_run)
+            self.scheduler.schedule(announcement_id, next_run)
+        else:
+            await self.store.delete(announcement_id)
+
+    def _next_occurrence(self, last_run: float, interval: int) -> float:
+        return next_occurrence(last_run, interval, pytz.timezone(self.bot.config.announcement_timezone), time.time())
+
+    async def _load_scheduled(self):
+        """Reload every stored announcement into the timer heap, catching up on missed ones."""
+        await self.bot.wait_until_ready()
+        now = time.time()
+        max_late = self.bot.config.announcement_catchup_max_hours * 3600
+        caught_up = dropped = 0
+        for announcement in await self.store.all():
+            if not owns_guild(self.bot, announcement.guild_id):
+                continue # Fired by the process running this guild's shard
+            due = announcement.next_run
+            if due < now and now - due > max_late:
+                # Too old to be useful: drop one-offs, move recurring ones to their next slot
+                if not announcement.recurring:
+                    await self.store.delete(announcement.id)
+                    dropped += 1
+                    continue
+                due = self._next_occurrence(due, announcement.interval_seconds)
+                await self.store.set_next_run(announcement.id, due)
+            elif due < now:
+                caught_up += 1
+            self.scheduler.schedule(announcement.id, due)
+        self.scheduler.start()
+        log.info(f"Loaded {len(self.scheduler)} scheduled announcement(s) "
+                 f"({caught_up} missed and sent now, {dropped} too old and dropped).")
+
+    @app_commands.command(
+        name="announce-scheduled",
+        description="List scheduled announcements in this server"
+    )
+    @app_commands.default_permissions(manage_messages=True)
+    async def announce_scheduled(self, interaction: discord.Interaction):
+        if not interaction.guild:
+            await interaction.response.send_message("❌ This command can only be used in a server!", ephemeral=True)
+            return
+        if not interaction.user.guild_permissions.manage_messages:
+            await interaction.response.send_message(
+                "❌ You need Moderator permissions to use this command!",
+                ephemeral=True
+            )
+            return
+
+        announcements = await self.store.all(interaction.guild.id)
+        if not announcements:
+            await interaction.response.send_message("No announcements are scheduled.", ephemeral=True)
+            return
+
+        lines = []
+        for a in announcements[:20]:
+            repeat = next((name for name, seconds in REPEAT_INTERVALS.items() if seconds == a.interval_seconds), "custom")
+            preview = (a.title or a.message)[:60]
+            lines.append(f"**#{a.id}** <t:{int(a.next_run)}:f> in <#{a.channel_id}> ({repeat}) — {preview}")
+        if len(announcements) > 20:
+            lines.append(f"...and {len(announcements) - 20} more")
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+    @app_commands.command(
+        name="announce-cancel",
+        description="Cancel a scheduled announcement"
+    )
+    @app_commands.default_permissions(manage_messages=True)
+    async def announce_cancel(self, interaction: discord.Interaction, announcement_id: int):
+        if not interaction.guild:
+            await interaction.response.send_message("❌ This command can only be used in a server!", ephemeral=True)
+            return
+        if interaction.user.id != self.bot.owner_id:
+            await interaction.response.send_message(
+                "❌ You need to be the bot owner to use this command!",
+                ephemeral=True
+            )
+            return
+
+        announcement = await self.store.get(announcement_id)
+        if not announcement or announcement.guild_id != interaction.guild.id:
+            await interaction.response.send_message(
+                f"❌ No scheduled announcement #{announcement_id} in this server.",
+                ephemeral=True
+            )
+            return
+
+        await self.store.delete(announcement_id)
+        self.scheduler.cancel(announcement_id)
+        await interaction.response.send_message(
+            f"✅ Scheduled announcement #{announcement_id} cancelled.",
+            ephemeral=True
+        )
+
+    # --- Broadcasts ---
+    def _parse_channel_ids(self, text: str) -> List[int]:
+        """Channel IDs from mentions (<#123>) or raw IDs separated by spaces/commas."""
+        return [int(mention or raw) for mention, raw in re.findall(r'<#(\d+)>|(?<!\d)(\d{17,20})(?!\d)', text)]
+
+    async def _fan_out(self, targets: list, operation, endpoint: str = "discord.broadcast") -> Tuple[list, list]:
+        """
+        Run `operation(target)` for every target concurrently, capped at broadcast_concurrency.
+        discord.py's HTTP client paces each rate-limit bucket (per channel for sends/edits).
+        Once the endpoint's circuit opens, the remaining targets fail fast. Broadcasts use
+        their own "discord.broadcast*" breakers, so a failing fan-out can't trip the one
+        stream announcements go through.
+        Returns (succeeded [(target, result)], failed [(target, error)]).
+        """
+        semaphore = asyncio.Semaphore(max(1, self.bot.config.broadcast_concurrency))
+
+        async def run(target):
+            async with semaphore:
+                # discord.py already retries 5xx and rate limits, so no extra attempts here
+                return await self.bot.resilience.call(endpoint, operation, target, max_attempts=1)
+
+        results = await asyncio.gather(*(run(t) for t in targets), return_exceptions=True)
+        succeeded, failed = [], []
+        for target, result in zip(targets, results):
+            if isinstance(result, Exception):
+                failed.append((target, result))
+            else:
+                succeeded.append((target, result))
+        return succeeded, failed
+
+    def _failure_lines(self, failed: list, label) -> str:
+        lines = [f"- {label(target)}: {getattr(error, 'text', None) or error}" for target, error in failed[:10]]
+        if len(failed) > 10:
+            lines.append(f"- ...and {len(failed) - 10} more")
+        return "\n".join(lines)
+
+    async def group_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        groups = self.bot.config.announcement_channel_groups or {}
+        return [
+            app_commands.Choice(name=f"{name} ({len(ids)} channels)"[:100], value=name)
+            for name, ids in groups.items() if current.lower() in name.lower()
+        ][:25]
+
+    @app_commands.command(
+        name="announce-group",
+        description="Save a named group of channels for broadcast announcements (bot owner only)"
+    )
+    @app_commands.describe(name="Group name", channels="Channel mentions or IDs, separated by spaces (empty to delete)")
+    @app_commands.default_permissions(manage_messages=True)
+    async def announce_group(self, interaction: discord.Interaction, name: str, channels: Optional[str] = None):
+        if interaction.user.id != self.bot.owner_id:
+            await interaction.response.send_message(
+                "❌ You need to be the bot owner to use this command!",
+                ephemeral=True
+            )
+            return
+
+        groups = self.bot.config.announcement_channel_groups
+        channel_ids = self._parse_channel_ids(channels or "")
+        if not channel_ids:
+            removed = groups.pop(name, None)
+            self.bot.config.save()
+            await interaction.response.send_message(
+                f"✅ Channel group `{name}` deleted." if removed else f"No channel group named `{name}`.",
+                ephemeral=True
+            )
+            return
+
+        groups[name] = list(dict.fromkeys(channel_ids))
+        self.bot.config.save()
+        await interaction.response.send_message(
+            f"✅ Channel group `{name}` saved with {len(groups[name])} channel(s).",
+            ephemeral=True
+        )
+
+    @app_commands.command(
+        name="announce-broadcast",
+        description="Send one announcement to several channels or a saved channel group (bot owner only)"
+    )
+    @app_commands.describe(
+        channels="Channel mentions or IDs, separated by spaces",
+        group="A saved channel group"
+    )
+    @app_commands.autocomplete(group=group_autocomplete)
+    @app_commands.default_permissions(manage_messages=True)
+    async def announce_broadcast(
+        self,
+        interaction: discord.Interaction,
+        message: str,
+        channels: Optional[str] = None,
+        group: Optional[str] = None,
+        title: Optional[str] = None,
+        color: Optional[str] = None
+    ):
+        if interaction.user.id != self.bot.owner_id:
+            await interaction.response.send_message(
+                "❌ You need to be the bot owner to use this command!",
+                ephemeral=True
+            )
+            return
+
+        channel_ids = self._parse_channel_ids(channels or "")
+        if group:
+            group_ids = (self.bot.config.announcement_channel_groups or {}).get(group)
+            if group_ids is None:
+                await interaction.response.send_message(f"❌ No channel group named `{group}`.", ephemeral=True)
+                return
+            channel_ids.extend(group_ids)
+        channel_ids = list(dict.fromkeys(channel_ids))
+        if not channel_ids:
+            await interaction.response.send_message(
+                "❌ Please give some channels or a channel group.",
+                ephemeral=True
+            )
+            return
+
+        targets, unusable = [], []
+        for channel_id in channel_ids:
+            channel = self.bot.get_channel(channel_id)
+            if not isinstance(channel, discord.TextChannel):
+                unusable.append(f"<#{channel_id}> (not a text channel I can see)")
+            elif not channel.permissions_for(channel.guild.me).send_messages:
+                unusable.append(f"{channel.mention} (missing Send Messages)")
+            else:
+                targets.append(channel)
+
+        await interaction.response.defer(ephemeral=True)
+
+        # Built once and shared by every send
+        color_value = self._parse_color(color)
+        author_name = interaction.user.display_name
+        author_avatar = interaction.user.display_avatar.url
+        embed = self._build_embed(message, title, color_value, author_name, author_avatar)
+
+        async def send(channel: discord.TextChannel):
+            return await channel.send(embed=embed)
+
+        sent, failed = await self._fan_out(targets, send)
+
+        lines = [f"✅ Sent to {len(sent)}/{len(channel_ids)} channel(s)."]
+        if sent:
+            broadcast_id = await self.store.add_broadcast(
+                interaction.user.id, author_name, author_avatar, message, title, color_value,
+                [(channel.guild.id, channel.id, msg.id) for channel, msg in sent]
+            )
+            lines[0] += f" Broadcast ID: **{broadcast_id}** (use it with `/announce-edit` or `/announce-delete`)."
+        if failed:
+            lines.append("❌ Failed:\n" + self._failure_lines(failed, lambda c: c.mention))
+        if unusable:
+            lines.append("⚠️ Skipped:\n" + "\n".join(f"- {u}" for u in unusable[:10]))
+        await interaction.followup.send("\n".join(lines)[:2000], ephemeral=True)
+
+    @app_commands.command(
+        name="announce-edit",
+        description="Edit every copy of a broadcast announcement (bot owner only)"
+    )
+    @app_commands.default_permissions(manage_messages=True)
+    async def announce_edit(
+        self,
+        interaction: discord.Interaction,
+        broadcast_id: int,
+        message: Optional[str] = None,
+        title: Optional[str] = None,
+        color: Optional[str] = None
+    ):
+        if interaction.user.id != self.bot.owner_id:
+            await interaction.response.send_message(
+                "❌ You need to be the bot owner to use this command!",
+                ephemeral=True
+            )
+            return
+
+        broadcast = await self.store.get_broadcast(broadcast_id)
+        if not broadcast:
+            await interaction.response.send_message(f"❌ No broadcast #{broadcast_id}.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        new_message = message or broadcast.message
+        new_title = title if title is not None else broadcast.title
+        new_color = self._parse_color(color) if color else broadcast.color
+        embed = self._build_embed(new_message, new_title, new_color, broadcast.author_name, broadcast.author_avatar)
+
+        async def edit(copy):
+            _, channel_id, message_id = copy
+            partial = self.bot.get_partial_messageable(channel_id).get_partial_message(message_id)
+            return await partial.edit(embed=embed)
+
+        edited, failed = await self._fan_out(broadcast.copies, edit, endpoint="discord.broadcast.edit")
+        if edited:
+            # Kept as it was when no copy changed, so a retry starts from what the channels still show
+            await self.store.update_broadcast(broadcast_id, new_message, new_title, new_color)
+
+        # Copies deleted by someone else can't be edited again, stop tracking them
+        gone = [copy[1] for copy, error in failed if isinstance(error, discord.NotFound)]
+        if gone:
+            await self.store.remove_broadcast_copies(broadcast_id, gone)
+
+        text = f"✅ Edited {len(edited)}/{len(broadcast.copies)} cop(ies) of broadcast #{broadcast_id}."
+        if not edited:
+            text = f"❌ No copy of broadcast #{broadcast_id} could be edited, it was left unchanged."
+        if failed:
+            text += "\n❌ Failed:\n" + self._failure_lines(failed, lambda c: f"<#{c[1]}>")
+        await interaction.followup.send(text[:2000], ephemeral=True)
+
+    @app_commands.command(
+        name="announce-delete",
+        description="Delete every copy of a broadcast announcement (bot owner only)"
+    )
+    @app_commands.default_permissions(manage_messages=True)
+    async def announce_delete(self, interaction: discord.Interaction, broadcast_id: int):
+        if interaction.user.id != self.bot.owner_id:
+            await interaction.response.send_message(
+                "❌ You need to be the bot owner to use this command!",
+                ephemeral=True
+            )
+            return
+
+        broadcast = await self.store.get_broadcast(broadcast_id)
+        if not broadcast:
+            await interaction.response.send_message(f"❌ No broadcast #{broadcast_id}.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        async def delete(copy):
+            _, channel_id, message_id = copy
+            await self.bot.get_partial_messageable(channel_id).get_partial_message(message_id).delete()
+
+        deleted, failed = await self._fan_out(broadcast.copies, delete, endpoint="discord.broadcast.delete")
+        # Already-deleted copies count as done
+        done = [copy for copy, _ in deleted] + [copy for copy, error in failed if isinstance(error, discord.NotFound)]
+        failed = [(copy, error) for copy, error in failed if not isinstance(error, discord.NotFound)]
+        await self.store.remove_broadcast_copies(broadcast_id, [copy[1] for copy in done])
+
+        text = f"✅ Deleted {len(done)}/{len(broadcast.copies)} cop(ies) of broadcast #{broadcast_id}."
+        if failed:
+            text += "\n❌ Failed:\n" + self._failure_lines(failed, lambda c: f"<#{c[1]}>")
+        await interaction.followup.send(text[:2000], ephemeral=True)
+
 async def setup(bot):
     await bot.add_cog(MessageManagement(bot))
\ No newline at end of file
@@ -0,0 +1,388 @@
+# cogs/role_bulk.py
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from utils.sharding import owns_guild
+
+log = logging.getLogger(__name__)
+
+STATUS_EDIT_INTERVAL = 10 # Seconds between progress edits of the status message
+MEMBERS_SUFFIX = ".members.json" # Member list of a job, written once next to its progress checkpoint
+
+class BulkRoleJob:
+    """A resumable bulk role change. All state is plain JSON so it can be checkpointed."""
+    def __init__(self, data: dict):
+        self.data = data
+
+    @property
+    def id(self) -> str:
+        return self.data["id"]
+
+    @property
+    def remaining(self) -> int:
+        return len(self.data["member_ids"]) - self.data["position"]
+
+    def progress_text(self, rate: Optional[float]) -> str:
+        d = self.data
+        total = len(d["member_ids"])
+        verb = "Adding" if d["action"] == "add" else "Removing"
+        text = (f"{verb} <@&{d['role_id']}> — {d['position']:,}/{total:,} members processed "
+                f"({d['changed']:,} changed, {d['skipped']:,} skipped, {d['failed']:,} failed)")
+        if d["state"] == "running" and rate:
+            eta = self.remaining / rate
+            text += f"\nThroughput: {rate:.1f} members/s — ETA {int(eta // 60)}m {int(eta % 60)}s"
+        elif d["state"] != "running":
+            text += f"\nStatus: {d['state']}"
+        return text + f"\nJob ID: `{self.id}`"
+
+class RoleBulk(commands.Cog):
+    """Moderator bulk role assignment/removal, paced and checkpointed to disk so it survives restarts."""
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = bot.config
+        self.checkpoint_dir = self.config.role_bulk_checkpoint_dir
+        self.jobs: Dict[str, BulkRoleJob] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self._resume_task: Optional[asyncio.Task] = None
+
+    async def cog_load(self):
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        self._resume_task = asyncio.create_task(self._resume_jobs())
+
+    async def cog_unload(self):
+        if self._resume_task:
+            self._resume_task.cancel()
+        # Tasks are cancelled without touching the checkpoint, so the jobs resume on next load
+        for task in self.tasks.values():
+            task.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+
+    # --- Checkpoints ---
+    def _checkpoint_path(self, job_id: str) -> str:
+        return os.path.join(self.checkpoint_dir, f"{job_id}.json")
+
+    def _members_path(self, job_id: str) -> str:
+        return os.path.join(self.checkpoint_dir, f"{job_id}{MEMBERS_SUFFIX}")
+
+    @staticmethod
+    def _write_json(path: str, data):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path) # Atomic, a crash never leaves a half-written checkpoint
+
+    async def _save_members(self, job: BulkRoleJob):
+        """Write the job's member list, once when it starts. Large guilds make this the big file."""
+        await asyncio.to_thread(self._write_json, self._members_path(job.id), job.data["member_ids"])
+
+    def _save_checkpoint(self, job: BulkRoleJob):
+        """Write the job's progress, everything but the member list, so each member costs a small write."""
+        self._write_json(self._checkpoint_path(job.id), {k: v for k, v in job.data.items() if k != "member_ids"})
+
+    def _load_checkpoint(self, name: str) -> BulkRoleJob:
+        with open(os.path.join(self.checkpoint_dir, name)) as f:
+            data = json.load(f)
+        with open(self._members_path(data["id"])) as f:
+            data["member_ids"] = json.load(f)
+        return BulkRoleJob(data)
+
+    def _remove_checkpoint(self, job: BulkRoleJob):
+        for path in (self._checkpoint_path(job.id), self._members_path(job.id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    async def _resume_jobs(self):
+        await self.bot.wait_until_ready()
+        for name in sorted(os.listdir(self.checkpoint_dir)):
+            if not name.endswith(".json") or name.endswith(MEMBERS_SUFFIX):
+                continue
+            try:
+                job = self._load_checkpoint(name)
+            except (OSError, json.JSONDecodeError, KeyError) as e:
+                log.error(f"Could not read bulk role checkpoint {name}: {e}")
+                continue
+            if job.id in self.tasks:
+                continue
+            if job.data["state"] != "running":
+                # Left behind by a job that failed; it was reported then, and can't be resumed
+                log.info(f"Removing bulk role checkpoint {name} ({job.data['state']})")
+                self._remove_checkpoint(job)
+                continue
+            if not owns_guild(self.bot, job.data["guild_id"]):
+                continue # Resumed by the process running this guild's shard
+            log.info(f"Resuming bulk role job {job.id} at {job.data['position']}/{len(job.data['member_ids'])}")
+            self._start(job)
+
+    def _start(self, job: BulkRoleJob):
+        self.jobs[job.id] = job
+        self.tasks[job.id] = asyncio.create_task(self._run(job))
+
+    def _guild_job(self, guild_id: int) -> Optional[BulkRoleJob]:
+        for job_id, task in self.tasks.items():
+            if not task.done() and self.jobs[job_id].data["guild_id"] == guild_id:
+                return self.jobs[job_id]
+        return None
+
+    # --- Runner ---
+    async def _status_message(self, job: BulkRoleJob) -> Optional[discord.PartialMessage]:
+        channel = self.bot.get_channel(job.data["channel_id"])
+        if not channel or not job.data.get("message_id"):
+            return None
+        return channel.get_partial_message(job.data["message_id"])
+
+    async def _report(self, job: BulkRoleJob, rate: Optional[float]):
+        message = await self._status_message(job)
+        if not message:
+            return
+        try:
+            await message.edit(content=job.progress_text(rate))
+        except discord.HTTPException as e:
+            log.debug(f"Could not update bulk role status for job {job.id}: {e}")
+
+    async def _run(self, job: BulkRoleJob):
+        d = job.data
+        guild = self.bot.get_guild(d["guild_id"])
+        role = guild.get_role(d["role_id"]) if guild else None
+        if not role:
+            d["state"] = "failed: guild or role no longer exists"
+            self._remove_checkpoint(job)
+            await self._report(job, None)
+            return
+
+        interval = 1.0 / self.config.role_bulk_rate_per_second if self.config.role_bulk_rate_per_second > 0 else 0.0
+        add = d["action"] == "add"
+        reason = f"Bulk role job {job.id} by {d['requested_by']}"
+
+        started = time.monotonic()
+        start_position = d["position"]
+        last_report = 0.0
+
+        try:
+            while d["position"] < len(d["member_ids"]):
+                call_started = time.monotonic()
+                outcome = await self._apply(job, guild, role, d["member_ids"][d["position"]], add, reason)
+                d[outcome] += 1
+                # Saved after every member, so a resumed job neither repeats nor double-counts one
+                d["position"] += 1
+                self._save_checkpoint(job)
+                await asyncio.sleep(max(0.0, interval - (time.monotonic() - call_started)))
+
+                now = time.monotonic()
+                if now - last_report >= STATUS_EDIT_INTERVAL:
+                    last_report = now
+                    rate = (d["position"] - start_position) / (now - started) if now > started else None
+                    await self._report(job, rate)
+
+            d["state"] = "completed"
+            self._remove_checkpoint(job)
+            elapsed = time.monotonic() - started
+            rate = (d["position"] - start_position) / elapsed if elapsed > 0 else None
+            log.info(f"Bulk role job {job.id} completed in {elapsed:.0f}s")
+            await self._report(job, rate)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.exception(f"Bulk role job {job.id} crashed: {e}")
+            d["state"] = f"failed: {e}"
+            self._remove_checkpoint(job)
+            await self._report(job, None)
+
+    async def _apply(self, job: BulkRoleJob, guild: discord.Guild, role: discord.Role, member_id: int,
+                     add: bool, reason: str) -> str:
+        """Change one member's role. Returns the counter it goes to: "changed", "skipped" or "failed"."""
+        try:
+            # Fetched when it isn't cached (lru mode), members may have changed since the job was created
+            member = await self.bot.member_cache.resolve(guild, member_id)
+            if (role in member.roles) == add:
+                return "skipped"
+            # Raw route: a cached Member's roles could be stale, the route only needs the IDs
+            if add:
+                await self.bot.http.add_role(guild.id, member_id, role.id, reason=reason)
+            else:
+                await self.bot.http.remove_role(guild.id, member_id, role.id, reason=reason)
+            self.bot.member_cache.forget(guild.id, member_id) # Its roles just changed
+            return "changed"
+        except discord.NotFound:
+            return "skipped" # Member left the guild
+        except discord.HTTPException as e:
+            log.warning(f"Bulk role job {job.id}: failed for member {member_id}: {e}")
+            return "failed"
+
+    # --- Commands ---
+    async def _iter_members(self, guild: discord.Guild):
+        """Every member of the guild, from the cache in full mode or paged from the API in lru mode."""
+        if self.config.member_cache_mode == "lru":
+            async for member in guild.fetch_members(limit=None):
+                yield member
+            return
+        if not guild.chunked:
+            await guild.chunk()
+        for member in guild.members:
+            yield member
+
+    @app_commands.command(
+        name="role-bulk",
+        description="Add or remove a self-assign role for many members at once"
+    )
+    @app_commands.describe(
+        action="Whether to add or remove the role",
+        role="The role to add or remove",
+        members="Which members to change",
+        has_role="For 'has role': only members with this role",
+        joined_before="For 'joined before': a date in YYYY-MM-DD format"
+    )
+    @app_commands.choices(
+        action=[
+            app_commands.Choice(name="Add role", value="add"),
+            app_commands.Choice(name="Remove role", value="remove"),
+        ],
+        members=[
+            app_commands.Choice(name="Everyone", value="everyone"),
+            app_commands.Choice(name="Has role", value="has_role"),
+            app_commands.Choice(name="Joined before", value="joined_before"),
+        ]
+    )
+    @app_commands.default_permissions(manage_roles=True)
+    async def role_bulk(
+        self,
+        interaction: discord.Interaction,
+        action: str,
+        role: discord.Role,
+        members: str,
+        has_role: Optional[discord.Role] = None,
+        joined_before: Optional[str] = None
+    ):
+        if not interaction.guild:
+            await interaction.response.send_message("❌ This command can only be used in a server!", ephemeral=True)
+            return
+        if not interaction.user.guild_permissions.manage_roles:
+            await interaction.response.send_message(
+                "❌ You need Manage Roles permissions to use this command!",
+                ephemeral=True
+            )
+            return
+
+        role_cog = self.bot.get_cog('RoleButtons')
+        if not role_cog or role.id not in role_cog.registry.roles:
+            await interaction.response.send_message(
+                "❌ Only configured self-assign roles can be changed in bulk.",
+                ephemeral=True
+            )
+            return
+
+        if self._guild_job(interaction.guild.id):
+            await interaction.response.send_message(
+                "❌ A bulk role job is already running in this server. Cancel it first with `/role-bulk-cancel`.",
+                ephemeral=True
+            )
+            return
+
+        cutoff = None
+        if members == "has_role" and not has_role:
+            await interaction.response.send_message("❌ Please choose the `has_role` filter role.", ephemeral=True)
+            return
+        if members == "joined_before":
+            try:
+                cutoff = datetime.strptime(joined_before or "", "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            except ValueError:
+                await interaction.response.send_message(
+                    "❌ Please give `joined_before` as a date in YYYY-MM-DD format.",
+                    ephemeral=True
+                )
+                return
+
+        await interaction.response.defer(ephemeral=True)
+
+        guild = interaction.guild
+        selected: List[int] = []
+        async for member in self._iter_members(guild):
+            if member.bot:
+                continue
+            if members == "has_role" and has_role not in member.roles:
+                continue
+            if members == "joined_before" and (not member.joined_at or member.joined_at >= cutoff):
+                continue
+            if (role in member.roles) == (action == "add"):
+                continue # Already in the desired state
+            selected.append(member.id)
+
+        if not selected:
+            await interaction.followup.send("No members need changing.", ephemeral=True)
+            return
+
+        job = BulkRoleJob({
+            "id": uuid.uuid4().hex[:8],
+            "guild_id": guild.id,
+            "role_id": role.id,
+            "action": action,
+            "member_ids": selected,
+            "position": 0,
+            "changed": 0,
+            "skipped": 0,
+            "failed": 0,
+            "state": "running",
+            "requested_by": str(interaction.user),
+            "channel_id": interaction.channel.id,
+            "message_id": None,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+        try:
+            status = await interaction.channel.send(job.progress_text(None))
+            job.data["message_id"] = status.id
+        except discord.HTTPException as e:
+            log.warning(f"Could not post bulk role status message: {e}")
+        await self._save_members(job)
+        self._save_checkpoint(job)
+        self._start(job)
+
+        eta = len(selected) / self.config.role_bulk_rate_per_second if self.config.role_bulk_rate_per_second > 0 else 0
+        await interaction.followup.send(
+            f"✅ Started bulk job `{job.id}` for {len(selected):,} member(s). "
+            f"Estimated time: {int(eta // 60)}m {int(eta % 60)}s.",
+            ephemeral=True
+        )
+
+    @app_commands.command(
+        name="role-bulk-cancel",
+        description="Cancel the running bulk role job in this server"
+    )
+    @app_commands.default_permissions(manage_roles=True)
+    async def role_bulk_cancel(self, interaction: discord.Interaction):
+        if not interaction.guild:
+            await interaction.response.send_message("❌ This command can only be used in a server!", ephemeral=True)
+            return
+        if not interaction.user.guild_permissions.manage_roles:
+            await interaction.response.send_message(
+                "❌ You need Manage Roles permissions to use this command!",
+                ephemeral=True
+            )
+            return
+
+        job = self._guild_job(interaction.guild.id)
+        if not job:
+            await interaction.response.send_message("There is no bulk role job running.", ephemeral=True)
+            return
+
+        self.tasks[job.id].cancel()
+        job.data["state"] = "cancelled"
+        self._remove_checkpoint(job)
+        await self._report(job, None)
+        await interaction.response.send_message(
+            f"✅ Cancelled bulk job `{job.id}` after {job.data['position']:,} member(s).",
+            ephemeral=True
+        )
+
+async def setup(bot):
+    await bot.add_cog(RoleBulk(bot))
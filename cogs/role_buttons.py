@@ -1,66 +1,344 @@
 # cogs/role_buttons.py
+import logging
 import discord
 from discord.ext import commands
 from discord import app_commands
-from typing import Optional, Dict, List
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Tuple
 
-class RoleButton(discord.ui.Button):
-    def __init__(self, role_id: int, label: str, requires_mod: bool = False):
+BUTTONS_PER_MESSAGE = 25 # 5 action rows of 5 buttons
+SELECT_MAX_OPTIONS = 25
+
+log = logging.getLogger(__name__)
+
+@dataclass
+class RoleMenuEntry:
+    role_id: int
+    label: str
+    menu_id: str
+    emoji: Optional[str] = None
+    requires_mod: bool = False
+    group: Optional[str] = None # Roles sharing a group within a menu are mutually exclusive
+    exclusive_with: Tuple[int, ...] = () # Filled in by RoleMenuRegistry from `group`
+
+@dataclass
+class RoleMenu:
+    id: str
+    title: str
+    style: str = "buttons" # "buttons" or "select"
+    entries: List[RoleMenuEntry] = field(default_factory=list)
+
+class RoleMenuRegistry:
+    """
+    Index of every self-assign role, built from config. Components are resolved
+    by dict lookup on the ID embedded in their custom_id, so dispatch cost doesn't
+    grow with the number of roles and no per-role View is ever created.
+    """
+    def __init__(self):
+        self.menus: Dict[str, RoleMenu] = {}
+        self.roles: Dict[int, RoleMenuEntry] = {}
+
+    @classmethod
+    def from_config(cls, config) -> 'RoleMenuRegistry':
+        registry = cls()
+        # Built-in menus for the roles configured through /settings
+        if config.daily_summary_role_id:
+            registry.add_menu({
+                "id": "daily-summary",
+                "title": "Upcoming Events Notifications",
+                "roles": [{"role_id": config.daily_summary_role_id, "label": "Toggle Upcoming Events Notifications"}]
+            })
+        if config.event_notification_role_id:
+            registry.add_menu({
+                "id": "event-notifications",
+                "title": "Event Notifications",
+                "roles": [{
+                    "role_id": config.event_notification_role_id,
+                    "label": "Toggle Event Notifications",
+                    "requires_mod": True
+                }]
+            })
+        for menu in config.role_menus or []:
+            try:
+                registry.add_menu(menu)
+            except (KeyError, TypeError, ValueError) as e:
+                log.warning(f"Skipping invalid role menu {menu.get('id', '?') if isinstance(menu, dict) else menu}: {e}")
+        return registry
+
+    def add_menu(self, data: dict) -> RoleMenu:
+        style = data.get("style", "buttons")
+        if style not in ("buttons", "select"):
+            raise ValueError(f"unknown style '{style}'")
+        menu = RoleMenu(id=str(data["id"]), title=data.get("title", data["id"]), style=style)
+
+        for role in data["roles"]:
+            entry = RoleMenuEntry(
+                role_id=int(role["role_id"]),
+                label=role.get("label") or str(role["role_id"]),
+                menu_id=menu.id,
+                emoji=role.get("emoji"),
+                requires_mod=bool(role.get("requires_mod", False)),
+                group=role.get("group"),
+            )
+            if entry.role_id in self.roles:
+                raise ValueError(f"role {entry.role_id} is already in menu '{self.roles[entry.role_id].menu_id}'")
+            if any(e.role_id == entry.role_id for e in menu.entries):
+                raise ValueError(f"role {entry.role_id} is listed twice")
+            menu.entries.append(entry)
+
+        if style == "select" and len(menu.entries) > SELECT_MAX_OPTIONS:
+            raise ValueError(f"select menus support at most {SELECT_MAX_OPTIONS} roles")
+
+        groups: Dict[str, List[int]] = {}
+        for entry in menu.entries:
+            if entry.group:
+                groups.setdefault(entry.group, []).append(entry.role_id)
+        for entry in menu.entries:
+            if entry.group:
+                entry.exclusive_with = tuple(r for r in groups[entry.group] if r != entry.role_id)
+            self.roles[entry.role_id] = entry
+
+        self.menus[menu.id] = menu
+        return menu
+
+    def build_views(self, menu: RoleMenu) -> List[discord.ui.View]:
+        """Views for posting a menu. Large button menus are split across several messages."""
+        if menu.style == "select":
+            view = discord.ui.View(timeout=None)
+            view.add_item(RoleSelect(menu))
+            return [view]
+
+        views = []
+        for start in range(0, len(menu.entries), BUTTONS_PER_MESSAGE):
+            view = discord.ui.View(timeout=None)
+            for entry in menu.entries[start:start + BUTTONS_PER_MESSAGE]:
+                view.add_item(RoleButton(entry))
+            views.append(view)
+        return views
+
+def _registry(interaction: discord.Interaction) -> Optional[RoleMenuRegistry]:
+    cog = interaction.client.get_cog("RoleButtons")
+    return cog.registry if cog else None
+
+async def _check_role(interaction: discord.Interaction, role_id: int) -> Optional[discord.Role]:
+    """Shared guards for role components. Responds and returns None when the interaction can't proceed."""
+    if not interaction.guild:
+        await interaction.response.send_message(
+            "This button can only be used in a server!",
+            ephemeral=True
+        )
+        return None
+
+    role = interaction.guild.get_role(role_id)
+    if not role:
+        await interaction.response.send_message(
+            "The configured role no longer exists!",
+            ephemeral=True
+        )
+        return None
+    return role
+
+class RoleButton(discord.ui.DynamicItem[discord.ui.Button], template=r"role_toggle_(?P<role_id>[0-9]+)"):
+    def __init__(self, entry: RoleMenuEntry, configured: bool = True):
         super().__init__(
-            style=discord.ButtonStyle.primary,
-            label=label,
-            custom_id=f"role_toggle_{role_id}"
+            discord.ui.Button(
+                style=discord.ButtonStyle.primary,
+                label=entry.label,
+                emoji=entry.emoji,
+                custom_id=f"role_toggle_{entry.role_id}"
+            )
         )
-        self.role_id = role_id
-        self.requires_mod = requires_mod
+        self.entry = entry
+        self.configured = configured # False for buttons whose role has been removed from config
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        registry = _registry(interaction)
+        role_id = int(match["role_id"])
+        entry = registry.roles.get(role_id) if registry else None
+        if entry is None:
+            # Buttons posted for a role that has since been removed from config, refused in the callback
+            entry = RoleMenuEntry(role_id=role_id, label=item.label or str(role_id), menu_id="")
+            return cls(entry, configured=False)
+        return cls(entry)
 
     async def callback(self, interaction: discord.Interaction):
-        if not interaction.guild:
-            await interaction.response.send_message(
-                "This button can only be used in a server!",
-                ephemeral=True
-            )
+        if not self.configured:
+            await interaction.response.send_message("This role button is no longer configured.", ephemeral=True)
             return
 
-        # Get the role
-        role = interaction.guild.get_role(self.role_id)
+        role = await _check_role(interaction, self.entry.role_id)
         if not role:
-            await interaction.response.send_message(
-                "The configured role no longer exists!",
-                ephemeral=True
-            )
             return
 
         # Check if user has required permissions for restricted roles
-        if self.requires_mod and not interaction.user.guild_permissions.manage_messages:
+        if self.entry.requires_mod and not interaction.user.guild_permissions.manage_messages:
             await interaction.response.send_message(
                 "❌ You need Moderator permissions to toggle this role!",
                 ephemeral=True
             )
             return
 
-        # Toggle the role
-        member = interaction.guild.get_member(interaction.user.id)
-        if role in member.roles:
-            await member.remove_roles(role)
-            message = f"✅ Removed the {role.name} role"
-        else:
-            await member.add_roles(role)
+        # Queue the toggle and acknowledge right away, the role queue applies it at the rate limit
+        member = await interaction.client.member_cache.resolve(interaction.guild, interaction.user)
+        role_queue = interaction.client.role_queue
+        if role_queue.toggle(member, role, interaction):
             message = f"✅ Added the {role.name} role"
+            # Picking a role from an exclusive group drops the others in that group
+            for other_id in self.entry.exclusive_with:
+                other = interaction.guild.get_role(other_id)
+                if other and role_queue.will_have_role(member, other):
+                    role_queue.submit(interaction.guild, member.id, other, False)
+        else:
+            message = f"✅ Removed the {role.name} role"
 
         await interaction.response.send_message(message, ephemeral=True)
 
-class RolePersistentView(discord.ui.View):
-    def __init__(self, role_id: int, label: str, requires_mod: bool = False):
-        super().__init__(timeout=None)
-        self.add_item(RoleButton(role_id, label, requires_mod))
+class RoleSelect(discord.ui.DynamicItem[discord.ui.Select], template=r"role_menu:(?P<menu_id>[\w-]+)"):
+    def __init__(self, menu: RoleMenu):
+        exclusive = bool(menu.entries) and all(e.group and e.group == menu.entries[0].group for e in menu.entries)
+        super().__init__(
+            discord.ui.Select(
+                custom_id=f"role_menu:{menu.id}",
+                placeholder=menu.title,
+                min_values=0,
+                max_values=1 if exclusive else max(1, len(menu.entries)),
+                options=[
+                    discord.SelectOption(label=e.label, value=str(e.role_id), emoji=e.emoji)
+                    for e in menu.entries
+                ] or [discord.SelectOption(label="No roles configured", value="0")]
+            )
+        )
+        self.menu = menu
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        registry = _registry(interaction)
+        menu = registry.menus.get(match["menu_id"]) if registry else None
+        if menu is None:
+            menu = RoleMenu(id=match["menu_id"], title="Unknown menu", style="select")
+        return cls(menu)
+
+    async def callback(self, interaction: discord.Interaction):
+        if not interaction.guild:
+            await interaction.response.send_message(
+                "This menu can only be used in a server!",
+                ephemeral=True
+            )
+            return
+        if not self.menu.entries:
+            await interaction.response.send_message("This role menu is no longer configured.", ephemeral=True)
+            return
+
+        selected = {int(v) for v in self.item.values}
+        member = await interaction.client.member_cache.resolve(interaction.guild, interaction.user)
+        is_mod = member.guild_permissions.manage_messages
+        role_queue = interaction.client.role_queue
+        added, removed, denied = [], [], []
+
+        # The selection becomes the member's exact set of roles from this menu
+        claimed_groups = set()
+        for entry in self.menu.entries:
+            role = interaction.guild.get_role(entry.role_id)
+            if not role:
+                continue
+            want = entry.role_id in selected
+            if want and entry.group:
+                if entry.group in claimed_groups:
+                    want = False # Only the first pick in an exclusive group counts
+                claimed_groups.add(entry.group)
+            has = role_queue.will_have_role(member, role)
+            if want == has:
+                continue
+            if entry.requires_mod and not is_mod:
+                denied.append(role.name)
+                continue
+            role_queue.submit(interaction.guild, member.id, role, want, interaction)
+            (added if want else removed).append(role.name)
+
+        lines = []
+        if added:
+            lines.append(f"✅ Added: {', '.join(added)}")
+        if removed:
+            lines.append(f"✅ Removed: {', '.join(removed)}")
+        if denied:
+            lines.append(f"❌ You need Moderator permissions for: {', '.join(denied)}")
+        await interaction.response.send_message("\n".join(lines) or "No changes made.", ephemeral=True)
 
 class RoleButtons(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.config = bot.config
-        
-    # Removed cog_load and generate_button command as they related to removed features
+        self.registry = RoleMenuRegistry.from_config(self.config)
+
+    async def cog_load(self):
+        # One registration per component type, however many roles are configured
+        self.bot.add_dynamic_items(RoleButton, RoleSelect)
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(RoleButton, RoleSelect)
+
+    def reload_menus(self):
+        """Rebuild the role index after the config changes."""
+        self.registry = RoleMenuRegistry.from_config(self.config)
+
+    async def menu_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        return [
+            app_commands.Choice(name=f"{menu.title} ({menu.id})"[:100], value=menu.id)
+            for menu in self.registry.menus.values()
+            if current.lower() in menu.id.lower() or current.lower() in menu.title.lower()
+        ][:25]
+
+    @app_commands.command(
+        name="post-role-menu",
+        description="Post a self-assign role menu (bot owner only)"
+    )
+    @app_commands.describe(menu="The role menu to post", channel="Channel to post in (defaults to this one)")
+    @app_commands.autocomplete(menu=menu_autocomplete)
+    @app_commands.default_permissions(administrator=True)
+    async def post_role_menu(
+        self,
+        interaction: discord.Interaction,
+        menu: str,
+        channel: Optional[discord.TextChannel] = None
+    ):
+        if interaction.user.id != self.bot.owner_id:
+            await interaction.response.send_message(
+                "Only the bot owner can use this command!",
+                ephemeral=True
+            )
+            return
+
+        if not interaction.guild:
+            await interaction.response.send_message("❌ Role menus can only be posted in a server!", ephemeral=True)
+            return
+
+        role_menu = self.registry.menus.get(menu)
+        if not role_menu:
+            await interaction.response.send_message(f"❌ No role menu with ID `{menu}`.", ephemeral=True)
+            return
+
+        target_channel = channel or interaction.channel
+        if not target_channel.permissions_for(interaction.guild.me).send_messages:
+            await interaction.response.send_message(
+                f"❌ I don't have permission to send messages in {target_channel.mention}!",
+                ephemeral=True
+            )
+            return
+
+        # Large menus take several messages, acknowledge before the interaction token times out
+        await interaction.response.defer(ephemeral=True)
+        try:
+            for i, view in enumerate(self.registry.build_views(role_menu)):
+                await target_channel.send(role_menu.title if i == 0 else None, view=view)
+        except discord.HTTPException as e:
+            await interaction.followup.send(f"❌ Failed to post role menu: {str(e)}", ephemeral=True)
+            return
+
+        await interaction.followup.send(
+            f"✅ Role menu `{role_menu.id}` posted in {target_channel.mention}!",
+            ephemeral=True
+        )
 
 async def setup(bot):
     await bot.add_cog(RoleButtons(bot))
@@ -1,17 +1,26 @@
 # cogs/settings.py
+import asyncio
+import io
 import json
-import os
+import logging
 import sys
+import time
+import tracemalloc
 from discord.ext import commands, tasks
 import discord
 from discord import app_commands
 from typing import Optional, Dict
 from datetime import datetime
+from utils.perf import TASK_STATS, profile_event_loop, rss_mb, top_allocations
+from utils.timer_heap import TimerHeap
+
+log = logging.getLogger(__name__)
 
 class Settings(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.config = bot.config
+        self._profiling = False
         
     @app_commands.command(
         name="settings",
@@ -60,16 +69,216 @@ class Settings(commands.Cog):
             )
             return
             
-        member = interaction.guild.get_member(interaction.user.id)
-        if role in member.roles:
-            await member.remove_roles(role)
-            message = "You will no longer receive daily summaries."
-        else:
-            await member.add_roles(role)
+        member = await self.bot.member_cache.resolve(interaction.guild, interaction.user)
+        if self.bot.role_queue.toggle(member, role, interaction):
             message = "You will now receive daily summaries."
+        else:
+            message = "You will no longer receive daily summaries."
             
         await interaction.response.send_message(message, ephemeral=True)
 
+    @app_commands.command(
+        name="shard-status",
+        description="Show gateway latency, event rate and reconnects per shard (bot owner only)"
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def shard_status(self, interaction: discord.Interaction):
+        if interaction.user.id != self.bot.owner_id:
+            await interaction.response.send_message(
+                "Only the bot owner can use this command!",
+                ephemeral=True
+            )
+            return
+
+        lines = ["Shard | Latency | Guilds | Events/min | Reconnects | Disconnects"]
+        for row in self.bot.shard_telemetry.snapshot():
+            latency = f"{row['latency_ms']:.0f} ms" if row['latency_ms'] is not None else "n/a"
+            rate = f"{row['events_per_min']:.0f}" if row['events_per_min'] is not None else "n/a"
+            lines.append(f"{row['shard_id']:>5} | {latency:>7} | {row['guilds']:>6} | {rate:>10} | "
+                         f"{row['reconnects']:>10} | {row['disconnects']:>11}")
+
+        shard_ids = getattr(self.bot, "shard_ids", None)
+        header = (f"Shards in this process: {', '.join(map(str, shard_ids)) if shard_ids is not None else 'all'} "
+                  f"of {self.bot.shard_count or 1}")
+        await interaction.response.send_message(
+            f"{header}\n```\n" + "\n".join(lines)[:1900] + "\n```",
+            ephemeral=True
+        )
+
+    @app_commands.command(
+        name="perf",
+        description="Show performance diagnostics or profile the running bot (bot owner only)"
+    )
+    @app_commands.describe(
+        action="What to do (default: report)",
+        seconds="How long to profile for"
+    )
+    @app_commands.choices(action=[
+        app_commands.Choice(name="Report", value="report"),
+        app_commands.Choice(name="Profile the event loop", value="profile"),
+        app_commands.Choice(name="Stacks of blocking calls", value="blocking"),
+        app_commands.Choice(name="Start allocation tracing", value="tracemalloc-start"),
+        app_commands.Choice(name="Stop allocation tracing", value="tracemalloc-stop"),
+    ])
+    @app_commands.default_permissions(administrator=True)
+    async def perf(self, interaction: discord.Interaction, action: str = "report",
+                   seconds: app_commands.Range[int, 1, 60] = 10):
+        if interaction.user.id != self.bot.owner_id:
+            await interaction.response.send_message(
+                "Only the bot owner can use this command!",
+                ephemeral=True
+            )
+            return
+
+        if action == "tracemalloc-start":
+            if tracemalloc.is_tracing():
+                await interaction.response.send_message("❌ Allocation tracing is already running.", ephemeral=True)
+                return
+            tracemalloc.start(self.config.perf_tracemalloc_frames)
+            await interaction.response.send_message(
+                "✅ Allocation tracing started, `/perf` reports now include the top allocation sites. "
+                "Stop it when done, it slows the bot down.",
+                ephemeral=True
+            )
+        elif action == "tracemalloc-stop":
+            tracemalloc.stop()
+            await interaction.response.send_message("✅ Allocation tracing stopped.", ephemeral=True)
+        elif action == "profile":
+            await self._send_profile(interaction, seconds)
+        elif action == "blocking":
+            sites = self.bot.loop_watchdog.top_sites(limit=50)
+            if not sites:
+                await interaction.response.send_message("✅ No event loop stalls recorded.", ephemeral=True)
+                return
+            text = "\n\n".join(
+                f"{name}: blocked {site.count} times, {site.total_seconds:.2f}s total, longest {site.max_seconds:.2f}s\n"
+                f"{site.stack}"
+                for name, site in sites
+            )
+            await interaction.response.send_message(
+                f"Stacks captured during the longest stall at each of {len(sites)} call sites:",
+                file=discord.File(io.BytesIO(text.encode()), filename="blocking.txt"),
+                ephemeral=True
+            )
+        else:
+            report = self._perf_report()
+            if len(report) > 1900:
+                await interaction.response.send_message(
+                    "Performance report:",
+                    file=discord.File(io.BytesIO(report.encode()), filename="perf.txt"),
+                    ephemeral=True
+                )
+            else:
+                await interaction.response.send_message(f"```\n{report}\n```", ephemeral=True)
+
+    def _perf_report(self) -> str:
+        def ms(seconds):
+            return f"{seconds * 1000:.1f} ms" if seconds is not None else "n/a"
+
+        def pct(rate):
+            return f"{rate:.0%}" if rate is not None else "n/a"
+
+        lines = ["Gateway latency"]
+        for row in self.bot.shard_telemetry.snapshot():
+            latency = f"{row['latency_ms']:.0f} ms" if row['latency_ms'] is not None else "n/a"
+            lines.append(f"  shard {row['shard_id']}: {latency}, {row['reconnects']} reconnects")
+
+        lag = self.bot.loop_lag.percentiles()
+        lines.append(f"Event loop lag ({lag['samples']} samples): p50 {ms(lag['p50'])}, p95 {ms(lag['p95'])}, "
+                     f"p99 {ms(lag['p99'])}, max {ms(lag['max'])}")
+
+        watchdog = self.bot.loop_watchdog
+        lines.append(f"Event loop stalls over {watchdog.threshold * 1000:.0f} ms: {watchdog.stalls}")
+        for name, site in watchdog.top_sites(5):
+            lines.append(f"  {name}: {site.count}x, {site.total_seconds:.2f}s total, longest {site.max_seconds:.2f}s")
+
+        lines.append(f"Background tasks ({len(asyncio.all_tasks())} asyncio tasks)")
+        for cog_name, cog in self.bot.cogs.items():
+            for name in dir(type(cog)):
+                if isinstance(getattr(type(cog), name, None), tasks.Loop):
+                    loop = getattr(cog, name)
+                    state = "failed" if loop.failed() else "running" if loop.is_running() else "stopped"
+                    lines.append(f"  {cog_name}.{name}: {state}, iteration {loop.current_loop}")
+        for name, stats in TASK_STATS.items():
+            last = f"{stats.last_duration:.2f}s" if stats.last_duration is not None else "n/a"
+            ago = f", {time.time() - stats.last_started:.0f}s ago" if stats.last_started else ""
+            lines.append(f"  {name}: {stats.runs} runs, {stats.failures} failed, last took {last}{ago}"
+                         + (" (running)" if stats.running else ""))
+            if stats.last_error:
+                lines.append(f"    last error: {stats.last_error[:150]}")
+        for cog in self.bot.cogs.values():
+            scheduler = getattr(cog, "scheduler", None)
+            if isinstance(scheduler, TimerHeap):
+                timers = scheduler.stats()
+                lines.append(f"  timers[{scheduler.name}]: {timers['pending']} pending, {timers['fired']} fired, "
+                             f"jitter p99 {ms(timers['jitter_p99_s'])}")
+
+        members = self.bot.member_cache.stats()
+        http = self.bot.http_client.stats()
+        lines.append("Caches")
+        if self.bot.get_cog("YouTubeFeatures"): # The metadata cache is only built once a YouTube cog uses it
+            metadata = self.bot.metadata_cache.stats()
+            lines.append(f"  metadata: {metadata['entries']} entries, hit rate {pct(metadata['hit_rate'])}, "
+                         f"{metadata['coalesced']} coalesced")
+        lines.append(f"  members ({self.config.member_cache_mode}): {members['entries']} entries, "
+                     f"hit rate {pct(members['hit_rate'])}")
+        reused = http['connections_created'] + http['connections_reused']
+        lines.append(f"  http: {http['requests']} requests, {http['errors']} errors, connection reuse "
+                     f"{pct(http['connections_reused'] / reused if reused else None)}")
+
+        resilience = self.bot.resilience.stats()
+        lines.append(f"Circuit breakers ({resilience['retries']} retries, budget {resilience['retry_budget_tokens']} tokens, "
+                     f"exhausted {resilience['retry_budget_exhausted']}x)")
+        for endpoint, breaker in resilience['breakers'].items():
+            lines.append(f"  {endpoint}: {breaker['state']}, {breaker['calls']} calls, {breaker['failures']} failed, "
+                         f"{breaker['short_circuited']} fast-failed, opened {breaker['opens']}x")
+
+        monitor = self.bot.get_cog('YouTubeMonitor')
+        if monitor and monitor.providers:
+            lines.append("Live detection: " + ", ".join(
+                f"{provider.platform} {'live' if provider.platform in monitor.live else 'offline'} "
+                f"(waited {provider.rate_limiter.waited:.1f}s on its rate limit)" for provider in monitor.providers
+            ))
+
+        quota = self.bot.youtube_keys.stats()
+        lines.append(f"YouTube quota today ({quota['day']}, Pacific): {quota['used']} used, {quota['remaining']} left "
+                     f"across {len(quota['keys'])} key(s), {quota['switches']} key switches")
+        for name, key in quota['keys'].items():
+            methods = ", ".join(f"{method} {units}" for method, units in sorted(key['by_method'].items(), key=lambda item: -item[1]))
+            lines.append(f"  key {name}: {key['used']}/{key['limit']} units" + (" (out of quota)" if key['exhausted'] else "")
+                         + (f" - {methods}" if methods else ""))
+
+        lines.append(f"RSS: {rss_mb():.1f} MB")
+        allocations = top_allocations()
+        if allocations is None:
+            lines.append("Allocation tracing is off (/perf action:Start allocation tracing)")
+        else:
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"Top allocation sites (traced {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB)")
+            lines.extend(f"  {line}" for line in allocations)
+        return "\n".join(lines)
+
+    async def _send_profile(self, interaction: discord.Interaction, seconds: int):
+        if self._profiling:
+            await interaction.response.send_message("❌ A profile is already running.", ephemeral=True)
+            return
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        self._profiling = True
+        try:
+            profiler = await profile_event_loop(seconds)
+        finally:
+            self._profiling = False
+
+        top = "\n".join(f"{share:6.1%}  {leaf}" for leaf, share in profiler.top_functions(10))
+        filename = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded"
+        await interaction.followup.send(
+            f"Profiled the event loop for {seconds}s ({profiler.samples} samples). "
+            f"Most sampled frames:\n```\n{top[:1700]}\n```"
+            "Frames in select() are the loop idling. The attachment is in folded-stack format (flamegraph.pl / speedscope).",
+            file=discord.File(io.BytesIO(profiler.folded().encode()), filename=filename),
+            ephemeral=True
+        )
+
 class SettingsView(discord.ui.View):
     def __init__(self, bot):
         super().__init__(timeout=180) # Add timeout
@@ -83,16 +292,7 @@ class SettingsView(discord.ui.View):
 
     @discord.ui.button(label="YouTube Monitor", style=discord.ButtonStyle.secondary, row=0)
     async def youtube_monitor(self, interaction: discord.Interaction, button: discord.ui.Button):
-        # Ensure YouTube API key is set before allowing config
-        api_key = os.getenv('YOUTUBE_API_KEY')
-        if not api_key:
-             await interaction.response.send_message(
-                 "Error: `YOUTUBE_API_KEY` is not set in the bot's environment variables (`.env` file). "
-                 "Please set it before configuring the YouTube Monitor.",
-                 ephemeral=True
-             )
-             return
-
+        # No API key check here, Twitch/Kick-only monitoring doesn't need one; on_submit checks it for YouTube
         modal = YouTubeMonitorSettings(self.config)
         await interaction.response.send_modal(modal)
 
@@ -192,8 +392,16 @@ class DailySummarySettings(discord.ui.Modal, title="Daily Summary Settings"):
             self.config.daily_summary_time = self.time.value
             self.config.daily_summary_enabled = self.enabled.value.lower() == 'true'
             self.config.save()
+
+            # The summary role is part of the role menu index, rebuild it
+            role_cog = interaction.client.get_cog('RoleButtons')
+            if role_cog:
+                role_cog.reload_menus()
             
-            # TODO: If daily summary logic is moved elsewhere, update restart logic here
+            # Reschedule the summary for the new time/channel
+            summary_cog = interaction.client.get_cog('DailySummary')
+            if summary_cog:
+                summary_cog.restart()
             
             await interaction.response.send_message(
                 f"Daily summary settings updated!\n"
@@ -270,7 +478,7 @@ class YouTubeMonitorSettings(discord.ui.Modal, title="YouTube Monitor Settings")
 
         self.announcement_message = discord.ui.TextInput(
             label='Announcement Message Template',
-            placeholder='Variables: {streamer_name}, {stream_url}, {other_links}', # Corrected indentation
+            placeholder='Variables: {streamer_name}, {stream_url}, {other_links}, {platform}, {title}', # Corrected indentation
             default=config.youtube_monitor_announcement_message, # Corrected indentation
             style=discord.TextStyle.paragraph, # Corrected indentation
             required=True, # Corrected indentation
@@ -289,8 +497,15 @@ class YouTubeMonitorSettings(discord.ui.Modal, title="YouTube Monitor Settings")
             errors.append("Enable Monitor value must be 'true' or 'false'.")
 
         yt_channel_id = self.youtube_channel_id.value.strip() or None
+        bot = interaction.client
+        if yt_channel_id and not bot.youtube_keys:
+            errors.append("Checking a YouTube Channel ID needs `YOUTUBE_API_KEYS` or `YOUTUBE_API_KEY` in the bot's "
+                          "environment variables (`.env` file). Leave it empty to monitor only Twitch/Kick.")
         if is_enabled and not yt_channel_id:
-            errors.append("YouTube Channel ID is required when the monitor is enabled.")
+            from utils.live_providers import providers_from_config # Only needed here, the monitor cog imports it
+            if not providers_from_config(self.config, bot.http_client, bot.resilience):
+                errors.append("A YouTube Channel ID, or Twitch/Kick links under Platform Links, "
+                              "is required when the monitor is enabled.")
 
         discord_ch_id_str = self.discord_channel_id.value.strip()
         discord_ch_id = None
@@ -339,6 +554,7 @@ class YouTubeMonitorSettings(discord.ui.Modal, title="YouTube Monitor Settings")
 
         # --- Save Config ---
         try:
+            previous_interval = self.config.youtube_monitor_check_interval_minutes
             self.config.youtube_monitor_enabled = is_enabled
             self.config.youtube_channel_id = yt_channel_id
             self.config.youtube_monitor_discord_channel_id = discord_ch_id
@@ -349,14 +565,20 @@ class YouTubeMonitorSettings(discord.ui.Modal, title="YouTube Monitor Settings")
 
             # Find the cog instance to potentially restart its task
             monitor_cog = interaction.client.get_cog('YouTubeMonitor')
+            if is_enabled and not monitor_cog:
+                # The monitor cog is only loaded at startup when enabled, load it now
+                try:
+                    await interaction.client.load_extension("cogs.youtube_monitor")
+                    monitor_cog = interaction.client.get_cog('YouTubeMonitor')
+                except commands.ExtensionError as e:
+                    log.error(f"Error loading YouTube Monitor cog: {e}")
             restart_needed = False
             if monitor_cog:
                 # Check if the task needs restarting (enabled status changed or interval changed)
-                if hasattr(monitor_cog, 'monitor_loop'):
-                     current_interval = monitor_cog.monitor_loop.minutes
-                     if monitor_cog.monitor_loop.is_running() != is_enabled or current_interval != interval_minutes:
+                if hasattr(monitor_cog, 'reschedule'):
+                     if monitor_cog.monitor_loop.is_running() != is_enabled or previous_interval != interval_minutes:
                          restart_needed = True
-                         monitor_cog.monitor_loop.restart() # Restart task with new settings
+                         monitor_cog.reschedule() # Restart task with new settings
 
             message = "YouTube Monitor settings updated!"
             if restart_needed:
@@ -370,7 +592,7 @@ class YouTubeMonitorSettings(discord.ui.Modal, title="YouTube Monitor Settings")
             await interaction.response.send_message(message, ephemeral=True)
 
         except Exception as e:
-            print(f"Error saving YouTube Monitor config: {e}") # Log error server-side
+            log.exception(f"Error saving YouTube Monitor config: {e}")
             await interaction.response.send_message(
                 f"An unexpected error occurred while saving the settings: {e}",
                 ephemeral=True
@@ -462,6 +684,11 @@ class PlatformLinksSettings(discord.ui.Modal, title="Platform Links Settings"):
             self.config.youtube_monitor_platform_links = platform_links_dict
             self.config.save()
 
+            # Twitch/Kick live detection follows the links
+            monitor_cog = interaction.client.get_cog('YouTubeMonitor')
+            if monitor_cog and hasattr(monitor_cog, 'reschedule'):
+                monitor_cog.reschedule()
+
             message = "Platform Links updated!"
             if platform_links_dict:
                 message += "\nConfigured platforms:\n" + "\n".join([f"- {name}: {url}" for name, url in platform_links_dict.items()])
@@ -471,7 +698,7 @@ class PlatformLinksSettings(discord.ui.Modal, title="Platform Links Settings"):
             await interaction.response.send_message(message, ephemeral=True)
 
         except Exception as e:
-            print(f"Error saving Platform Links config: {e}") # Log error server-side
+            log.exception(f"Error saving Platform Links config: {e}")
             await interaction.response.send_message(
                 f"An unexpected error occurred while saving the settings: {e}",
                 ephemeral=True
@@ -480,7 +707,7 @@ class PlatformLinksSettings(discord.ui.Modal, title="Platform Links Settings"):
 async def setup(bot):
     # Ensure config is loaded before adding cog
     if not hasattr(bot, 'config'):
-        print("Error: Bot config not loaded before Settings cog setup.")
+        log.error("Bot config not loaded before Settings cog setup.")
         # Handle appropriately, maybe raise an exception or load config here
         from config import BotConfig # Avoid circular import if possible
         bot.config = BotConfig.load()
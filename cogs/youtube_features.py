@@ -2,31 +2,55 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from googleapiclient.discovery import build
 import os
 import re
 from datetime import datetime, timedelta
 import pytz
 import asyncio
-from typing import Optional, Dict, List, Tuple
+import logging
+from typing import Optional, Dict, Iterable, List, Tuple
 import aiohttp
 import json
+import tempfile
+import zipfile
+from utils.chat_index import ChatIndex
+from utils.logging_setup import bind_log_context
+from utils.offload import ProcessOffload
+from utils.quota import METHOD_COSTS, QuotaExhaustedError
+from utils.resilience import CircuitOpenError
+from utils.chat_parsing import parse_watch_page
+from utils.transcript_formats import (
+    ENCODERS, ColumnarEncoder, ColumnarTranscript, TranscriptSummary, convert_transcript_file, get_encoder,
+    write_chat_payload
+)
+from utils.transcript_jobs import JobWaiter, TranscriptJob, TranscriptJobQueue
 
-class ChatMessage:
-    def __init__(self, timestamp: datetime, author: str, message: str):
-        self.timestamp = timestamp
-        self.author = author
-        self.message = message
+log = logging.getLogger(__name__)
 
-    def __str__(self):
-        return f"[{self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {self.author}: {self.message}"
+VIDEOS_LIST_MAX_IDS = 50 # videos.list / playlistItems.list accept at most 50 IDs/results per call
 
 class YouTubeFeatures(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.youtube = build('youtube', 'v3', 
-                           developerKey=os.getenv('YOUTUBE_API_KEY'))
-        
+        self.http = bot.http_client
+        self.offload = ProcessOffload.from_config(bot.config) # Process pool for CPU-bound parsing/formatting
+        self.metadata_cache = bot.metadata_cache # YouTube video metadata, shared across cogs
+        self.youtube_keys = bot.youtube_keys
+        self.chat_index = ChatIndex(bot.config.chat_index_path)
+        self.jobs = TranscriptJobQueue(
+            self._run_transcript_job,
+            workers=bot.config.transcript_job_workers,
+            max_pending=bot.config.transcript_job_max_pending
+        )
+
+    async def cog_load(self):
+        self.jobs.start()
+
+    async def cog_unload(self):
+        await self.jobs.stop()
+        self.chat_index.close()
+        self.offload.shutdown()
+
     def extract_video_id(self, url: str) -> Optional[str]:
         """Extract video ID from various YouTube URL formats."""
         patterns = [
@@ -40,202 +64,202 @@ class YouTubeFeatures(commands.Cog):
                 return match.group(1)
         return None
 
+    def extract_playlist_id(self, url: str) -> Optional[str]:
+        """Extract a playlist ID from a YouTube playlist URL."""
+        match = re.search(r'[?&]list=([0-9A-Za-z_-]+)', url)
+        return match.group(1) if match else None
+
+    def _parse_stream_details(self, video: dict) -> Optional[dict]:
+        details = video.get('liveStreamingDetails', {})
+        if not details:
+            log.debug("No livestreaming details found", extra={"video_id": video.get('id')})
+            return None
+
+        return {
+            'title': video['snippet'].get('title', 'Unknown Stream'),
+            'start_time': details.get('actualStartTime'),
+            'end_time': details.get('actualEndTime'),
+            'is_live': details.get('actualEndTime') is None
+        }
+
     async def get_stream_details(self, video_id: str) -> Optional[dict]:
         """Get details about the stream."""
         try:
-            request = self.youtube.videos().list(
-                part="snippet,liveStreamingDetails",
-                id=video_id
-            )
-            response = request.execute()
-            
-            if not response['items']:
-                print(f"No video found for ID: {video_id}")
+            details, _ = await self.get_streams_details([video_id])
+            if video_id not in details:
+                log.info("No livestream found", extra={"video_id": video_id})
                 return None
-                
-            video = response['items'][0]
-            details = video.get('liveStreamingDetails', {})
-            
-            print(f"Stream details for {video_id}:")
-            print(f"Title: {video['snippet'].get('title', 'Unknown')}")
-            print(f"LiveStreamingDetails: {json.dumps(details, indent=2)}")
-            
-            if not details:
-                print("No livestreaming details found")
-                return None
-                
-            return {
-                'title': video['snippet'].get('title', 'Unknown Stream'),
-                'start_time': details.get('actualStartTime'),
-                'end_time': details.get('actualEndTime'),
-                'is_live': details.get('actualEndTime') is None
-            }
+            log.debug(f"Stream details: {details[video_id]['title']}", extra={"video_id": video_id})
+            return details[video_id]
         except Exception as e:
-            print(f"Error getting stream details: {e}")
+            log.exception(f"Error getting stream details: {e}", extra={"video_id": video_id})
             return None
 
-    async def get_chat_replay(self, video_id: str, duration_minutes: int = 180) -> List[ChatMessage]:
-        """Get chat replay for a completed stream using YouTube's archive format."""
-        messages = []
+    async def get_streams_details(self, video_ids: List[str]) -> Tuple[Dict[str, dict], int]:
+        """
+        Get stream details for many videos through the shared metadata cache. Misses are
+        fetched with batched videos.list calls (50 IDs each).
+        Returns ({video_id: details} for livestreams only, API units used).
+        """
+        units = 0
+
+        async def fetch(missing: List[str]) -> Dict[str, dict]:
+            nonlocal units
+            items = {}
+            for start in range(0, len(missing), VIDEOS_LIST_MAX_IDS):
+                batch = missing[start:start + VIDEOS_LIST_MAX_IDS]
+                response = await self.youtube_keys.execute("videos.list", lambda youtube: youtube.videos().list(
+                    part="snippet,liveStreamingDetails",
+                    id=",".join(batch),
+                    maxResults=VIDEOS_LIST_MAX_IDS
+                ))
+                units += METHOD_COSTS["videos.list"]
+                items.update((video['id'], video) for video in response.get('items', []))
+            return items
+
+        videos = await self.metadata_cache.get_videos(video_ids, fetch)
+        results = {}
+        for video_id, video in videos.items():
+            details = self._parse_stream_details(video) if video else None
+            if details:
+                results[video_id] = details
+        return results, units
+
+    async def get_playlist_video_ids(self, playlist_id: str, limit: int) -> Tuple[List[str], int]:
+        """Resolve a playlist to video IDs (50 per page). Returns (video_ids, API units used)."""
+        video_ids = []
+        units = 0
+        page_token = None
+        while len(video_ids) < limit:
+            response = await self.youtube_keys.execute("playlistItems.list", lambda youtube: youtube.playlistItems().list(
+                part="contentDetails",
+                playlistId=playlist_id,
+                maxResults=VIDEOS_LIST_MAX_IDS,
+                pageToken=page_token
+            ))
+            units += METHOD_COSTS["playlistItems.list"]
+            video_ids.extend(item['contentDetails']['videoId'] for item in response.get('items', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+        return video_ids[:limit], units
+
+    async def _fetch_text(self, method: str, url: str, **kwargs) -> str:
+        """Fetch a page through the shared session, raising on error statuses so retries and the circuit see them."""
+        async with self.http.session.request(method, url, **kwargs) as response:
+            response.raise_for_status()
+            return await response.text()
+
+    async def get_chat_replay(self, video_id: str, spool: str, stream_details: dict,
+                              duration_minutes: int = 180) -> Optional[TranscriptSummary]:
+        """
+        Get chat replay for a completed stream using YouTube's archive format. The messages are
+        written to `spool` as a columnar transcript, read them back with ColumnarTranscript.
+        Returns None if the replay couldn't be fetched.
+        """
+        summary = None
         
         try:
-            async with aiohttp.ClientSession() as session:
-                # Get video page to extract initial data
-                initial_url = f"https://www.youtube.com/watch?v={video_id}"
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                    'Accept-Language': 'en-US,en;q=0.9'
-                }
-                
-                async with session.get(initial_url, headers=headers) as response:
-                    if response.status != 200:
-                        print(f"Failed to get video page: {response.status}")
-                        return messages
-                        
-                    html = await response.text()
-                    
-                    # Find the initial data
-                    ytcfg_pattern = r'ytcfg\.set\s*\(\s*({.+?})\s*\)\s*;'
-                    matches = re.finditer(ytcfg_pattern, html)
-                    client_version = "2.20240201.01.00"
-                    api_key = None
-                    
-                    for match in matches:
-                        try:
-                            cfg_data = json.loads(match.group(1))
-                            if 'INNERTUBE_API_KEY' in cfg_data:
-                                api_key = cfg_data['INNERTUBE_API_KEY']
-                            if 'INNERTUBE_CLIENT_VERSION' in cfg_data:
-                                client_version = cfg_data['INNERTUBE_CLIENT_VERSION']
-                        except json.JSONDecodeError:
-                            continue
-                    
-                    if not api_key:
-                        print("Could not find API key")
-                        return messages
+            # Get video page to extract initial data
+            initial_url = f"https://www.youtube.com/watch?v={video_id}"
+            headers = {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                'Accept-Language': 'en-US,en;q=0.9'
+            }
+            
+            try:
+                html = await self.bot.resilience.call("scrape.youtube", self._fetch_text, "GET", initial_url, headers=headers)
+            except (aiohttp.ClientResponseError, CircuitOpenError) as e:
+                log.warning(f"Failed to get video page: {e}")
+                return summary
+
+            # Regex + json.loads over the whole watch page is CPU-heavy, keep it off the event loop
+            page_info = await self.offload.run(parse_watch_page, html)
+            if page_info.error:
+                log.warning(page_info.error)
+                return summary
+
+            continuation_token = page_info.continuation_token
+            log.debug(f"Found continuation token: {continuation_token}")
+            
+            # Now get the actual chat data
+            chat_url = f"https://www.youtube.com/youtubei/v1/get_transcript?key={page_info.api_key}"
+            request_data = {
+                "context": {
+                    "client": {
+                        "clientName": "DESKTOP",
+                        "clientVersion": page_info.client_version,
+                        "hl": "en",
+                        "gl": "US",
+                    },
+                },
+                "params": continuation_token
+            }
+            
+            try:
+                payload = await self.bot.resilience.call(
+                    "scrape.youtube", self._fetch_text, "POST", chat_url, json=request_data, headers=headers
+                )
+            except (aiohttp.ClientResponseError, CircuitOpenError) as e:
+                log.warning(f"Failed to get chat data: {e}")
+                return summary
+            log.debug("Got chat data response, processing")
+
+            try:
+                # Parsing and encoding both happen in the worker, only the summary comes back
+                summary = await self.offload.run(
+                    write_chat_payload, payload, spool, ColumnarEncoder.name, video_id, stream_details
+                )
+                log.info(f"Processed {summary.count} chat messages")
+            except Exception as e:
+                log.exception(f"Error processing chat data: {e}")
+                return summary
                     
-                    # Get the chat continuation token
-                    initial_data_pattern = r'window\["ytInitialData"\]\s*=\s*({.+?});'
-                    data_match = re.search(initial_data_pattern, html)
-                    if not data_match:
-                        print("Could not find initial data")
-                        return messages
-                        
-                    try:
-                        initial_data = json.loads(data_match.group(1))
-                        print("Found initial data, searching for transcript info...")
-                        
-                        # Try to find the transcript continuation token
-                        transcript_renderer = None
-                        try:
-                            tabs = initial_data['engagementPanels']
-                            for tab in tabs:
-                                if 'engagementPanelSectionListRenderer' in tab:
-                                    content = tab['engagementPanelSectionListRenderer'].get('content', {})
-                                    if 'continuationItemRenderer' in content:
-                                        transcript_renderer = content['continuationItemRenderer']
-                                        break
-                        except Exception as e:
-                            print(f"Error finding transcript renderer: {e}")
-                            return messages
-                        
-                        if not transcript_renderer:
-                            print("Could not find transcript renderer")
-                            return messages
-                            
-                        continuation_token = transcript_renderer['continuationEndpoint']['continuationCommand']['token']
-                        print(f"Found continuation token: {continuation_token}")
-                        
-                        # Now get the actual chat data
-                        chat_url = f"https://www.youtube.com/youtubei/v1/get_transcript?key={api_key}"
-                        request_data = {
-                            "context": {
-                                "client": {
-                                    "clientName": "DESKTOP",
-                                    "clientVersion": client_version,
-                                    "hl": "en",
-                                    "gl": "US",
-                                },
-                            },
-                            "params": continuation_token
-                        }
-                        
-                        async with session.post(chat_url, json=request_data, headers=headers) as chat_response:
-                            if chat_response.status != 200:
-                                print(f"Failed to get chat data: {chat_response.status}")
-                                return messages
-                                
-                            chat_data = await chat_response.json()
-                            print(f"Got chat data response. Processing...")
-                            
-                            try:
-                                actions = chat_data['actions']
-                                for action in actions:
-                                    if 'addChatItemAction' not in action:
-                                        continue
-                                        
-                                    item = action['addChatItemAction']['item']
-                                    if 'liveChatTextMessageRenderer' not in item:
-                                        continue
-                                        
-                                    renderer = item['liveChatTextMessageRenderer']
-                                    author = renderer.get('authorName', {}).get('simpleText', 'Unknown')
-                                    
-                                    # Get message text
-                                    message_runs = renderer.get('message', {}).get('runs', [])
-                                    message_text = ' '.join(run.get('text', '') for run in message_runs if 'text' in run)
-                                    
-                                    # Get timestamp
-                                    timestamp_usec = int(renderer.get('timestampUsec', 0)) // 1000
-                                    msg_time = datetime.fromtimestamp(timestamp_usec / 1000000, pytz.UTC)
-                                    
-                                    messages.append(ChatMessage(msg_time, author, message_text))
-                                    
-                                print(f"Processed {len(messages)} messages")
-                                
-                            except Exception as e:
-                                print(f"Error processing chat data: {e}")
-                                print(f"Chat data structure: {json.dumps(chat_data, indent=2)}")
-                                return messages
-                                
-                    except json.JSONDecodeError as e:
-                        print(f"Error parsing initial data: {e}")
-                        return messages
-                        
         except Exception as e:
-            print(f"Error getting chat replay: {e}")
-            print(f"Full error: {str(e)}")
+            log.exception(f"Error getting chat replay: {e}")
             
-        return sorted(messages, key=lambda x: x.timestamp)
+        return summary
+
+    def _new_spool(self, video_id: str) -> str:
+        """Temporary file for a scraped transcript, removed by the caller once every format is written."""
+        fd, spool = tempfile.mkstemp(prefix=f"chat_{video_id}_", suffix=f".{ColumnarEncoder.extension}")
+        os.close(fd)
+        return spool
 
-    def save_transcript(self, messages: List[ChatMessage], video_id: str, stream_details: dict) -> str:
-        """Save chat messages to a transcript file."""
+    async def _index_transcript(self, video_id: str, stream_details: dict, spool: str):
+        """Add a scraped transcript to the search index so /search-chat can find it later."""
+        try:
+            with ColumnarTranscript(spool) as transcript:
+                await self.chat_index.ingest(video_id, stream_details, transcript.iter_messages())
+        except Exception as e:
+            log.exception(f"Error indexing transcript: {e}")
+
+    async def save_transcript(self, spool: str, video_id: str, stream_details: dict, fmt: str = "text",
+                              directory: str = "") -> str:
+        """Save a scraped transcript (see get_chat_replay) to a file in `directory` using the selected export format."""
+        encoder = get_encoder(fmt)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"transcript_{video_id}_{timestamp}.txt"
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"YouTube Livestream Chat Transcript\n")
-            f.write(f"Stream Title: {stream_details['title']}\n")
-            f.write(f"Video ID: {video_id}\n")
-            f.write(f"Stream Start: {stream_details.get('start_time', 'Unknown')}\n")
-            f.write(f"Stream End: {stream_details.get('end_time', 'Unknown')}\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("-" * 80 + "\n\n")
-            
-            for msg in messages:
-                f.write(f"{str(msg)}\n")
-                
+        filename = os.path.join(directory, f"transcript_{video_id}_{timestamp}.{encoder.extension}")
+
+        # Formatting a large transcript is CPU-bound, so it runs in the offload pool. The worker
+        # reads the spool from disk, so only file names cross the process boundary.
+        await self.offload.run(convert_transcript_file, spool, filename, fmt, video_id, stream_details)
         return filename
 
     @app_commands.command(
         name="generate-transcript",
         description="Generate a chat transcript from a YouTube livestream"
     )
+    @app_commands.describe(format="File format for the transcript (default: text)")
+    @app_commands.choices(format=[
+        app_commands.Choice(name=name, value=name) for name in ENCODERS
+    ])
     async def generate_transcript(
         self, 
         interaction: discord.Interaction, 
         url: str,
-        duration_minutes: Optional[int] = 180
+        duration_minutes: Optional[int] = 180,
+        format: Optional[str] = "text"
     ):
         await interaction.response.defer()
         
@@ -248,69 +272,382 @@ class YouTubeFeatures(commands.Cog):
             return
 
         try:
-            stream_details = await self.get_stream_details(video_id)
+            job = self.jobs.get(video_id)
+            # Reuse the running job's details rather than spending quota on another lookup
+            stream_details = job.stream_details if job else await self.get_stream_details(video_id)
             if not stream_details:
                 await interaction.followup.send(
                     "❌ This doesn't appear to be a livestream URL.",
                     ephemeral=True
                 )
                 return
-                
+
+            status_message = await interaction.followup.send(
+                "📝 Queueing transcript...",
+                ephemeral=True,
+                wait=True
+            )
+            waiter = JobWaiter(interaction, status_message, format or "text")
+            try:
+                job, created = await self.jobs.submit(video_id, stream_details, waiter)
+            except asyncio.QueueFull:
+                await status_message.edit(
+                    content="❌ Too many transcripts are being generated right now. Please try again later."
+                )
+                return
+
+            status = self.jobs.describe(job)
+            if not created:
+                status += "\nSomeone already requested this stream, you'll get the same transcript when it's ready."
+            await status_message.edit(content=status)
+            
+        except Exception as e:
+            log.exception(f"Error generating transcript: {e}")
             await interaction.followup.send(
-                "📝 Collecting chat messages... This may take a few minutes.",
+                "❌ An error occurred while generating the transcript. "
+                "Please try again later or contact the bot owner.",
                 ephemeral=True
             )
-            
-            messages = await self.get_chat_replay(video_id, duration_minutes)
-            
-            if not messages:
+
+    async def _run_transcript_job(self, job: TranscriptJob):
+        """Worker body for a transcript job: scrape once, then deliver to every waiter."""
+        bind_log_context(video_id=job.video_id) # Each job runs in its own task
+
+        await job.update("📝 Collecting chat messages... This may take a few minutes.", force=True)
+        spool = self._new_spool(job.video_id)
+        try:
+            await self._deliver_job(job, spool)
+        finally:
+            os.remove(spool)
+
+    async def _deliver_job(self, job: TranscriptJob, spool: str):
+        """Scrape the chat into the spool file, index it, and send each waiter a file in their format."""
+        video_id = job.video_id
+        stream_details = job.stream_details
+        summary = await self.get_chat_replay(video_id, spool, stream_details)
+
+        if not summary or not summary.count:
+            job.accepting = False
+            await job.update(
+                "❌ No chat messages found in the stream. The stream might be too old or chat replay might be disabled.",
+                force=True
+            )
+            return
+
+        await job.update(f"📝 Retrieved {summary.count:,} messages, writing transcript...", force=True)
+
+        await self._index_transcript(video_id, stream_details, spool)
+
+        # Create embed with information
+        embed = discord.Embed(
+            title="📝 Chat Transcript Generated",
+            description=f"Stream: {stream_details['title']}",
+            color=discord.Color.green(),
+            timestamp=datetime.now()
+        )
+        
+        embed.add_field(
+            name="Messages Retrieved",
+            value=f"{summary.count:,}",
+            inline=True
+        )
+        
+        embed.add_field(
+            name="Time Range",
+            value=f"From: {summary.first.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                  f"To: {summary.last.strftime('%Y-%m-%d %H:%M:%S')}",
+            inline=False
+        )
+
+        # Encode once per requested format and send the file to everyone waiting on it
+        async def send_format(fmt: str, waiters: List[JobWaiter]):
+            filename = await self.save_transcript(spool, video_id, stream_details, fmt)
+            try:
+                for waiter in waiters:
+                    await self._deliver_transcript(waiter, filename, embed)
+            finally:
+                # Clean up the file
+                os.remove(filename)
+
+        await job.deliver(send_format)
+        await job.update("✅ Transcript ready!", force=True)
+
+    async def _deliver_transcript(self, waiter: JobWaiter, filename: str, embed: discord.Embed):
+        try:
+            with open(filename, 'rb') as f:
+                await waiter.interaction.followup.send(
+                    embed=embed,
+                    file=discord.File(f, filename=filename)
+                )
+        except discord.HTTPException as e:
+            # Interaction tokens expire after 15 minutes, so fall back to the channel
+            log.warning(f"Followup delivery failed ({e}), sending transcript to channel instead")
+            channel = waiter.interaction.channel
+            if channel:
+                with open(filename, 'rb') as f:
+                    await channel.send(
+                        f"<@{waiter.user_id}> your transcript is ready.",
+                        embed=embed,
+                        file=discord.File(f, filename=filename)
+                    )
+
+    @app_commands.command(
+        name="cancel-transcript",
+        description="Cancel your pending chat transcript request for a YouTube livestream"
+    )
+    async def cancel_transcript(self, interaction: discord.Interaction, url: str):
+        video_id = self.extract_video_id(url)
+        if not video_id:
+            await interaction.response.send_message(
+                "❌ Invalid YouTube URL. Please provide a valid YouTube video URL.",
+                ephemeral=True
+            )
+            return
+
+        if await self.jobs.cancel(video_id, interaction.user.id):
+            await interaction.response.send_message("✅ Your transcript request was cancelled.", ephemeral=True)
+        else:
+            await interaction.response.send_message(
+                "You don't have a pending transcript request for that stream.",
+                ephemeral=True
+            )
+
+    async def _bulk_fetch(self, video_id: str, stream_details: dict, fmt: str,
+                          semaphore: asyncio.Semaphore, workdir: str) -> Tuple[str, Optional[str], int]:
+        """Fetch and save one transcript for the bulk pipeline. Returns (video_id, filename, message count)."""
+        async with semaphore:
+            bind_log_context(video_id=video_id) # Each bulk fetch runs in its own task
+            spool = self._new_spool(video_id)
+            try:
+                summary = await self.get_chat_replay(video_id, spool, stream_details)
+                if not summary or not summary.count:
+                    return video_id, None, 0
+                await self._index_transcript(video_id, stream_details, spool)
+                # Written straight into the workdir, it may be on another filesystem than the bot's cwd
+                filename = await self.save_transcript(spool, video_id, stream_details, fmt, directory=workdir)
+            finally:
+                os.remove(spool)
+            return video_id, filename, summary.count
+
+    def _write_archive(self, archive_path: str, results: List[Tuple[str, Optional[str], int]],
+                       details: Dict[str, dict], skipped: List[str]):
+        with zipfile.ZipFile(archive_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            summary = ["video_id\tmessages\ttitle"]
+            for video_id, filename, count in results:
+                if filename:
+                    archive.write(filename, arcname=os.path.basename(filename))
+                summary.append(f"{video_id}\t{count if filename else 'no chat'}\t{details[video_id]['title']}")
+            for video_id in skipped:
+                summary.append(f"{video_id}\tnot a livestream\t")
+            archive.writestr("summary.tsv", "\n".join(summary) + "\n")
+
+    @app_commands.command(
+        name="bulk-transcript",
+        description="Generate chat transcripts for a playlist or several YouTube livestreams as one archive"
+    )
+    @app_commands.describe(
+        urls="A playlist URL, or several video URLs separated by spaces or commas",
+        format="File format for the transcripts (default: text)"
+    )
+    @app_commands.choices(format=[
+        app_commands.Choice(name=name, value=name) for name in ENCODERS
+    ])
+    @app_commands.default_permissions(manage_messages=True)
+    async def bulk_transcript(
+        self,
+        interaction: discord.Interaction,
+        urls: str,
+        format: Optional[str] = "text"
+    ):
+        if not interaction.guild:
+            await interaction.response.send_message(
+                "❌ This command can only be used in a server!",
+                ephemeral=True
+            )
+            return
+
+        if not interaction.user.guild_permissions.manage_messages:
+            await interaction.response.send_message(
+                "❌ You need Moderator permissions to use this command!",
+                ephemeral=True
+            )
+            return
+
+        await interaction.response.defer()
+        max_videos = self.bot.config.bulk_transcript_max_videos
+
+        try:
+            # Resolve every input to video IDs, expanding playlists
+            units = 0
+            video_ids = []
+            for part in re.split(r'[\s,]+', urls.strip()):
+                if not part:
+                    continue
+                playlist_id = self.extract_playlist_id(part)
+                video_id = self.extract_video_id(part)
+                if playlist_id and (not video_id or '/playlist' in part):
+                    ids, used = await self.get_playlist_video_ids(playlist_id, max_videos)
+                    units += used
+                    video_ids.extend(ids)
+                elif video_id:
+                    video_ids.append(video_id)
+            video_ids = list(dict.fromkeys(video_ids))[:max_videos]
+
+            if not video_ids:
                 await interaction.followup.send(
-                    "❌ No chat messages found in the stream. The stream might be too old or chat replay might be disabled.",
+                    "❌ No valid YouTube video or playlist URLs found.",
                     ephemeral=True
                 )
                 return
-                
-            filename = self.save_transcript(messages, video_id, stream_details)
-            
-            # Create embed with information
-            embed = discord.Embed(
-                title="📝 Chat Transcript Generated",
-                description=f"Stream: {stream_details['title']}",
-                color=discord.Color.green(),
-                timestamp=datetime.now()
+
+            details, used = await self.get_streams_details(video_ids)
+            units += used
+            streams = [vid for vid in video_ids if vid in details]
+            skipped = [vid for vid in video_ids if vid not in details]
+            if not streams:
+                await interaction.followup.send(
+                    "❌ None of these videos appear to be livestreams.",
+                    ephemeral=True
+                )
+                return
+
+            status = await interaction.followup.send(
+                f"📝 Collecting chat for {len(streams)} stream(s)... This may take a while.",
+                ephemeral=True,
+                wait=True
             )
-            
-            embed.add_field(
-                name="Messages Retrieved",
-                value=f"{len(messages):,}",
-                inline=True
+
+            # Bounded concurrent pipeline: fetch, parse and save up to N replays at once
+            semaphore = asyncio.Semaphore(self.bot.config.bulk_transcript_concurrency)
+            with tempfile.TemporaryDirectory() as workdir:
+                tasks = [
+                    asyncio.create_task(self._bulk_fetch(vid, details[vid], format or "text", semaphore, workdir))
+                    for vid in streams
+                ]
+                results = []
+                try:
+                    for done in asyncio.as_completed(tasks):
+                        results.append(await done)
+                        try:
+                            await status.edit(content=f"📝 Collected {len(results)}/{len(streams)} stream(s)...")
+                        except discord.HTTPException:
+                            pass
+                finally:
+                    # When one fetch fails, let the others finish before the workdir is removed under them;
+                    # cancelling wouldn't stop an offload worker that's already writing there
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                results.sort(key=lambda r: streams.index(r[0]))
+
+                if not any(filename for _, filename, _ in results):
+                    await interaction.followup.send(
+                        "❌ No chat messages found in any of the streams.",
+                        ephemeral=True
+                    )
+                    return
+
+                archive_name = f"transcripts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+                archive_path = os.path.join(workdir, archive_name)
+                await asyncio.to_thread(self._write_archive, archive_path, results, details, skipped)
+
+                embed = discord.Embed(
+                    title="📦 Bulk Chat Transcripts Generated",
+                    description=f"{sum(1 for _, f, _ in results if f)} of {len(video_ids)} video(s) archived",
+                    color=discord.Color.green(),
+                    timestamp=datetime.now()
+                )
+                embed.add_field(
+                    name="Messages Retrieved",
+                    value=f"{sum(count for _, _, count in results):,}",
+                    inline=True
+                )
+                embed.add_field(name="API Units Used", value=str(units), inline=True)
+                if skipped:
+                    embed.add_field(name="Not Livestreams", value=str(len(skipped)), inline=True)
+
+                with open(archive_path, 'rb') as f:
+                    await interaction.followup.send(
+                        embed=embed,
+                        file=discord.File(f, filename=archive_name)
+                    )
+
+        except QuotaExhaustedError:
+            await interaction.followup.send(
+                "❌ The bot has used up today's YouTube API quota. Please try again after midnight Pacific time.",
+                ephemeral=True
             )
-            
-            embed.add_field(
-                name="Time Range",
-                value=f"From: {messages[0].timestamp.strftime('%Y-%m-%d %H:%M:%S')}\n"
-                      f"To: {messages[-1].timestamp.strftime('%Y-%m-%d %H:%M:%S')}",
-                inline=False
+        except Exception as e:
+            log.exception(f"Error generating bulk transcripts: {e}")
+            await interaction.followup.send(
+                "❌ An error occurred while generating the transcripts. "
+                "Please try again later or contact the bot owner.",
+                ephemeral=True
             )
-            
-            # Send the transcript file
-            with open(filename, 'rb') as f:
-                file = discord.File(f, filename=filename)
-                await interaction.followup.send(
-                    embed=embed,
-                    file=file
+
+    @app_commands.command(
+        name="search-chat",
+        description="Search stored chat transcripts for a word, phrase or author"
+    )
+    @app_commands.describe(
+        query="Words to search for",
+        phrase="Match the words as an exact phrase",
+        author="Only show messages from this chat author",
+        url="Only search this stream"
+    )
+    async def search_chat(
+        self,
+        interaction: discord.Interaction,
+        query: Optional[str] = None,
+        phrase: Optional[bool] = False,
+        author: Optional[str] = None,
+        url: Optional[str] = None
+    ):
+        if not (query and query.strip()) and not (author and author.strip()):
+            await interaction.response.send_message(
+                "❌ Please provide a search query or an author.",
+                ephemeral=True
+            )
+            return
+
+        video_id = None
+        if url:
+            video_id = self.extract_video_id(url)
+            if not video_id:
+                await interaction.response.send_message(
+                    "❌ Invalid YouTube URL. Please provide a valid YouTube video URL.",
+                    ephemeral=True
                 )
-                
-            # Clean up the file
-            os.remove(filename)
-            
+                return
+
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            results = await self.chat_index.search(query, phrase, author, video_id, limit=10)
         except Exception as e:
-            print(f"Error generating transcript: {e}")
+            log.exception(f"Error searching chat index: {e}")
             await interaction.followup.send(
-                "❌ An error occurred while generating the transcript. "
-                "Please try again later or contact the bot owner.",
+                "❌ An error occurred while searching the chat transcripts.",
                 ephemeral=True
             )
+            return
+
+        if not results:
+            await interaction.followup.send("No matching chat messages found.", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="🔎 Chat Search Results",
+            description=f"{len(results)} result(s)",
+            color=discord.Color.blue()
+        )
+        for result in results:
+            text = result.message if len(result.message) <= 200 else result.message[:197] + "..."
+            embed.add_field(
+                name=f"{result.author} — {result.title}"[:256],
+                value=f"{text}\n[{result.timestamp.strftime('%Y-%m-%d %H:%M:%S')}]({result.vod_url})"[:1024],
+                inline=False
+            )
+
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 async def setup(bot):
     await bot.add_cog(YouTubeFeatures(bot))
\ No newline at end of file
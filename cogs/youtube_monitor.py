@@ -1,70 +1,135 @@
 # cogs/youtube_monitor.py
 import asyncio
 import logging
-import os
+import time
 from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
 
 import discord
 from discord.ext import commands, tasks
-from googleapiclient.discovery import build
+import aiohttp
 from googleapiclient.errors import HttpError
 
+from utils.live_providers import LiveProvider, LiveStatus, providers_from_config
+from utils.perf import track_task
+from utils.quota import QuotaExhaustedError
+from utils.resilience import CircuitOpenError, DeadlineExceeded, deadline
+from utils.sharding import owns_channel
+
 # Configure logging
 log = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s: %(message)s')
-
-YOUTUBE_API_SERVICE_NAME = "youtube"
-YOUTUBE_API_VERSION = "v3"
 
 class YouTubeMonitor(commands.Cog):
     """
     Monitors a specified YouTube channel for new vertical live streams
-    and announces them in a designated Discord channel.
+    and announces them in a designated Discord channel. Twitch and Kick
+    (from the platform links) are checked for live status in the same loop;
+    whichever platform goes live first is announced, and the announcement's
+    "also live on" section is kept to the platforms that are actually live.
     """
     def __init__(self, bot):
         self.bot = bot
         self.config = bot.config
-        self.api_key = os.getenv('YOUTUBE_API_KEY')
-        self.youtube = None # YouTube API client, initialized later
+        self.youtube_keys = bot.youtube_keys # Pool of YouTube API keys, each with its own daily quota
         self.last_checked_video_id = None # Store the ID of the latest processed live stream
         self.last_check_time = None # Track the time of the last successful check
         self.is_first_run = True # Flag to avoid announcing old streams on first start
-
-        if not self.api_key:
-            log.error("YOUTUBE_API_KEY not found in environment variables. YouTube Monitor will not function.")
+        self.providers = [] # Twitch/Kick live-status providers, built from the platform links in reschedule()
+        self.live: Dict[str, LiveStatus] = {} # Platforms currently live, by platform name
+        self.announced: Optional[LiveStatus] = None # The stream this session's announcement is for
+        self.announcement = None # This session's announcement message, edited as platforms go live/offline
+        self._announced_content: Optional[str] = None
+        self._checked_platforms = set() # Providers checked at least once; streams live at startup aren't announced
+        self._next_youtube_check = 0.0 # time.monotonic() when YouTube is due, the loop may tick faster for providers
+        self._live_lock = asyncio.Lock() # Serializes go-live handling, so concurrent checks announce only once
+
+        if not self.youtube_keys:
+            log.warning("Neither YOUTUBE_API_KEYS nor YOUTUBE_API_KEY found in environment variables. YouTube will not be checked.")
             # Optionally, unload the cog or prevent the task from starting
             # raise commands.ExtensionFailed("YouTubeMonitor", "Missing YOUTUBE_API_KEY") # Or handle gracefully
 
     def cog_load(self):
         log.info("YouTubeMonitor Cog Loaded.")
-        if self.api_key and self.config.youtube_monitor_enabled:
-            self.monitor_loop.change_interval(minutes=self.config.youtube_monitor_check_interval_minutes)
-            self.monitor_loop.start()
-            log.info(f"YouTube monitor task started. Interval: {self.config.youtube_monitor_check_interval_minutes} minutes.")
-        elif not self.api_key:
-             log.warning("YouTube monitor task NOT started: Missing API Key.")
-        else:
+        if self.reschedule():
+            log.info(f"YouTube monitor task started. Interval: {self.config.youtube_monitor_check_interval_minutes} minutes, "
+                     f"{len(self.youtube_keys)} API key(s); live detection for "
+                     f"{', '.join(p.platform for p in self.providers) or 'no other platforms'}.")
+        elif not self.config.youtube_monitor_enabled:
              log.info("YouTube monitor task NOT started: Disabled in config.")
-
+        else:
+             log.warning("YouTube monitor task NOT started: no YouTube API key and no Twitch/Kick providers.")
+
+    def _loop_seconds(self) -> float:
+        youtube_seconds = self.config.youtube_monitor_check_interval_minutes * 60
+        if self.providers:
+            return min(youtube_seconds, self.config.live_detection_interval_seconds)
+        return youtube_seconds
+
+    def reschedule(self) -> bool:
+        """
+        Apply changed settings: rebuild the providers from the platform links and start or
+        restart the loop at the new interval. Returns whether the loop is running.
+        """
+        self.providers = providers_from_config(self.config, self.bot.http_client, self.bot.resilience)
+        platforms = {provider.platform for provider in self.providers} | {"YouTube"}
+        for platform in list(self.live):
+            if platform not in platforms:
+                del self.live[platform]
+        self._checked_platforms &= platforms
+        self._next_youtube_check = 0.0
+
+        if not self.config.youtube_monitor_enabled or not (self.youtube_keys or self.providers):
+            self.monitor_loop.cancel()
+            return False
+        self.monitor_loop.change_interval(seconds=self._loop_seconds())
+        if self.monitor_loop.is_running():
+            self.monitor_loop.restart()
+        else:
+            self.monitor_loop.start()
+        return True
 
     def cog_unload(self):
         self.monitor_loop.cancel()
         log.info("YouTube monitor task stopped.")
 
-    def _build_youtube_client(self):
-        """Builds the YouTube API client."""
+    @tasks.loop(minutes=5) # Default interval, will be updated in reschedule()
+    @track_task("youtube-monitor")
+    async def monitor_loop(self):
+        """Periodically checks YouTube and the other platforms' providers for live streams, concurrently."""
+        loop_seconds = self._loop_seconds()
+        # A round, retries included, has to finish before the next one is due
+        with deadline(loop_seconds):
+            checks = [self.check_provider(provider) for provider in self.providers]
+            # YouTube keeps its own (quota-bound) interval; half a tick of slack absorbs loop jitter
+            if time.monotonic() >= self._next_youtube_check - loop_seconds / 2:
+                self._next_youtube_check = time.monotonic() + self.config.youtube_monitor_check_interval_minutes * 60
+                checks.append(self.check_for_streams())
+            await asyncio.gather(*checks)
+
+    async def check_provider(self, provider: LiveProvider):
+        if not owns_channel(self.bot, self.config.youtube_monitor_discord_channel_id):
+            return # The announcement channel's guild is served by another shard process
         try:
-            # Use context manager if available or handle closing manually if needed
-            self.youtube = build(YOUTUBE_API_SERVICE_NAME, YOUTUBE_API_VERSION, developerKey=self.api_key)
-            log.debug("YouTube API client built successfully.")
+            status = await provider.check()
+        except (CircuitOpenError, DeadlineExceeded, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # Unknown isn't offline, keep the last known status until a check succeeds
+            log.warning(f"Skipping {provider.platform} live check: {e!r}")
+            return
         except Exception as e:
-            log.error(f"Failed to build YouTube API client: {e}")
-            self.youtube = None # Ensure client is None on failure
+            log.exception(f"An unexpected error occurred while checking {provider.platform}: {e}")
+            return
 
-    @tasks.loop(minutes=5) # Default interval, will be updated in cog_load
-    async def monitor_loop(self):
-        """Periodically checks the YouTube channel for new vertical live streams."""
-        if not self.config.youtube_monitor_enabled or not self.config.youtube_channel_id or not self.api_key:
+        first_check = provider.platform not in self._checked_platforms
+        self._checked_platforms.add(provider.platform)
+        if status:
+            await self.stream_started(status, announce=not first_check)
+        else:
+            await self.stream_ended(provider.platform)
+
+    async def check_for_streams(self):
+        if not owns_channel(self.bot, self.config.youtube_monitor_discord_channel_id):
+            return # The announcement channel's guild is served by another shard process
+        if not self.config.youtube_monitor_enabled or not self.config.youtube_channel_id or not self.youtube_keys:
             # log.debug("YouTube monitor disabled or channel ID/API Key not set, skipping check.")
             # Stop the loop if it shouldn't be running
             if self.monitor_loop.is_running() and not self.config.youtube_monitor_enabled:
@@ -72,27 +137,19 @@ class YouTubeMonitor(commands.Cog):
                  self.monitor_loop.stop()
             return
 
-        if not self.youtube:
-            self._build_youtube_client()
-            if not self.youtube:
-                log.error("YouTube client not available, skipping check.")
-                # Consider adding a backoff mechanism here
-                await asyncio.sleep(60) # Wait a minute before retrying build
-                return
-
         log.info(f"Checking YouTube channel {self.config.youtube_channel_id} for live streams...")
         self.last_check_time = datetime.now(timezone.utc)
 
         try:
             # Use search.list to find live streams for the channel
-            search_response = self.youtube.search().list(
+            search_response = await self.youtube_keys.execute("search.list", lambda youtube: youtube.search().list(
                 part="snippet,id",
                 channelId=self.config.youtube_channel_id,
                 eventType="live",
                 type="video",
                 order="date", # Get the latest first
                 maxResults=5 # Check a few recent ones in case of API delays
-            ).execute()
+            ))
 
             live_streams = search_response.get("items", [])
             log.debug(f"Found {len(live_streams)} potential live stream(s).")
@@ -100,6 +157,7 @@ class YouTubeMonitor(commands.Cog):
             if not live_streams:
                 log.info("No active live streams found.")
                 self.is_first_run = False # Mark first run as complete even if no streams found
+                await self.stream_ended("YouTube")
                 return
 
             # Process streams from oldest to newest to handle multiple new streams correctly
@@ -110,18 +168,22 @@ class YouTubeMonitor(commands.Cog):
                 title = snippet["title"]
                 description = snippet["description"]
                 channel_title = snippet["channelTitle"] # Streamer name
+                status = LiveStatus("YouTube", video_id, f"https://www.youtube.com/watch?v={video_id}",
+                                    channel_title, title)
 
                 # --- State Management: Avoid re-announcing ---
                 # On the very first run after bot start, store the latest ID found without announcing
                 if self.is_first_run:
                     log.info(f"First run: Setting initial last_checked_video_id to {video_id}")
                     self.last_checked_video_id = video_id
+                    await self.stream_started(status, announce=False)
                     # Don't process further on the very first item of the first run
                     continue # Move to the next item in this first run check if any
 
                 # If we have seen this video ID before, skip
                 if video_id == self.last_checked_video_id:
                     log.debug(f"Skipping already processed video ID: {video_id}")
+                    await self.stream_started(status, announce=False)
                     continue
 
                 # Heuristic: Check if stream started *after* the last check time (with some buffer)
@@ -134,6 +196,7 @@ class YouTubeMonitor(commands.Cog):
                          log.info(f"Skipping old stream '{title}' (ID: {video_id}) published at {published_at_str}")
                          # Update last_checked_id even for skipped old streams to prevent re-processing
                          self.last_checked_video_id = video_id
+                         await self.stream_started(status, announce=False)
                          continue
                 except (ValueError, TypeError) as e:
                      log.warning(f"Could not parse publishedAt date '{published_at_str}': {e}")
@@ -158,7 +221,7 @@ class YouTubeMonitor(commands.Cog):
 
                 # --- Announce Vertical Stream ---
                 if is_vertical:
-                    await self.announce_stream(video_id, title, channel_title)
+                    await self.stream_started(status)
                     self.last_checked_video_id = video_id # Update state *after* successful announcement attempt
 
             # Mark first run as complete after processing all initial streams
@@ -167,23 +230,86 @@ class YouTubeMonitor(commands.Cog):
                 self.is_first_run = False
 
 
+        except (CircuitOpenError, DeadlineExceeded, QuotaExhaustedError) as e:
+            log.warning(f"Skipping YouTube check: {e}")
         except HttpError as e:
+            # Transient errors were already retried, and repeated ones open the circuit
             log.error(f"An HTTP error occurred during YouTube API call: {e}")
-            # Handle specific errors (e.g., quota exceeded) if necessary
             if e.resp.status == 403:
                  log.error("Potential Quota Exceeded or API Key issue.")
-                 # Consider stopping the loop or increasing interval temporarily
-                 # self.monitor_loop.change_interval(minutes=self.config.youtube_monitor_check_interval_minutes * 2) # Example: Double interval
-                 # self.monitor_loop.restart()
-            # Reset client to force rebuild on next attempt?
-            self.youtube = None
         except Exception as e:
             log.exception(f"An unexpected error occurred in the monitor loop: {e}")
-            # Reset client to force rebuild on next attempt?
-            self.youtube = None
 
 
-    async def announce_stream(self, video_id, title, channel_title):
+    async def stream_started(self, status: LiveStatus, announce: bool = True):
+        """
+        Record a platform as live. A new stream is announced unless another platform went
+        live first, in which case the existing announcement just gains the link.
+        """
+        async with self._live_lock:
+            previous = self.live.get(status.platform)
+            self.live[status.platform] = status
+            if previous is not None and previous.stream_id == status.stream_id:
+                return # Still the same stream
+            others_live = any(platform != status.platform for platform in self.live)
+            if not announce or others_live:
+                if announce:
+                    log.info(f"{status.platform} went live, already announced on {self.announced.platform if self.announced else 'another platform'}")
+                await self._refresh_announcement()
+                return
+            self.announced = status
+            self.announcement = await self.announce_stream(status)
+
+    async def stream_ended(self, platform: str):
+        async with self._live_lock:
+            if self.live.pop(platform, None) is None:
+                return
+            log.info(f"{platform} stream ended")
+            if self.live:
+                await self._refresh_announcement()
+            else:
+                # Offline everywhere, the next stream gets a new announcement
+                self.announced = self.announcement = self._announced_content = None
+
+    def _format_announcement(self, status: LiveStatus) -> str:
+        # Format other platform links. Platforms with a provider are only listed while live,
+        # the others (e.g. TikTok) can't be checked and are always listed.
+        checked_platforms = {provider.platform for provider in self.providers}
+        other_links_str = ""
+        if self.config.youtube_monitor_platform_links:
+            links = []
+            for name, url in self.config.youtube_monitor_platform_links.items():
+                if name == status.platform or (name in checked_platforms and name not in self.live):
+                    continue
+                links.append(f"<{url}> ({name})") # Format as Discord links
+            if links:
+                other_links_str = "Also live on:\n" + "\n".join(links)
+
+        # Format the announcement message using the template from config
+        return self.config.youtube_monitor_announcement_message.format(
+            streamer_name=status.streamer_name,
+            stream_url=status.url,
+            other_links=other_links_str,
+            platform=status.platform,
+            title=status.title
+        ).strip() # Use strip() to remove potential trailing newlines if other_links is empty
+
+    async def _refresh_announcement(self):
+        """Edit this session's announcement so its "also live on" section matches what is live now."""
+        if self.announcement is None or self.announced is None:
+            return
+        content = self._format_announcement(self.announced)
+        if content == self._announced_content:
+            return
+        try:
+            self.announcement = await self.bot.resilience.call("discord.edit", self.announcement.edit, content=content, max_attempts=1)
+            self._announced_content = content
+        except discord.NotFound:
+            self.announcement = None # Deleted by a moderator, leave it be
+        except (discord.HTTPException, CircuitOpenError) as e:
+            log.warning(f"Failed to update the live announcement: {e}")
+
+    async def announce_stream(self, status: LiveStatus) -> Optional[discord.Message]:
         """Formats and sends the announcement message to the configured Discord channel."""
         if not self.config.youtube_monitor_discord_channel_id:
             log.warning("Cannot announce stream: Discord announcement channel ID not set.")
@@ -207,28 +333,15 @@ class YouTubeMonitor(commands.Cog):
              log.error(f"Cannot announce stream: Missing 'Send Messages' permission in channel {channel.mention}.")
              return
 
-
-        stream_url = f"https://www.youtube.com/watch?v={video_id}"
-
-        # Format other platform links
-        other_links_str = ""
-        if self.config.youtube_monitor_platform_links:
-            links = []
-            for name, url in self.config.youtube_monitor_platform_links.items():
-                links.append(f"<{url}> ({name})") # Format as Discord links
-            if links:
-                other_links_str = "Also live on:\n" + "\n".join(links)
-
-        # Format the announcement message using the template from config
-        message_content = self.config.youtube_monitor_announcement_message.format(
-            streamer_name=channel_title,
-            stream_url=stream_url,
-            other_links=other_links_str
-        ).strip() # Use strip() to remove potential trailing newlines if other_links is empty
+        message_content = self._format_announcement(status)
 
         try:
-            log.info(f"Announcing vertical stream '{title}' (ID: {video_id}) to channel {channel.id}")
-            await channel.send(message_content)
+            log.info(f"Announcing {status.platform} stream '{status.title}' (ID: {status.stream_id}) to channel {channel.id}")
+            message = await self.bot.resilience.call("discord.send", channel.send, message_content, max_attempts=1)
+            self._announced_content = message_content
+            return message
+        except CircuitOpenError as e:
+            log.error(f"Failed to send announcement to {channel.mention}: {e}")
         except discord.Forbidden:
             log.error(f"Failed to send announcement to {channel.mention}: Missing Permissions")
         except discord.HTTPException as e:
@@ -242,9 +355,6 @@ class YouTubeMonitor(commands.Cog):
         """Wait until the bot is ready before starting the loop."""
         await self.bot.wait_until_ready()
         log.info("Bot is ready, YouTube monitor loop starting...")
-        # Initialize the client once before the first run
-        if not self.youtube and self.api_key:
-             self._build_youtube_client()
 
 
 async def setup(bot):
@@ -256,9 +366,8 @@ async def setup(bot):
         # bot.config = BotConfig.load()
         raise commands.ExtensionFailed("YouTubeMonitor", "Bot config not loaded.")
 
-    api_key = os.getenv('YOUTUBE_API_KEY')
-    if not api_key:
-         log.warning("YOUTUBE_API_KEY not set. YouTubeMonitor cog will load but the monitor task will not run.")
+    if not bot.youtube_keys:
+         log.warning("YOUTUBE_API_KEYS / YOUTUBE_API_KEY not set. YouTubeMonitor cog will load but only check Twitch/Kick, if configured.")
          # Allow loading so settings can still be accessed, but log the warning.
 
     await bot.add_cog(YouTubeMonitor(bot))
@@ -2,17 +2,73 @@
 from dataclasses import dataclass
 from typing import Optional
 import json
+import logging
 import os
 
+log = logging.getLogger(__name__)
+
 @dataclass
 class BotConfig:
     event_notification_channel_id: Optional[int] = None
     event_notification_role_id: Optional[int] = None
+    event_notification_offsets_minutes: list[int] = None # Reminders sent this many minutes before each event (0 = when it starts)
     daily_summary_channel_id: Optional[int] = None
     daily_summary_role_id: Optional[int] = None
     daily_summary_time: str = "09:00"  # 24-hour format
     daily_summary_enabled: bool = True
 
+    # Calendar Sync Settings
+    calendar_id: Optional[str] = None # Google Calendar ID to sync (e.g. "abc123@group.calendar.google.com")
+    calendar_credentials_file: Optional[str] = None # Service account JSON for private calendars (GOOGLE_API_KEY is used otherwise)
+    calendar_timezone: str = "UTC" # Timezone for daily_summary_time and all-day events
+    calendar_sync_interval_minutes: int = 15 # How often changes are pulled from Google Calendar
+    calendar_db_path: str = "calendar.db" # SQLite store for synced calendar events
+
+    # Sharding Settings
+    sharding_enabled: bool = False # Run as an AutoShardedBot
+    shard_count: Optional[int] = None # Total shards across every process (None = Discord's recommended count)
+    shard_ids: Optional[list[int]] = None # Shards run by this process, e.g. [0, 1, 2, 3] (None = all of them; needs shard_count)
+
+    # Logging Settings
+    log_level: str = "INFO" # DEBUG, INFO, WARNING or ERROR
+    log_file: Optional[str] = "logs/bot.log" # JSON lines, one object per record (None = console only)
+    log_max_bytes: int = 10_000_000 # Rotate the log file at this size
+    log_backup_count: int = 5 # Rotated log files kept
+    log_console_format: str = "text" # "text" or "json"
+    log_debug_rate_per_minute: int = 20 # Max DEBUG records per call site per minute (0 = unlimited)
+
+    # Diagnostics Settings (/perf)
+    perf_loop_lag_interval_seconds: float = 0.5 # How often event loop lag is sampled
+    perf_tracemalloc_at_startup: bool = False # Trace allocations from startup so /perf shows them (slows the bot down, uses memory)
+    perf_tracemalloc_frames: int = 1 # Stack frames stored per traced allocation
+    loop_watchdog_enabled: bool = True # Log and count event loop stalls by call site, with the blocking stack
+    loop_watchdog_threshold_ms: int = 250 # A stall this long counts as blocking
+    loop_watchdog_asyncio_debug: bool = False # Also enable asyncio debug mode with slow-callback warnings (staging only, adds overhead)
+
+    # Resilience Settings (outbound YouTube, scraping and Discord calls)
+    breaker_failure_threshold: int = 5 # Consecutive failures before an endpoint's circuit opens and calls fail fast
+    breaker_reset_seconds: float = 60 # How long an open circuit fails fast before a trial call is let through
+    retry_max_attempts: int = 3 # Attempts per call on transient errors (429, 5xx, timeouts); Discord sends aren't retried here, discord.py does it
+    retry_base_delay_seconds: float = 0.5 # Retry n waits a random time up to base * 2^n
+    retry_max_delay_seconds: float = 10 # Cap on a single retry wait
+    retry_budget_ratio: float = 0.2 # Retries earned per successful call, shared by all endpoints
+    retry_budget_min_per_minute: float = 10 # Retries always allowed per minute, even without successes
+
+    # Command Sync Settings
+    command_sync_state_path: str = "command_sync.json" # Hash of the last synced command tree, startup skips the sync when unchanged
+    command_sync_guild_id: Optional[int] = None # Sync commands to this guild only (instant updates while developing)
+
+    # Member Cache Settings
+    member_cache_mode: str = "full" # "full" caches every member at startup, "lru" only keeps recently active members
+    member_cache_lru_size: int = 2000 # Max members kept in "lru" mode
+
+    # Role Toggle Settings
+    role_toggle_rate_per_second: float = 5.0 # Role changes applied per second, per guild
+    role_toggle_max_attempts: int = 3 # Attempts per role change before giving up
+    role_bulk_rate_per_second: float = 2.0 # Member role changes per second for /role-bulk jobs
+    role_bulk_checkpoint_dir: str = "role_jobs" # Where /role-bulk progress is saved so jobs resume after a restart
+    role_menus: list[dict] = None # Self-assign role menus: [{"id", "title", "style": "buttons"|"select", "roles": [{"role_id", "label", "emoji", "requires_mod", "group"}]}]
+
     # YouTube Vertical Live Stream Monitor Settings
     youtube_monitor_enabled: bool = False
     youtube_channel_id: Optional[str] = None # The ID of the YouTube channel to monitor
@@ -21,6 +77,46 @@ class BotConfig:
     youtube_monitor_platform_links: dict[str, str] = None # Dict of platform names to URLs (e.g., {"Twitch": "...", "Kick": "..."})
     youtube_monitor_announcement_message: str = "{streamer_name} is now live with a vertical stream! Watch here: {stream_url}\n{other_links}" # Announcement message template
 
+    # Live Detection Settings (Twitch/Kick, from youtube_monitor_platform_links)
+    live_detection_enabled: bool = True # Check Twitch/Kick for live status and announce on whichever platform goes live first
+    live_detection_interval_seconds: int = 60 # How often Twitch/Kick are checked (YouTube keeps its own check interval)
+    live_provider_requests_per_minute: dict[str, float] = None # Per-platform request rate caps, e.g. {"Twitch": 60, "Kick": 20}
+
+    # YouTube Features Settings
+    youtube_features_enabled: bool = False # Load the transcript/chat search commands (/generate-transcript, /search-chat, ...)
+    youtube_daily_quota: int = 10000 # YouTube Data API units per day for each API key (Google resets it at midnight Pacific)
+
+    # Scheduled Announcement Settings
+    announcement_db_path: str = "announcements.db" # SQLite database for scheduled/recurring announcements
+    announcement_timezone: str = "UTC" # Timezone used to read /announce send_at times
+    announcement_catchup_max_hours: int = 24 # Missed announcements older than this are skipped on startup
+    announcement_channel_groups: dict[str, list[int]] = None # Saved channel groups for /announce-broadcast (name -> channel IDs)
+    broadcast_concurrency: int = 5 # Max concurrent sends/edits/deletes during a broadcast
+
+    # Chat Transcript Search Settings
+    chat_index_path: str = "chat_index.db" # SQLite FTS5 database that stores ingested chat transcripts
+
+    # Shared HTTP Client Settings
+    http_pool_limit: int = 100 # Max open connections across all hosts
+    http_pool_limit_per_host: int = 10 # Max open connections to a single host
+    http_dns_cache_ttl_seconds: int = 300 # How long resolved DNS entries are cached
+    http_keepalive_timeout_seconds: float = 30 # How long idle connections are kept open
+    http_total_timeout_seconds: float = 60 # Overall timeout for a single request
+    http_connect_timeout_seconds: float = 10 # Timeout for acquiring/establishing a connection
+
+    # Transcript Job Queue Settings
+    transcript_job_workers: int = 2 # How many transcripts can be generated at the same time
+    transcript_job_max_pending: int = 20 # Max queued transcript jobs before new requests are rejected
+    offload_process_workers: int = 2 # Processes for CPU-bound JSON parsing/transcript formatting (0 = run inline)
+    bulk_transcript_concurrency: int = 3 # Replays fetched at the same time by /bulk-transcript
+    bulk_transcript_max_videos: int = 100 # Max videos resolved from a playlist/URL list in one bulk run
+
+    # YouTube Metadata Cache Settings
+    metadata_cache_live_ttl_seconds: int = 60 # Cache lifetime for live/upcoming video metadata
+    metadata_cache_ended_ttl_seconds: int = 21600 # Cache lifetime for ended/regular video metadata
+    metadata_cache_negative_ttl_seconds: int = 600 # How long missing video IDs are remembered
+    metadata_cache_max_entries: int = 5000 # Max cached video resources
+
     @classmethod
     def load(cls) -> 'BotConfig':
         if os.path.exists('config.json'):
@@ -42,16 +138,24 @@ class BotConfig:
                         # Ensure new fields have defaults if missing in filtered data (or handle specific types)
                         if getattr(config_instance, 'youtube_monitor_platform_links', None) is None:
                             config_instance.youtube_monitor_platform_links = {} # Ensure it's a dict
+                        if getattr(config_instance, 'live_provider_requests_per_minute', None) is None:
+                            config_instance.live_provider_requests_per_minute = {}
+                        if getattr(config_instance, 'role_menus', None) is None:
+                            config_instance.role_menus = []
+                        if getattr(config_instance, 'announcement_channel_groups', None) is None:
+                            config_instance.announcement_channel_groups = {}
+                        if getattr(config_instance, 'event_notification_offsets_minutes', None) is None:
+                            config_instance.event_notification_offsets_minutes = [60, 0]
 
                         # Check if any unexpected keys were ignored and log if desired
                         ignored_keys = set(loaded_data.keys()) - defined_fields
                         if ignored_keys:
-                            print(f"Warning: Ignored unexpected keys found in config.json: {', '.join(ignored_keys)}")
+                            log.warning(f"Ignored unexpected keys found in config.json: {', '.join(ignored_keys)}")
 
                         return config_instance
             except (json.JSONDecodeError, TypeError, KeyError, AttributeError) as e:
                 # More specific error logging might be helpful here
-                print(f"Warning: Error processing config.json ({type(e).__name__}: {e}), creating/updating configuration")
+                log.warning(f"Error processing config.json ({type(e).__name__}: {e}), creating/updating configuration")
 
         # If file doesn't exist, is invalid, or missing keys, create/update config
         config = cls()
@@ -63,6 +167,14 @@ class BotConfig:
         # Ensure platform links is a dict if loaded as None
         if config.youtube_monitor_platform_links is None:
              config.youtube_monitor_platform_links = {}
+        if config.live_provider_requests_per_minute is None:
+             config.live_provider_requests_per_minute = {}
+        if config.role_menus is None:
+             config.role_menus = []
+        if config.announcement_channel_groups is None:
+             config.announcement_channel_groups = {}
+        if config.event_notification_offsets_minutes is None:
+             config.event_notification_offsets_minutes = [60, 0]
         config.save()
         return config
     
@@ -1,61 +1,186 @@
 import discord
 from discord.ext import commands
 import asyncio
+import logging
+import tracemalloc
+from typing import Optional
 from config import BotConfig
+from utils.calendar_store import CalendarStore
+from utils.calendar_sync import CalendarSync
+from utils.command_sync import sync_if_changed
+from utils.http_client import HTTPClient
+from utils.logging_setup import bind_log_context, setup_logging
+from utils.member_cache import MemberLRU
+from utils.perf import LoopLagMonitor, LoopWatchdog
+from utils.resilience import Resilience
+from utils.role_queue import RoleToggleQueue
+from utils.sharding import ShardTelemetry
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
+# Extensions and whether the current config needs them
+EXTENSIONS = (
+    ("cogs.settings", lambda config: True),
+    ("cogs.role_buttons", lambda config: True),
+    ("cogs.role_bulk", lambda config: True),
+    ("cogs.daily_summary", lambda config: True), # Also runs the calendar sync loop
+    ("cogs.event_notifications", lambda config: bool(config.calendar_id and config.event_notification_channel_id)),
+    ("cogs.message_management", lambda config: True),
+    ("cogs.youtube_monitor", lambda config: config.youtube_monitor_enabled), # Loaded on demand when enabled in /settings
+    ("cogs.youtube_features", lambda config: config.youtube_features_enabled),
+)
+
+def enabled_extensions(config: BotConfig) -> list[str]:
+    return [name for name, needed in EXTENSIONS if needed(config)]
+
+class ContextCommandTree(discord.app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Runs in the same task as the command, so everything it logs carries these fields
+        bind_log_context(
+            guild_id=interaction.guild_id,
+            user_id=interaction.user.id,
+            command=interaction.command.qualified_name if interaction.command else None
+        )
+        return True
+
 class CalendarBot(commands.Bot):
-    def __init__(self):
+    def __init__(self, config: Optional[BotConfig] = None):
+        config = config or BotConfig.load()
         intents = discord.Intents.default()
         intents.message_content = True
         intents.members = True
+
+        cache_options = {}
+        if config.member_cache_mode == "lru":
+            # Don't download every member at startup, members are cached on demand instead
+            cache_options["chunk_guilds_at_startup"] = False
+            cache_options["member_cache_flags"] = discord.MemberCacheFlags.none()
+        if isinstance(self, commands.AutoShardedBot):
+            cache_options.update(shard_options(config))
+
         super().__init__(
             command_prefix="!",
             intents=intents,
-            description="A Discord bot for assisting live streamers with community management and stream notifications."
+            tree_cls=ContextCommandTree,
+            description="A Discord bot for assisting live streamers with community management and stream notifications.",
+            **cache_options
         )
-        self.config = BotConfig.load()
+        self.config = config
         self.owner_id = int(os.getenv("OWNER_ID", "0"))
+        self.http_client = HTTPClient.from_config(self.config) # Shared pooled session for outbound HTTP
+        self.member_cache = MemberLRU(self.config.member_cache_lru_size) # Recently active members (used in "lru" mode)
+        self.role_queue = RoleToggleQueue.from_config(self.config, self.member_cache) # Rate-paced, coalescing role changes
+        self.resilience = Resilience.from_config(self.config) # Circuit breakers and retry budget for outbound calls
+        self.calendar_store = CalendarStore(self.config.calendar_db_path) # Local copy of synced calendar events
+        self.calendar = CalendarSync.from_config( # Incremental Google Calendar sync
+            self.config, self.calendar_store, resilience=self.resilience
+        )
+        self.shard_telemetry = ShardTelemetry(self) # Per-shard latency, event rate and reconnects
+        self.loop_lag = LoopLagMonitor(self.config.perf_loop_lag_interval_seconds) # Event loop lag, reported by /perf
+        self.loop_watchdog = LoopWatchdog(self.config.loop_watchdog_threshold_ms / 1000) # Finds code that blocks the loop
+        self.exchange_recorder = None # Records API exchanges as replay fixtures when RECORD_EXCHANGES=path.json
+        if os.getenv("RECORD_EXCHANGES"):
+            from utils.replay import ExchangeRecorder
+            self.exchange_recorder = ExchangeRecorder.from_env()
+        self._youtube_keys = None # Built on first use, see youtube_keys
+        self._metadata_cache = None # Built on first use, see metadata_cache
+
+    @property
+    def youtube_keys(self):
+        """YouTube Data API keys, each with its own daily quota ledger. Only the YouTube cogs use them."""
+        if self._youtube_keys is None:
+            from utils.quota import YouTubeKeyPool
+            self._youtube_keys = YouTubeKeyPool.from_config(
+                self.config, self.resilience, client_factory=self._build_youtube_client
+            )
+        return self._youtube_keys
+
+    @property
+    def metadata_cache(self):
+        """YouTube video metadata shared by every cog that looks videos up. Only the YouTube cogs use it."""
+        if self._metadata_cache is None:
+            from utils.metadata_cache import MetadataCache
+            self._metadata_cache = MetadataCache.from_config(self.config)
+        return self._metadata_cache
+
+    def _build_youtube_client(self, api_key: str):
+        from utils.quota import build_youtube_client
+        youtube = build_youtube_client(api_key)
+        if self.exchange_recorder:
+            youtube = self.exchange_recorder.wrap_google(youtube, "youtube")
+        return youtube
         
     async def setup_hook(self):
-        # Load Core Cogs
-        await self.load_extension("cogs.settings")
-        await self.load_extension("cogs.role_buttons")
-        await self.load_extension("cogs.message_management")
-        await self.load_extension("cogs.youtube_monitor") # Load the new monitor cog
-        # await self.load_extension("cogs.youtube_features") # Keep this commented unless needed
-
-        # Set up persistent views
-        from cogs.role_buttons import RolePersistentView
-        if self.config.daily_summary_role_id:
-            self.add_view(RolePersistentView(
-                self.config.daily_summary_role_id,
-                "Toggle Upcoming Events Notifications"
-            ))
-        if self.config.event_notification_role_id:
-            self.add_view(RolePersistentView(
-                self.config.event_notification_role_id,
-                "Toggle Event Notifications",
-                requires_mod=True
-            ))
-        
-        await self.tree.sync()
+        # Cogs for disabled features aren't imported at all
+        for extension in enabled_extensions(self.config):
+            await self.load_extension(extension)
+
+        # Role menu components are registered as dynamic items by the RoleButtons cog
+
+        self.shard_telemetry.start()
+        self.loop_lag.start()
+        if self.exchange_recorder:
+            self.exchange_recorder.install_discord(self.http)
+        if self.config.loop_watchdog_enabled:
+            self.loop_watchdog.start(asyncio_debug=self.config.loop_watchdog_asyncio_debug)
+
+        # Only sync the command tree when it changed since the last successful sync.
+        # With shards split across processes, the process running shard 0 does it.
+        if getattr(self, "shard_ids", None) is None or 0 in self.shard_ids:
+            guild = discord.Object(id=self.config.command_sync_guild_id) if self.config.command_sync_guild_id else None
+            await sync_if_changed(
+                self.tree, self.application_id, self.config.command_sync_state_path,
+                guild=guild, force=os.getenv("FORCE_COMMAND_SYNC", "").lower() in ("1", "true")
+            )
         
+    async def close(self):
+        self.shard_telemetry.stop()
+        self.loop_lag.stop()
+        self.loop_watchdog.stop()
+        await self.role_queue.close()
+        await super().close()
+        await self.http_client.close()
+        self.calendar_store.close()
+        if self.exchange_recorder:
+            self.exchange_recorder.save()
+
     async def on_ready(self):
-        print(f"Logged in as {self.user}")
+        log.info(f"Logged in as {self.user}")
         # If owner_id wasn't set in .env, fetch it from Discord
         if self.owner_id == 0:
             app = await self.application_info()
             self.owner_id = app.owner.id
-            print(f"Bot owner ID: {self.owner_id}")
+            log.info(f"Bot owner ID: {self.owner_id}")
+
+class ShardedCalendarBot(CalendarBot, commands.AutoShardedBot):
+    """CalendarBot on several gateway connections, enabled with sharding_enabled in config."""
+
+def shard_options(config: BotConfig) -> dict:
+    options = {}
+    if config.shard_count:
+        options["shard_count"] = config.shard_count
+    if config.shard_ids:
+        if not config.shard_count:
+            log.warning("shard_ids needs shard_count to be set, running every shard in this process")
+        else:
+            options["shard_ids"] = list(config.shard_ids)
+    return options
 
 async def main():
-    bot = CalendarBot()
-    async with bot:
-        await bot.start(os.getenv("DISCORD_TOKEN"))
+    config = BotConfig.load()
+    listener = setup_logging(config)
+    if config.perf_tracemalloc_at_startup:
+        tracemalloc.start(config.perf_tracemalloc_frames)
+    try:
+        bot = ShardedCalendarBot(config) if config.sharding_enabled else CalendarBot(config)
+        async with bot:
+            await bot.start(os.getenv("DISCORD_TOKEN"))
+    finally:
+        listener.stop() # Flushes queued records
 
 if __name__ == "__main__":
     asyncio.run(main())
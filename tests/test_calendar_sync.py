@@ -0,0 +1,47 @@
+# tests/test_calendar_sync.py
+import asyncio
+
+from utils.calendar_store import CalendarStore
+from utils.calendar_sync import CalendarSync
+from utils.fake_calendar import FakeCalendarService
+from utils.resilience import Resilience
+
+CALENDAR_ID = "primary"
+
+def event(summary: str, hour: int) -> dict:
+    return {"summary": summary, "start": {"dateTime": f"2026-03-01T{hour:02d}:00:00+00:00"},
+            "end": {"dateTime": f"2026-03-01T{hour + 1:02d}:00:00+00:00"}}
+
+async def stored_ids(store: CalendarStore) -> set:
+    return {e.id for e in await store.events_between(0, 1e12, CALENDAR_ID)}
+
+def test_expired_sync_token_falls_back_to_full_sync(tmp_path):
+    async def scenario():
+        fake = FakeCalendarService()
+        kept = fake.upsert(event("Kept", 10))["id"]
+        removed = fake.upsert(event("Removed", 12))["id"]
+        store = CalendarStore(str(tmp_path / "calendar.db"))
+        sync = CalendarSync(store, CALENDAR_ID, "UTC", service_factory=lambda: fake, resilience=Resilience())
+        syncs = []
+        sync.add_listener(lambda full, events, deleted: syncs.append((full, len(events), deleted)))
+        try:
+            assert (await sync.sync()).full
+            added = fake.upsert(event("Added", 14))["id"]
+            assert not (await sync.sync()).full
+
+            # Changes made while the token is expired must still reach the store
+            fake.delete(removed)
+            fake.expire_tokens()
+            requests = fake.requests
+            result = await sync.sync()
+            assert result.full and result.updated == 2
+            assert fake.requests - requests == 2 # The 410, then one full listing, no retries of the 410
+            assert await stored_ids(store) == {kept, added}
+            assert syncs[-1] == (True, 2, [])
+
+            # The full sync's token is good for incremental syncs again
+            assert not (await sync.sync()).full
+        finally:
+            store.close()
+
+    asyncio.run(scenario())
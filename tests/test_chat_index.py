@@ -0,0 +1,52 @@
+# tests/test_chat_index.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from utils.chat_index import ChatIndex, build_match_query
+from utils.chat_parsing import ChatMessage
+
+START = datetime(2026, 1, 1, 20, 0, tzinfo=timezone.utc)
+DETAILS = {"title": "Launch stream", "start_time": "2026-01-01T20:00:00Z"}
+
+def messages(*texts, author="viewer", offset=0):
+    return [ChatMessage(START + timedelta(seconds=offset + i), author, text) for i, text in enumerate(texts)]
+
+@pytest.fixture
+def index(tmp_path):
+    index = ChatIndex(str(tmp_path / "chat_index.db"))
+    yield index
+    index.close()
+
+def test_match_query_quotes_user_input():
+    assert build_match_query('say "hi" OR') == 'message : ("say" AND """hi""" AND "OR")'
+    assert build_match_query("good game", phrase=True, author="mod") == 'message : "good game" AND author : "mod"'
+    assert build_match_query("  ") is None
+
+def test_search_finds_messages_with_vod_offsets(index):
+    asyncio.run(index.ingest("vid00000001", DETAILS, messages("hello world", "pog champ", "hello again", offset=90)))
+
+    results = asyncio.run(index.search("hello"))
+    assert sorted(r.message for r in results) == ["hello again", "hello world"]
+    first = next(r for r in results if r.message == "hello world")
+    assert first.title == "Launch stream"
+    assert first.offset_seconds == 90
+    assert first.vod_url == "https://youtu.be/vid00000001?t=90"
+
+def test_ingest_is_incremental(index):
+    batch = messages("first", "second")
+    assert asyncio.run(index.ingest("vid00000001", DETAILS, batch)) == 2
+    # Re-ingesting the same replay plus one newer message only adds the new one
+    assert asyncio.run(index.ingest("vid00000001", DETAILS, batch + messages("third", offset=10))) == 1
+    assert len(asyncio.run(index.search("third"))) == 1
+
+def test_search_filters_by_phrase_author_and_video(index):
+    asyncio.run(index.ingest("vid00000001", DETAILS, messages("good game everyone", author="alice")))
+    asyncio.run(index.ingest("vid00000002", DETAILS, messages("game good", author="bob")))
+
+    assert {r.author for r in asyncio.run(index.search("good game"))} == {"alice", "bob"}
+    assert [r.author for r in asyncio.run(index.search("good game", phrase=True))] == ["alice"]
+    assert [r.video_id for r in asyncio.run(index.search("game", author="bob"))] == ["vid00000002"]
+    assert [r.author for r in asyncio.run(index.search("game", video_id="vid00000001"))] == ["alice"]
+    assert asyncio.run(index.search("")) == []
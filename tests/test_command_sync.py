@@ -0,0 +1,57 @@
+# tests/test_command_sync.py
+import asyncio
+
+import discord
+from discord import app_commands
+
+from utils.command_sync import sync_if_changed
+
+APPLICATION_ID = 1234
+GUILD = discord.Object(id=42)
+
+def make_tree():
+    tree = app_commands.CommandTree(discord.Client(intents=discord.Intents.none()))
+    synced = []
+
+    async def sync(guild=None):
+        synced.append(guild.id if guild else "global")
+        return tree.get_commands(guild=guild)
+
+    tree.sync = sync
+
+    @tree.command(name="ping", description="Check the bot is alive")
+    async def ping(interaction: discord.Interaction):
+        pass
+
+    return tree, synced
+
+def test_sync_only_when_the_tree_or_scope_changes(tmp_path):
+    state_path = str(tmp_path / "command_sync.json")
+    tree, synced = make_tree()
+
+    async def scenario():
+        assert await sync_if_changed(tree, APPLICATION_ID, state_path)
+        assert not await sync_if_changed(tree, APPLICATION_ID, state_path)
+
+        # The same tree in a new process reads the saved hash
+        fresh_tree, fresh_synced = make_tree()
+        assert not await sync_if_changed(fresh_tree, APPLICATION_ID, state_path)
+        assert fresh_synced == []
+
+        tree.get_command("ping").description = "Check the bot is responding"
+        assert await sync_if_changed(tree, APPLICATION_ID, state_path)
+        assert not await sync_if_changed(tree, APPLICATION_ID, state_path)
+
+        # Guild scope has its own hash, the global one doesn't cover it
+        assert await sync_if_changed(tree, APPLICATION_ID, state_path, guild=GUILD)
+        assert not await sync_if_changed(tree, APPLICATION_ID, state_path, guild=GUILD)
+
+        @tree.command(name="pong", description="A new command")
+        async def pong(interaction: discord.Interaction):
+            pass
+
+        assert await sync_if_changed(tree, APPLICATION_ID, state_path)
+        assert await sync_if_changed(tree, APPLICATION_ID, state_path, force=True)
+
+    asyncio.run(scenario())
+    assert synced == ["global", "global", 42, "global", "global"]
@@ -0,0 +1,57 @@
+# tests/test_live_detection.py
+import asyncio
+import time
+from dataclasses import replace
+
+from benchmarks.live_detection import CHANNEL_ID, kick, twitch
+from cogs.youtube_monitor import YouTubeMonitor
+from config import BotConfig
+from utils.fake_live_platforms import FakeLivePlatforms
+from utils.http_client import HTTPClient
+from utils.live_providers import RateLimiter
+from utils.quota import YouTubeKeyPool
+from utils.replay import ReplayBot, ReplayDiscord, ReplayGuild, ReplayLog, ReplayTextChannel, VirtualClock
+from utils.resilience import Resilience
+
+DISCORD_EXCHANGES = [
+    {"service": "discord", "method": "POST", "path": "/channels/{channel_id}/messages", "latency": 0.0,
+     "status": 200, "response": {"id": "1"}},
+    {"service": "discord", "method": "PATCH", "path": "/channels/{channel_id}/messages/{message_id}", "latency": 0.0,
+     "status": 200, "response": {"id": "1"}},
+]
+
+def test_first_platform_live_is_announced_and_later_ones_edit_it():
+    async def scenario():
+        async with FakeLivePlatforms() as fake:
+            http = HTTPClient()
+            try:
+                config = replace(BotConfig(), youtube_monitor_enabled=True, youtube_monitor_discord_channel_id=CHANNEL_ID,
+                                 youtube_monitor_platform_links={"Twitch": "https://www.twitch.tv/both",
+                                                                 "Kick": "https://kick.com/both"})
+                replay_log = ReplayLog(VirtualClock(time.time()))
+                resilience = Resilience.from_config(config)
+                bot = ReplayBot(config, http_client=http, resilience=resilience, youtube_keys=YouTubeKeyPool([], resilience))
+                bot.channels[CHANNEL_ID] = ReplayTextChannel(
+                    CHANNEL_ID, ReplayGuild(1), ReplayDiscord(DISCORD_EXCHANGES, replay_log.clock, replay_log))
+                cog = YouTubeMonitor(bot)
+                # Unpaced, the default per-platform limits would make each poll wait seconds
+                cog.providers = [kick(fake, "both", http, resilience, RateLimiter(6000)),
+                                 twitch(fake, "both", http, resilience, RateLimiter(6000))]
+
+                async def poll():
+                    await cog.monitor_loop.coro(cog)
+                    return [call["method"].split()[0] for call in replay_log.calls]
+
+                assert await poll() == []
+                fake.go_live("Twitch", "both") # Twitch first, though Kick is polled first
+                assert await poll() == ["POST"]
+                assert "twitch.tv" in cog.announcement.content and "kick.com" not in cog.announcement.content
+
+                fake.go_live("Kick", "both")
+                assert await poll() == ["POST", "PATCH"]
+                assert "twitch.tv" in cog.announcement.content and "kick.com" in cog.announcement.content
+                assert await poll() == ["POST", "PATCH"] # Nothing changed, nothing sent
+            finally:
+                await http.close()
+
+    asyncio.run(scenario())
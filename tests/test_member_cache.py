@@ -0,0 +1,55 @@
+# tests/test_member_cache.py
+import asyncio
+from types import SimpleNamespace
+
+from utils.member_cache import MemberLRU
+
+class FakeGuild:
+    def __init__(self, guild_id=1):
+        self.id = guild_id
+        self.fetched = []
+
+    def get_member(self, member_id):
+        return None # Running without discord.py's member cache
+
+    async def fetch_member(self, member_id):
+        self.fetched.append(member_id)
+        return member(self, member_id)
+
+def member(guild, member_id):
+    return SimpleNamespace(guild=guild, id=member_id)
+
+def test_least_recently_used_member_is_evicted():
+    guild = FakeGuild()
+    cache = MemberLRU(maxsize=2)
+    cache.remember(member(guild, 1))
+    cache.remember(member(guild, 2))
+    assert cache.get(guild, 1) is not None # 2 is now the least recently used
+    cache.remember(member(guild, 3))
+
+    assert len(cache) == 2
+    assert cache.get(guild, 2) is None
+    assert cache.get(guild, 1).id == 1 and cache.get(guild, 3).id == 3
+
+def test_members_are_keyed_by_guild():
+    first, second = FakeGuild(1), FakeGuild(2)
+    cache = MemberLRU()
+    cache.remember(member(first, 7))
+    assert cache.get(second, 7) is None
+    cache.forget(1, 7)
+    assert cache.get(first, 7) is None
+
+def test_resolve_fetches_only_on_a_miss():
+    async def scenario():
+        guild = FakeGuild()
+        cache = MemberLRU(maxsize=1)
+        assert (await cache.resolve(guild, 5)).id == 5
+        assert (await cache.resolve(guild, 5)).id == 5
+        assert guild.fetched == [5]
+
+        await cache.resolve(guild, 6) # Evicts 5
+        await cache.resolve(guild, 5)
+        assert guild.fetched == [5, 6, 5]
+        assert cache.stats()["fetches"] == 3 and cache.stats()["hits"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,100 @@
+# tests/test_message_management.py
+import asyncio
+from dataclasses import replace
+from datetime import datetime
+from types import SimpleNamespace
+
+import discord
+import pytz
+
+from cogs.message_management import REPEAT_INTERVALS, MessageManagement, next_occurrence
+from config import BotConfig
+from utils.resilience import Resilience
+
+TZ = pytz.timezone("America/New_York")
+DAILY = REPEAT_INTERVALS["daily"]
+
+def at(*args) -> float:
+    return TZ.localize(datetime(*args)).timestamp()
+
+def local(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, TZ).replace(tzinfo=None)
+
+def test_daily_keeps_wall_clock_time_across_dst():
+    # 2026-03-08 spring forward and 2026-11-01 fall back in New York
+    assert local(next_occurrence(at(2026, 3, 7, 9, 0), DAILY, TZ, at(2026, 3, 7, 9, 1))) == datetime(2026, 3, 8, 9, 0)
+    assert local(next_occurrence(at(2026, 10, 31, 9, 0), DAILY, TZ, at(2026, 10, 31, 9, 1))) == datetime(2026, 11, 1, 9, 0)
+
+def test_missed_occurrences_are_skipped():
+    last = at(2026, 3, 1, 9, 0)
+    assert local(next_occurrence(last, DAILY, TZ, at(2026, 3, 10, 8, 30))) == datetime(2026, 3, 10, 9, 0)
+    assert local(next_occurrence(last, DAILY, TZ, at(2026, 3, 10, 9, 30))) == datetime(2026, 3, 11, 9, 0)
+
+def test_just_before_the_next_run_after_fall_back():
+    # 24.5 hours have passed but only 23.5 on the wall clock, so 09:00 on the 1st is still ahead
+    last = at(2026, 10, 31, 9, 0)
+    assert local(next_occurrence(last, DAILY, TZ, at(2026, 11, 1, 8, 30))) == datetime(2026, 11, 1, 9, 0)
+
+def test_weekly_in_utc_is_fixed_seconds():
+    last = at(2026, 3, 2, 12, 0)
+    assert next_occurrence(last, REPEAT_INTERVALS["weekly"], pytz.UTC, last) == last + REPEAT_INTERVALS["weekly"]
+
+OWNER_ID = 1
+
+class FakeResponse:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, content=None, **kwargs):
+        self.sent.append(content)
+
+    async def defer(self, **kwargs):
+        pass
+
+class FakeFollowup:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content)
+
+def make_cog(tmp_path, edit):
+    def get_partial_messageable(channel_id):
+        return SimpleNamespace(get_partial_message=lambda message_id: SimpleNamespace(edit=edit))
+    bot = SimpleNamespace(config=replace(BotConfig(), announcement_db_path=str(tmp_path / "announcements.db")),
+                          resilience=Resilience(), owner_id=OWNER_ID, get_partial_messageable=get_partial_messageable)
+    return MessageManagement(bot)
+
+def make_interaction(guild=None):
+    return SimpleNamespace(guild=guild, user=SimpleNamespace(id=OWNER_ID), response=FakeResponse(),
+                           followup=FakeFollowup())
+
+def test_announce_cancel_refuses_outside_a_server(tmp_path):
+    async def edit(**kwargs):
+        pass
+    cog = make_cog(tmp_path, edit)
+    interaction = make_interaction()
+    try:
+        asyncio.run(MessageManagement.announce_cancel.callback(cog, interaction, 1))
+    finally:
+        cog.store.close()
+    assert interaction.response.sent == ["❌ This command can only be used in a server!"]
+
+def test_announce_edit_keeps_the_broadcast_when_no_copy_changed(tmp_path):
+    async def edit(**kwargs):
+        raise discord.HTTPException(SimpleNamespace(status=403, reason="Forbidden"), "Missing Access")
+    cog = make_cog(tmp_path, edit)
+
+    async def scenario():
+        broadcast_id = await cog.store.add_broadcast(OWNER_ID, "owner", None, "Original", "Title", None,
+                                                     [(10, 100, 1000), (10, 101, 1001)])
+        interaction = make_interaction()
+        await MessageManagement.announce_edit.callback(cog, interaction, broadcast_id, message="Edited")
+        return await cog.store.get_broadcast(broadcast_id), interaction.followup.sent[-1]
+
+    try:
+        broadcast, reply = asyncio.run(scenario())
+    finally:
+        cog.store.close()
+    assert broadcast.message == "Original"
+    assert reply.startswith("❌ No copy of broadcast") and "Missing Access" in reply
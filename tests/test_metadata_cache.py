@@ -0,0 +1,75 @@
+# tests/test_metadata_cache.py
+import asyncio
+import time
+
+from utils.metadata_cache import MetadataCache
+
+LIVE = {"id": "live0000001", "liveStreamingDetails": {"actualStartTime": "2026-01-01T00:00:00Z"}}
+ENDED = {"id": "ended000001", "liveStreamingDetails": {"actualStartTime": "2026-01-01T00:00:00Z",
+                                                      "actualEndTime": "2026-01-01T02:00:00Z"}}
+
+class FakeVideosApi:
+    def __init__(self, *videos):
+        self.videos = {video["id"]: video for video in videos}
+        self.calls = []
+
+    async def fetch(self, ids):
+        self.calls.append(list(ids))
+        await asyncio.sleep(0) # Let concurrent lookups pile up behind this one
+        return {video_id: self.videos[video_id] for video_id in ids if video_id in self.videos}
+
+def frozen_clock(monkeypatch) -> list:
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0]) # Before the cache is built, it keeps the timer
+    return now
+
+def test_live_and_ended_videos_expire_on_their_own_ttl(monkeypatch):
+    now = frozen_clock(monkeypatch)
+    cache = MetadataCache(live_ttl=60, ended_ttl=3600)
+    api = FakeVideosApi(LIVE, ENDED)
+
+    async def lookup():
+        return await cache.get_videos([LIVE["id"], ENDED["id"]], api.fetch)
+
+    assert asyncio.run(lookup()) == {LIVE["id"]: LIVE, ENDED["id"]: ENDED}
+    asyncio.run(lookup())
+    assert len(api.calls) == 1 and cache.hits == 2
+
+    now[0] += 61
+    asyncio.run(lookup())
+    assert api.calls[-1] == [LIVE["id"]] # Only the live one expired
+
+    now[0] += 3600
+    asyncio.run(lookup())
+    assert api.calls[-1] == [LIVE["id"], ENDED["id"]]
+    assert cache.stats()["fetches"] == 3
+
+def test_missing_ids_are_negatively_cached(monkeypatch):
+    now = frozen_clock(monkeypatch)
+    cache = MetadataCache(negative_ttl=600)
+    api = FakeVideosApi()
+
+    assert asyncio.run(cache.get_videos(["deleted0001"], api.fetch)) == {"deleted0001": None}
+    assert asyncio.run(cache.get_videos(["deleted0001"], api.fetch)) == {"deleted0001": None}
+    assert len(api.calls) == 1 and cache.negative_hits == 1
+
+    now[0] += 601
+    asyncio.run(cache.get_videos(["deleted0001"], api.fetch))
+    assert len(api.calls) == 2
+
+def test_concurrent_misses_share_one_fetch():
+    cache = MetadataCache()
+    api = FakeVideosApi(LIVE, ENDED)
+
+    async def scenario():
+        return await asyncio.gather(
+            cache.get_videos([LIVE["id"]], api.fetch),
+            cache.get_videos([LIVE["id"], ENDED["id"]], api.fetch),
+            cache.get_videos([LIVE["id"]], api.fetch),
+        )
+
+    first, second, third = asyncio.run(scenario())
+    assert first == third == {LIVE["id"]: LIVE}
+    assert second == {LIVE["id"]: LIVE, ENDED["id"]: ENDED}
+    assert api.calls == [[LIVE["id"]], [ENDED["id"]]] # The live video was fetched once
+    assert cache.coalesced == 2
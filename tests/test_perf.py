@@ -0,0 +1,53 @@
+# tests/test_perf.py
+import asyncio
+import time
+
+from utils.perf import LoopLagMonitor, LoopWatchdog, profile_event_loop
+
+def block_the_loop(seconds: float):
+    time.sleep(seconds)
+
+def test_watchdog_records_a_stall_and_its_call_site():
+    async def scenario():
+        watchdog = LoopWatchdog(threshold=0.1, interval=0.02)
+        watchdog.start()
+        await asyncio.sleep(0.05)
+        block_the_loop(0.4)
+        await asyncio.sleep(0.2) # The stall is recorded once the loop beats again
+        watchdog.stop()
+        return watchdog
+
+    watchdog = asyncio.run(scenario())
+    assert watchdog.stalls == 1
+    [(site_name, site)] = watchdog.top_sites()
+    assert site_name.startswith("tests/test_perf.py:") and site_name.endswith("(block_the_loop)")
+    assert site.count == 1 and 0.2 < site.max_seconds < 1
+    assert "block_the_loop(0.4)" in site.stack
+
+def test_lag_monitor_sees_a_blocked_loop():
+    async def scenario():
+        monitor = LoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        block_the_loop(0.2)
+        await asyncio.sleep(0.05)
+        monitor.stop()
+        return monitor.percentiles()
+
+    lag = asyncio.run(scenario())
+    assert lag["samples"] > 2
+    assert lag["max"] >= 0.15 and lag["p50"] < 0.15
+
+def test_profiler_samples_the_loop_thread():
+    async def busy():
+        await asyncio.sleep(0.02) # Let the profiler thread start first
+        block_the_loop(0.2)
+
+    async def scenario():
+        profiler, _ = await asyncio.gather(profile_event_loop(0.3, interval=0.005), busy())
+        return profiler
+
+    profiler = asyncio.run(scenario())
+    leaf, share = profiler.top_functions(1)[0]
+    assert leaf.startswith("block_the_loop (test_perf.py:") and share > 0.3
+    assert "block_the_loop" in profiler.folded()
@@ -0,0 +1,115 @@
+# tests/test_quota.py
+import asyncio
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+import pytz
+from googleapiclient.errors import HttpError
+
+from utils import quota
+from utils.quota import QuotaExhaustedError, QuotaLedger, YouTubeKeyPool
+from utils.resilience import Resilience
+
+def freeze_utc(monkeypatch, *args):
+    """Make datetime.now() in utils.quota return this UTC instant."""
+    instant = pytz.utc.localize(datetime(*args))
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return instant.astimezone(tz) if tz else instant.replace(tzinfo=None)
+
+    monkeypatch.setattr(quota, "datetime", FrozenDatetime)
+
+def test_ledger_resets_at_pacific_midnight(monkeypatch):
+    freeze_utc(monkeypatch, 2024, 3, 12, 6, 59) # 23:59 PDT on the 11th, already the 12th in UTC
+    ledger = QuotaLedger(daily_limit=10000)
+    ledger.charge("search.list", calls=2)
+    ledger.charge("videos.list")
+    assert ledger.stats()["day"] == "2024-03-11"
+    assert ledger.remaining() == 10000 - 201
+
+    freeze_utc(monkeypatch, 2024, 3, 12, 7, 0) # Midnight Pacific
+    assert ledger.remaining() == 10000
+    assert ledger.stats() == {"day": "2024-03-12", "used": 0, "limit": 10000, "remaining": 10000, "by_method": {}}
+
+class FakeRequest:
+    def __init__(self, key: str, outcomes: dict):
+        self.key = key
+        self.outcomes = outcomes
+
+    def execute(self):
+        outcome = self.outcomes[self.key]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+def quota_exceeded() -> HttpError:
+    return HttpError(SimpleNamespace(status=403, reason="Forbidden"), b'{"error": {"errors": [{"reason": "quotaExceeded"}]}}')
+
+def test_quota_exceeded_switches_to_the_next_key(monkeypatch):
+    monkeypatch.setattr(quota.random, "choices", lambda keys, weights: [keys[0]]) # Always try the first candidate
+    outcomes = {"key-aaaa": quota_exceeded(), "key-bbbb": {"items": ["live"]}}
+    pool = YouTubeKeyPool(["key-aaaa", "key-bbbb"], Resilience(failure_threshold=1, base_delay=0), daily_limit=100,
+                          client_factory=lambda key: SimpleNamespace(key=key))
+    make_request = lambda client: FakeRequest(client.key, outcomes)
+
+    assert asyncio.run(pool.execute("videos.list", make_request)) == {"items": ["live"]}
+    first, second = pool.keys
+    assert first.exhausted_on == quota.pacific_today() and first.available() == 0
+    assert first.ledger.used == 1 and second.ledger.used == 1 # The refused call is billed too
+    assert pool.switches == 1
+    assert pool.resilience.breaker("youtube.videos.list").state == "closed"
+
+    # The exhausted key isn't picked again today
+    assert asyncio.run(pool.execute("videos.list", make_request)) == {"items": ["live"]}
+    assert pool.switches == 1 and pool.used == 3
+
+    outcomes["key-bbbb"] = quota_exceeded()
+    with pytest.raises(QuotaExhaustedError):
+        asyncio.run(pool.execute("videos.list", make_request))
+    assert pool.stats()["remaining"] == 0
+
+def test_concurrent_calls_on_one_key_get_their_own_client():
+    clients = []
+    both_started = threading.Barrier(2, timeout=5)
+
+    class FakeClient:
+        def __init__(self, key):
+            self.busy = False
+            clients.append(self)
+
+        def execute(self):
+            assert not self.busy, "Client used by two threads at once"
+            self.busy = True
+            both_started.wait() # Both requests are in flight together
+            self.busy = False
+            return {"items": []}
+
+    pool = YouTubeKeyPool(["key-aaaa"], Resilience(), client_factory=FakeClient)
+
+    async def scenario():
+        return await asyncio.gather(*(pool.execute("videos.list", lambda client: client) for _ in range(2)))
+
+    assert asyncio.run(scenario()) == [{"items": []}, {"items": []}]
+    assert len(clients) == 2
+
+def test_every_attempt_is_charged():
+    attempts = []
+
+    class FlakyClient:
+        def __init__(self, key):
+            pass
+
+        def execute(self):
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise HttpError(SimpleNamespace(status=503, reason="Backend Error"), b"{}")
+            return {"items": []}
+
+    pool = YouTubeKeyPool(["key-aaaa"], Resilience(base_delay=0), client_factory=FlakyClient)
+    assert asyncio.run(pool.execute("search.list", lambda client: client)) == {"items": []}
+    assert len(attempts) == 3
+    assert pool.keys[0].ledger.by_method["search.list"] == 300
@@ -0,0 +1,74 @@
+# tests/test_replay.py
+import asyncio
+import glob
+import os
+import time
+
+import discord
+import pytest
+
+from benchmarks.announce_latency import FIXTURES_DIR, run_fixture
+from utils.replay import ReplayDiscord, ReplayGoogleService, ReplayLog, VirtualClock
+
+START = 1_767_000_000.0
+
+def test_virtual_clock_skips_waits():
+    clock = VirtualClock(START)
+
+    async def scenario():
+        await asyncio.sleep(3540)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(asyncio.Event().wait(), timeout=60)
+        return time.time(), time.monotonic()
+
+    started = time.perf_counter()
+    now, monotonic = clock.run(scenario())
+    assert time.perf_counter() - started < 1
+    assert now == START + 3600 and monotonic == 3600
+    assert clock.elapsed() == 3600
+
+def test_replay_discord_consumes_exchanges_in_order():
+    clock = VirtualClock(START)
+    replay_log = ReplayLog(clock)
+    route = {"service": "discord", "method": "POST", "path": "/channels/{channel_id}/messages"}
+    replay = ReplayDiscord([
+        {**route, "latency": 0.5, "status": 200, "response": {"id": "1"}},
+        {**route, "latency": 0.25, "status": 200, "response": {"id": "2"}},
+        {"service": "discord", "method": "DELETE", "path": "/channels/{channel_id}/messages/{message_id}",
+         "latency": 0.1, "status": 404, "response": {"message": "Unknown Message"}},
+    ], clock, replay_log)
+
+    async def scenario():
+        ids = [(await replay.request("POST", route["path"]))["id"] for _ in range(3)]
+        with pytest.raises(discord.HTTPException):
+            await replay.request("DELETE", "/channels/{channel_id}/messages/{message_id}")
+        with pytest.raises(LookupError):
+            await replay.request("PATCH", "/unrecorded")
+        return ids
+
+    assert clock.run(scenario()) == ["1", "2", "2"] # The last exchange repeats
+    assert [call["done"] for call in replay_log.calls] == [0.5, 0.75, 1.0, 1.1]
+
+def test_replay_google_answers_with_the_state_at_the_current_time():
+    clock = VirtualClock(START)
+    replay_log = ReplayLog(clock)
+    exchanges = [
+        {"service": "youtube", "method": "search.list", "at": 0, "latency": 0.2, "status": 200, "response": {"items": []}},
+        {"service": "youtube", "method": "search.list", "at": 60, "latency": 0.2, "status": 200,
+         "response": {"items": [{"id": {"videoId": "live"}}]}},
+    ]
+    youtube = ReplayGoogleService(exchanges, "youtube", clock, replay_log)
+    assert youtube.search().list(part="id").execute() == {"items": []}
+    clock.advance(60)
+    assert youtube.search().list(part="id").execute()["items"][0]["id"]["videoId"] == "live"
+    assert clock.elapsed() == pytest.approx(60.4) # Each blocking call advanced the clock by its latency
+    assert replay_log.counts() == {"youtube search.list": 2}
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.json"))), ids=os.path.basename)
+def test_fixture_scenarios_are_deterministic(path):
+    first = run_fixture(path, phases=2)
+    second = run_fixture(path, phases=2)
+    latencies = [result.latencies for result in first]
+    assert all(latency is not None for run in latencies for latency in run), "an announcement or role change never happened"
+    assert latencies == [result.latencies for result in second]
+    assert [result.calls for result in first] == [result.calls for result in second]
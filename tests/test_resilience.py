@@ -0,0 +1,154 @@
+# tests/test_resilience.py
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from googleapiclient.errors import HttpError
+
+from utils.resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, DeadlineExceeded, Resilience, RetryBudget, deadline,
+)
+
+def http_error(status: int, reason: str = "") -> HttpError:
+    return HttpError(SimpleNamespace(status=status, reason=reason), f'{{"error": {{"reason": "{reason}"}}}}'.encode())
+
+class Flaky:
+    """Fails with `error` for the first `failures` calls, then returns "ok"."""
+    def __init__(self, error: Exception, failures: int = 1_000):
+        self.error = error
+        self.failures = failures
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+def test_breaker_opens_then_lets_one_trial_through(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("youtube.videos", failure_threshold=2, reset_timeout=30)
+    breaker.record_failure(http_error(503))
+    assert breaker.state == CLOSED
+    breaker.record_failure(http_error(503))
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    now[0] += 30
+    breaker.check()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError): # Only one trial at a time
+        breaker.check()
+    breaker.record_failure(http_error(503))
+    assert breaker.state == OPEN and breaker.opened_at == now[0]
+
+    now[0] += 30
+    breaker.check()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.consecutive_failures == 0
+    breaker.check()
+
+def test_transient_failures_are_retried_until_success():
+    resilience = Resilience(max_attempts=3, base_delay=0)
+    func = Flaky(http_error(503), failures=2)
+    assert asyncio.run(resilience.call("youtube.videos", func)) == "ok"
+    assert func.calls == 3
+    assert resilience.breaker("youtube.videos").state == CLOSED
+    assert resilience.budget.retries == 2
+
+def test_non_transient_errors_are_not_retried():
+    resilience = Resilience(failure_threshold=1, base_delay=0)
+    func = Flaky(http_error(404))
+    with pytest.raises(HttpError):
+        asyncio.run(resilience.call("youtube.videos", func))
+    assert func.calls == 1
+    assert resilience.breaker("youtube.videos").state == CLOSED
+
+def test_retry_budget_caps_retries():
+    budget = RetryBudget(ratio=0.5, min_per_minute=0, max_tokens=2)
+    assert budget.withdraw() and budget.withdraw()
+    assert not budget.withdraw()
+    assert budget.exhausted == 1
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+
+    resilience = Resilience(failure_threshold=10, max_attempts=5, base_delay=0, budget=budget)
+    func = Flaky(http_error(500))
+    with pytest.raises(HttpError):
+        asyncio.run(resilience.call("discord.broadcast", func))
+    assert func.calls == 1 # Budget was empty, so no retries
+    assert budget.exhausted == 2
+
+def test_quota_errors_skip_retries_and_the_breaker():
+    resilience = Resilience(failure_threshold=1, base_delay=0)
+    func = Flaky(http_error(403, "quotaExceeded"))
+    with pytest.raises(HttpError):
+        asyncio.run(resilience.call("youtube.search", func))
+    assert func.calls == 1
+    breaker = resilience.breaker("youtube.search")
+    assert breaker.state == CLOSED and breaker.consecutive_failures == 0
+
+def test_deadline_abandons_async_calls():
+    async def scenario():
+        resilience = Resilience()
+        with deadline(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await resilience.call("youtube.videos", asyncio.sleep, 5)
+            await asyncio.sleep(0.06)
+            with pytest.raises(DeadlineExceeded): # Already passed, the call isn't made
+                await resilience.call("youtube.videos", Flaky(http_error(503)))
+        assert resilience.breaker("youtube.videos").consecutive_failures == 0
+
+    asyncio.run(scenario())
+
+def test_endpoint_timeouts_within_the_deadline_are_retried():
+    async def scenario():
+        resilience = Resilience(base_delay=0)
+        func = Flaky(asyncio.TimeoutError(), failures=1) # aiohttp's own timeout, not the caller's deadline
+        with deadline(5):
+            assert await resilience.call("scrape.youtube", func) == "ok"
+        assert func.calls == 2 and resilience.budget.retries == 1
+
+        resilience = Resilience(failure_threshold=1, base_delay=0)
+        with deadline(5):
+            with pytest.raises(asyncio.TimeoutError) as raised:
+                await resilience.call("scrape.youtube", Flaky(asyncio.TimeoutError()))
+        assert not isinstance(raised.value, DeadlineExceeded)
+        assert resilience.breaker("scrape.youtube").state == OPEN
+
+    asyncio.run(scenario())
+
+def test_sync_calls_run_off_the_loop_and_honour_the_deadline():
+    async def scenario():
+        resilience = Resilience()
+        release = threading.Event()
+        ticks = 0
+
+        def blocking_execute():
+            release.wait(5)
+            return threading.get_ident()
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        started = time.monotonic()
+        with deadline(0.1):
+            with pytest.raises(DeadlineExceeded):
+                await resilience.call("youtube.videos", blocking_execute)
+        assert time.monotonic() - started < 1
+        assert ticks > 1 # The loop kept running while the call blocked
+        release.set()
+
+        assert await resilience.call("youtube.videos", blocking_execute) != threading.get_ident()
+        ticking.cancel()
+
+    asyncio.run(scenario())
@@ -0,0 +1,108 @@
+# tests/test_role_bulk.py
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+from cogs.role_bulk import BulkRoleJob, RoleBulk
+from utils.member_cache import MemberLRU
+
+ROLE = SimpleNamespace(id=10)
+
+def make_job(member_ids=range(1000)) -> BulkRoleJob:
+    return BulkRoleJob({
+        "id": "abcd1234", "guild_id": 1, "role_id": ROLE.id, "action": "add", "member_ids": list(member_ids),
+        "position": 0, "changed": 0, "skipped": 0, "failed": 0, "state": "running", "requested_by": "mod",
+        "channel_id": 5, "message_id": None,
+    })
+
+class FakeGuild:
+    """A guild seen without a member cache (lru mode): get_member always misses."""
+    def __init__(self, members_with_role=()):
+        self.id = 1
+        self.with_role = set(members_with_role)
+        self.fetched = []
+
+    def get_role(self, role_id):
+        return ROLE if role_id == ROLE.id else None
+
+    def get_member(self, member_id):
+        return None
+
+    async def fetch_member(self, member_id):
+        self.fetched.append(member_id)
+        return SimpleNamespace(guild=self, id=member_id, roles=[ROLE] if member_id in self.with_role else [])
+
+class FakeRoutes:
+    def __init__(self, guild):
+        self.guild = guild
+        self.added = []
+
+    async def add_role(self, guild_id, member_id, role_id, reason=None):
+        self.added.append(member_id)
+        self.guild.with_role.add(member_id)
+
+def make_cog(tmp_path, guild):
+    bot = SimpleNamespace(
+        config=SimpleNamespace(role_bulk_checkpoint_dir=str(tmp_path), role_bulk_rate_per_second=0),
+        get_guild=lambda guild_id: guild if guild and guild_id == guild.id else None,
+        get_channel=lambda channel_id: None,
+        http=FakeRoutes(guild),
+        member_cache=MemberLRU(),
+    )
+    return RoleBulk(bot)
+
+def test_checkpoint_writes_member_list_once(tmp_path):
+    cog = RoleBulk(SimpleNamespace(config=SimpleNamespace(role_bulk_checkpoint_dir=str(tmp_path))))
+    job = make_job()
+    asyncio.run(cog._save_members(job))
+    cog._save_checkpoint(job)
+
+    members_mtime = os.stat(cog._members_path(job.id)).st_mtime_ns
+    job.data["position"] = 500
+    job.data["changed"] = 480
+    cog._save_checkpoint(job)
+
+    with open(cog._checkpoint_path(job.id)) as f:
+        progress = json.load(f)
+    assert "member_ids" not in progress and progress["position"] == 500
+    assert os.stat(cog._members_path(job.id)).st_mtime_ns == members_mtime
+
+    resumed = cog._load_checkpoint(os.path.basename(cog._checkpoint_path(job.id)))
+    assert resumed.data == job.data
+    assert resumed.remaining == 500
+
+    cog._remove_checkpoint(job)
+    assert os.listdir(tmp_path) == []
+
+def test_resumed_job_skips_members_already_changed(tmp_path):
+    guild = FakeGuild(members_with_role={2}) # Member 2 was changed just before the restart
+    cog = make_cog(tmp_path, guild)
+    job = make_job([1, 2, 3, 4])
+    job.data.update(position=1, changed=1)
+
+    asyncio.run(cog._run(job))
+    assert cog.bot.http.added == [3, 4]
+    assert guild.fetched == [2, 3, 4] # Looked up even though get_member misses
+    assert job.data["changed"] == 3 and job.data["skipped"] == 1 and job.data["state"] == "completed"
+    assert os.listdir(tmp_path) == []
+
+def test_progress_is_saved_after_every_member(tmp_path):
+    guild = FakeGuild()
+    cog = make_cog(tmp_path, guild)
+    job = make_job([1, 2, 3])
+    saved = []
+    cog._save_checkpoint = lambda job: saved.append((job.data["position"], job.data["changed"]))
+
+    asyncio.run(cog._run(job))
+    assert saved == [(1, 1), (2, 2), (3, 3)]
+
+def test_failed_jobs_leave_no_checkpoint(tmp_path):
+    cog = make_cog(tmp_path, guild=None) # The guild is gone
+    job = make_job()
+    asyncio.run(cog._save_members(job))
+    cog._save_checkpoint(job)
+
+    asyncio.run(cog._run(job))
+    assert job.data["state"].startswith("failed")
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,25 @@
+# tests/test_role_buttons.py
+import asyncio
+from types import SimpleNamespace
+
+from cogs.role_buttons import RoleButton
+
+class FakeResponse:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, content=None, **kwargs):
+        self.sent.append((content, kwargs))
+
+def test_unknown_role_button_refuses():
+    async def scenario():
+        registry = SimpleNamespace(roles={}, menus={})
+        client = SimpleNamespace(get_cog=lambda name: SimpleNamespace(registry=registry))
+        interaction = SimpleNamespace(client=client, response=FakeResponse(), guild=None)
+
+        button = await RoleButton.from_custom_id(interaction, SimpleNamespace(label="Removed role"), {"role_id": "42"})
+        assert not button.configured
+        await button.callback(interaction)
+        assert interaction.response.sent == [("This role button is no longer configured.", {"ephemeral": True})]
+
+    asyncio.run(scenario())
@@ -0,0 +1,87 @@
+# tests/test_role_queue.py
+import asyncio
+from types import SimpleNamespace
+
+from utils.role_queue import RoleToggleQueue
+
+class FakeMember:
+    def __init__(self, guild, member_id, calls):
+        self.guild = guild
+        self.id = member_id
+        self.roles = []
+        self._calls = calls
+
+    async def add_roles(self, role, reason=None):
+        self._calls.append(("add", self.id, role.id))
+        self.roles.append(role)
+
+    async def remove_roles(self, role, reason=None):
+        self._calls.append(("remove", self.id, role.id))
+        self.roles.remove(role)
+
+class FakeGuild:
+    def __init__(self, guild_id=1):
+        self.id = guild_id
+        self.calls = []
+        self.members = {}
+
+    def member(self, member_id) -> FakeMember:
+        return self.members.setdefault(member_id, FakeMember(self, member_id, self.calls))
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+ROLE = SimpleNamespace(id=10, name="Notifications")
+OTHER_ROLE = SimpleNamespace(id=11, name="Events")
+
+async def drain(queue: RoleToggleQueue):
+    while queue.pending_count():
+        await asyncio.sleep(0)
+    await asyncio.sleep(0) # Let the last change finish applying
+
+def test_repeated_toggles_collapse_into_one_change():
+    async def scenario():
+        guild = FakeGuild()
+        member = guild.member(1)
+        queue = RoleToggleQueue(rate_per_second=0)
+        assert queue.toggle(member, ROLE) is True
+        assert queue.toggle(member, ROLE) is False
+        assert queue.toggle(member, ROLE) is True # Last write wins
+        assert queue.pending_count(guild.id) == 1 and queue.coalesced == 2
+        assert queue.will_have_role(member, ROLE)
+
+        await drain(queue)
+        await queue.close()
+        assert guild.calls == [("add", 1, ROLE.id)]
+        assert queue.applied == 1
+
+    asyncio.run(scenario())
+
+def test_toggle_back_to_current_state_makes_no_call():
+    async def scenario():
+        guild = FakeGuild()
+        member = guild.member(1)
+        queue = RoleToggleQueue(rate_per_second=0)
+        queue.toggle(member, ROLE)
+        queue.toggle(member, ROLE)
+        await drain(queue)
+        await queue.close()
+        assert guild.calls == []
+        assert queue.skipped == 1 and queue.applied == 0
+
+    asyncio.run(scenario())
+
+def test_coalesced_entry_keeps_its_queue_position():
+    async def scenario():
+        guild = FakeGuild()
+        queue = RoleToggleQueue(rate_per_second=0)
+        first, second = guild.member(1), guild.member(2)
+        queue.toggle(first, ROLE)
+        queue.toggle(second, ROLE)
+        queue.toggle(first, OTHER_ROLE) # Different role, its own entry
+        queue.submit(guild, first.id, ROLE, True) # Coalesces into the first entry
+        await drain(queue)
+        await queue.close()
+        assert guild.calls == [("add", 1, ROLE.id), ("add", 2, ROLE.id), ("add", 1, OTHER_ROLE.id)]
+
+    asyncio.run(scenario())
@@ -0,0 +1,62 @@
+# tests/test_settings.py
+import asyncio
+from dataclasses import replace
+from types import SimpleNamespace
+from unittest import mock
+
+import discord
+
+from cogs.settings import YouTubeMonitorSettings
+from config import BotConfig
+from utils.resilience import Resilience
+
+CHANNEL_ID = 123456789012345678
+
+class FakeResponse:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, content=None, **kwargs):
+        self.sent.append(content)
+
+def submit(config, youtube_channel_id="", youtube_keys=()):
+    """Fill in the YouTube monitor modal to enable the monitor, and return the reply."""
+    monitor = SimpleNamespace(monitor_loop=SimpleNamespace(is_running=lambda: False), reschedule=lambda: True)
+    client = SimpleNamespace(youtube_keys=list(youtube_keys), http_client=None, resilience=Resilience(),
+                             get_cog=lambda name: monitor)
+    channel = mock.MagicMock(spec=discord.TextChannel)
+    guild = SimpleNamespace(get_channel=lambda channel_id: channel, me=None)
+    interaction = SimpleNamespace(client=client, guild=guild, response=FakeResponse())
+
+    async def scenario():
+        modal = YouTubeMonitorSettings(config)
+        modal.enabled._value = "true"
+        modal.youtube_channel_id._value = youtube_channel_id
+        modal.discord_channel_id._value = str(CHANNEL_ID)
+        await modal.on_submit(interaction)
+
+    asyncio.run(scenario())
+    return interaction.response.sent[-1]
+
+def test_twitch_kick_only_monitor_can_be_enabled_without_an_api_key(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path) # config.save() writes config.json here
+    config = replace(BotConfig(), youtube_monitor_platform_links={"Kick": "https://kick.com/streamer"})
+    assert submit(config).startswith("YouTube Monitor settings updated!")
+    assert config.youtube_monitor_enabled and config.youtube_channel_id is None
+
+def test_youtube_channel_still_needs_an_api_key(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = replace(BotConfig(), youtube_monitor_platform_links={"Kick": "https://kick.com/streamer"})
+    reply = submit(config, youtube_channel_id="UCxxxxxxxxxxxxxxxxxxxxxx")
+    assert reply.startswith("**Configuration errors:**") and "YOUTUBE_API_KEYS" in reply
+    assert not config.youtube_monitor_enabled
+
+    reply = submit(config, youtube_channel_id="UCxxxxxxxxxxxxxxxxxxxxxx", youtube_keys=["key"])
+    assert reply.startswith("YouTube Monitor settings updated!")
+
+def test_enabling_needs_something_to_monitor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = replace(BotConfig(), youtube_monitor_platform_links={})
+    reply = submit(config)
+    assert "A YouTube Channel ID, or Twitch/Kick links" in reply
+    assert not config.youtube_monitor_enabled
@@ -0,0 +1,59 @@
+# tests/test_sharding.py
+from types import SimpleNamespace
+
+import discord
+
+from config import BotConfig
+from main import shard_options
+from utils.sharding import ShardStats, ShardTelemetry, owns_channel, owns_guild, shard_for_guild
+
+class FakeShardedBot(discord.AutoShardedClient):
+    """Only what the ownership helpers read, without a gateway connection."""
+    def __init__(self, shard_ids, shard_count, channels=()):
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self._channels = set(channels)
+
+    def get_channel(self, channel_id):
+        return object() if channel_id in self._channels else None
+
+def guild_on_shard(shard_id: int, shard_count: int) -> int:
+    return ((1000 * shard_count + shard_id) << 22) | 12345
+
+def test_shard_for_guild():
+    assert shard_for_guild(guild_on_shard(3, 4), 4) == 3
+    assert shard_for_guild(guild_on_shard(0, 1), 1) == 0
+
+def test_owns_guild():
+    assert owns_guild(SimpleNamespace(), guild_on_shard(3, 4)) # Unsharded bots own everything
+    assert owns_guild(FakeShardedBot(None, 4), guild_on_shard(3, 4)) # Every shard in this process
+    split = FakeShardedBot([0, 1], 4)
+    assert owns_guild(split, guild_on_shard(1, 4))
+    assert not owns_guild(split, guild_on_shard(2, 4))
+
+def test_owns_channel():
+    assert not owns_channel(SimpleNamespace(), None)
+    assert owns_channel(SimpleNamespace(), 5)
+    split = FakeShardedBot([0], 2, channels=[5])
+    assert owns_channel(split, 5) and not owns_channel(split, 6)
+
+def test_shard_options():
+    config = BotConfig()
+    assert shard_options(config) == {}
+    config.shard_count = 4
+    config.shard_ids = [2, 3]
+    assert shard_options(config) == {"shard_count": 4, "shard_ids": [2, 3]}
+    config.shard_count = None
+    assert shard_options(config) == {} # shard_ids alone is ignored
+
+def test_event_rate_from_sequence_samples():
+    stats = ShardStats()
+    assert ShardTelemetry._rate(stats, 300) is None
+    for i in range(12):
+        stats.samples.append((i * 30.0, i * 600)) # 20 events a second
+    assert ShardTelemetry._rate(stats, 300) == 20
+    stats.samples.append((360.0, 5)) # Sequence restarted with a new session
+    assert ShardTelemetry._rate(stats, 300) is None
+
+    stats.connects, stats.resumes = 3, 1
+    assert stats.reconnects == 3
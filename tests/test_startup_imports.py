@@ -0,0 +1,6 @@
+# tests/test_startup_imports.py
+from benchmarks.startup_imports import LAZY_MODULES, measure
+
+def test_default_startup_skips_feature_modules():
+    imported = {module for *_, module in measure(all_cogs=False)}
+    assert not imported & set(LAZY_MODULES)
@@ -0,0 +1,73 @@
+# tests/test_timer_heap.py
+import asyncio
+import time
+
+from utils.timer_heap import TimerHeap
+
+def run_heap(setup, wait: float = 0.1) -> list:
+    """Start a heap, let `setup(heap)` schedule items, and return what fired within `wait` seconds."""
+    fired = []
+
+    async def callback(item, due):
+        fired.append(item)
+
+    async def scenario():
+        heap = TimerHeap(callback, name="test")
+        heap.start()
+        await setup(heap)
+        await asyncio.sleep(wait)
+        await heap.stop()
+
+    asyncio.run(scenario())
+    return fired
+
+def test_items_fire_in_due_order():
+    async def setup(heap):
+        now = time.time()
+        heap.schedule("c", now + 0.03)
+        heap.schedule("a", now + 0.01)
+        heap.schedule("b", now + 0.02)
+        heap.schedule("late", now + 60)
+
+    assert run_heap(setup) == ["a", "b", "c"]
+
+def test_reschedule_and_cancel():
+    async def setup(heap):
+        now = time.time()
+        heap.schedule("moved", now + 0.01)
+        heap.schedule("moved", now + 0.03) # Replaces the first entry
+        heap.schedule("cancelled", now + 0.02)
+        heap.cancel("cancelled")
+        assert len(heap) == 1
+        assert heap.next_due() == now + 0.03
+
+    assert run_heap(setup) == ["moved"]
+
+def test_earlier_item_wakes_the_sleeping_task():
+    async def setup(heap):
+        heap.schedule("later", time.time() + 60)
+        await asyncio.sleep(0.01) # The task is now sleeping until "later"
+        heap.schedule("sooner", time.time() + 0.01)
+
+    assert run_heap(setup) == ["sooner"]
+
+def test_overdue_items_fire_and_failures_dont_stop_the_heap():
+    fired = []
+
+    async def callback(item, due):
+        fired.append(item)
+        if item == "broken":
+            raise RuntimeError("send failed")
+
+    async def scenario():
+        heap = TimerHeap(callback, name="test")
+        heap.schedule("broken", time.time() - 30)
+        heap.schedule("next", time.time() + 0.01)
+        heap.start()
+        await asyncio.sleep(0.05)
+        await heap.stop()
+        assert heap.stats()["fired"] == 2
+        assert heap.stats()["jitter_max_s"] >= 30
+
+    asyncio.run(scenario())
+    assert fired == ["broken", "next"]
@@ -0,0 +1,107 @@
+# tests/test_transcript_formats.py
+import csv
+import json
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+from utils.chat_parsing import ChatMessage, parse_chat_payload
+from utils.transcript_formats import (
+    COLUMNAR_HEADER, ColumnarTranscript, convert_transcript_file, write_chat_payload, write_transcript_file
+)
+
+START = datetime(2026, 1, 1, 20, 0, tzinfo=pytz.UTC)
+DETAILS = {"title": "Launch stream", "start_time": "2026-01-01T20:00:00Z", "end_time": None}
+MESSAGES = [
+    ChatMessage(START, "alice", "hello world"),
+    ChatMessage(START + timedelta(seconds=1), "bob", "héllo again, wörld"),
+    ChatMessage(START + timedelta(seconds=2), "alice", "hel"),
+    ChatMessage(START + timedelta(seconds=3), "carol", "lo there"),
+]
+
+def write(tmp_path, fmt, messages=MESSAGES):
+    path = str(tmp_path / f"transcript.{fmt}")
+    assert write_transcript_file(path, fmt, "vid00000001", DETAILS, iter(messages)) == len(messages)
+    return path
+
+def test_columnar_round_trip(tmp_path):
+    with ColumnarTranscript(write(tmp_path, "columnar")) as transcript:
+        assert len(transcript) == 4
+        assert transcript.metadata["title"] == "Launch stream"
+        decoded = list(transcript.iter_messages())
+    assert [(m.timestamp, m.author, m.message) for m in decoded] == [(m.timestamp, m.author, m.message) for m in MESSAGES]
+
+def test_columnar_find_searches_in_place(tmp_path):
+    with ColumnarTranscript(write(tmp_path, "columnar")) as transcript:
+        assert list(transcript.find("hel")) == [0, 2]
+        assert list(transcript.find("wörld")) == [1]
+        # "hel" + "lo there" are adjacent in the blob, a match across them isn't a message match
+        assert list(transcript.find("hello")) == [0]
+        assert list(transcript.find("missing")) == []
+        assert [m.author for m in transcript.iter_messages(transcript.find("hel"))] == ["alice", "alice"]
+
+def test_columnar_empty_transcript(tmp_path):
+    with ColumnarTranscript(write(tmp_path, "columnar", [])) as transcript:
+        assert len(transcript) == 0
+        assert list(transcript.find("x")) == []
+
+def test_columnar_rejects_other_files(tmp_path):
+    wrong = tmp_path / "wrong.lsct"
+    wrong.write_bytes(b"\0" * (COLUMNAR_HEADER.size + 16))
+    with pytest.raises(ValueError, match="not a columnar transcript"):
+        ColumnarTranscript(str(wrong))
+    short = tmp_path / "short.lsct"
+    short.write_bytes(b"LSCT")
+    with pytest.raises(ValueError, match="too short"):
+        ColumnarTranscript(str(short))
+
+def test_line_formats(tmp_path):
+    with open(write(tmp_path, "jsonl"), encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines[0]["type"] == "metadata" and lines[0]["video_id"] == "vid00000001"
+    assert [line["author"] for line in lines[1:]] == ["alice", "bob", "alice", "carol"]
+
+    with open(write(tmp_path, "csv"), encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["timestamp", "author", "message"]
+    assert rows[2][2] == "héllo again, wörld"
+
+def test_appending_chunks_matches_one_write(tmp_path):
+    whole = write(tmp_path, "text")
+    chunked = str(tmp_path / "chunked.txt")
+    write_transcript_file(chunked, "text", "vid00000001", DETAILS, MESSAGES[:2])
+    write_transcript_file(chunked, "text", "vid00000001", DETAILS, MESSAGES[2:], header=False, append=True)
+    with open(whole, encoding="utf-8") as a, open(chunked, encoding="utf-8") as b:
+        # The Generated: line may differ by a second between the two writes
+        assert [l for l in a if not l.startswith("Generated")] == [l for l in b if not l.startswith("Generated")]
+
+    with pytest.raises(ValueError):
+        write_transcript_file(str(tmp_path / "x.lsct"), "columnar", "v", DETAILS, [], append=True)
+
+def chat_payload(messages):
+    actions = [{"addChatItemAction": {"item": {"liveChatTextMessageRenderer": {
+        "authorName": {"simpleText": m.author},
+        "message": {"runs": [{"text": m.message}]},
+        "timestampUsec": str(int(m.timestamp.timestamp() * 1_000_000)),
+    }}}} for m in reversed(messages)] # Out of order, the parser sorts by time
+    return json.dumps({"actions": actions})
+
+def test_chat_payload_written_as_summary(tmp_path):
+    payload = chat_payload(MESSAGES)
+    parsed = parse_chat_payload(payload)
+    spool = str(tmp_path / "chat.lsct")
+    summary = write_chat_payload(payload, spool, "columnar", "vid00000001", DETAILS)
+    assert (summary.path, summary.count) == (spool, 4)
+    assert (summary.first, summary.last) == (parsed[0].timestamp, parsed[-1].timestamp)
+
+    text = str(tmp_path / "converted.txt")
+    assert convert_transcript_file(spool, text, "text", "vid00000001", DETAILS) == 4
+    with open(text, encoding="utf-8") as f:
+        with open(write(tmp_path, "text", parsed), encoding="utf-8") as expected:
+            # Only the generated-at line can differ
+            assert [l for l in f if "Generated" not in l] == [l for l in expected if "Generated" not in l]
+
+def test_empty_chat_payload(tmp_path):
+    summary = write_chat_payload(json.dumps({"actions": []}), str(tmp_path / "chat.lsct"), "columnar", "vid", DETAILS)
+    assert summary.count == 0 and summary.first is None
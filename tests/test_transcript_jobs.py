@@ -0,0 +1,49 @@
+# tests/test_transcript_jobs.py
+import asyncio
+from types import SimpleNamespace
+
+from utils.transcript_jobs import JobWaiter, TranscriptJob, TranscriptJobQueue
+
+def waiter(user_id: int, fmt: str = "text") -> JobWaiter:
+    return JobWaiter(SimpleNamespace(user=SimpleNamespace(id=user_id)), None, fmt)
+
+def test_deliver_serves_each_format_once():
+    job = TranscriptJob("vid", {})
+    job.waiters += [waiter(1, "text"), waiter(2, "csv"), waiter(3, "text")]
+    sent = []
+
+    async def send_format(fmt, waiters):
+        sent.append((fmt, [w.user_id for w in waiters]))
+
+    asyncio.run(job.deliver(send_format))
+    assert sent == [("text", [1, 3]), ("csv", [2])]
+    assert not job.accepting
+
+def test_deliver_serves_waiters_that_join_during_delivery():
+    job = TranscriptJob("vid", {})
+    job.waiters.append(waiter(1, "text"))
+    sent = []
+
+    async def send_format(fmt, waiters):
+        sent.append((fmt, [w.user_id for w in waiters]))
+        if len(sent) == 1:
+            # Joins while the first file is going out, once with a delivered format and once with a new one
+            job.waiters += [waiter(2, "text"), waiter(3, "jsonl")]
+
+    asyncio.run(job.deliver(send_format))
+    assert sent == [("text", [1]), ("text", [2]), ("jsonl", [3])]
+
+def test_submit_after_delivery_starts_a_new_job():
+    async def scenario():
+        queue = TranscriptJobQueue(runner=None)
+        first, created = await queue.submit("vid", {}, waiter(1))
+        assert created
+        joined, created = await queue.submit("vid", {}, waiter(2, "csv"))
+        assert joined is first and not created
+
+        first.accepting = False
+        second, created = await queue.submit("vid", {}, waiter(3))
+        assert created and second is not first
+        assert [w.user_id for w in first.waiters] == [1, 2]
+
+    asyncio.run(scenario())
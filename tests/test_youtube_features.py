@@ -0,0 +1,55 @@
+# tests/test_youtube_features.py
+import asyncio
+import os
+from dataclasses import replace
+from types import SimpleNamespace
+
+from cogs.youtube_features import YouTubeFeatures
+from config import BotConfig
+
+class FakeFollowup:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content)
+        return SimpleNamespace(edit=self.edit)
+
+    async def edit(self, **kwargs):
+        pass
+
+def make_interaction():
+    async def defer(**kwargs):
+        pass
+    return SimpleNamespace(guild=SimpleNamespace(id=1), response=SimpleNamespace(defer=defer), followup=FakeFollowup(),
+                           user=SimpleNamespace(guild_permissions=SimpleNamespace(manage_messages=True)))
+
+def test_failed_bulk_fetch_waits_for_the_others_before_removing_the_workdir(tmp_path):
+    config = replace(BotConfig(), chat_index_path=str(tmp_path / "chat_index.db"), offload_process_workers=0)
+    cog = YouTubeFeatures(SimpleNamespace(config=config, http_client=None, youtube_keys=None, metadata_cache=None))
+    written = []
+
+    async def get_streams_details(video_ids):
+        return {vid: {"title": vid} for vid in video_ids}, 1
+
+    async def bulk_fetch(video_id, details, fmt, semaphore, workdir):
+        if video_id == "failing0001":
+            raise RuntimeError("replay fetch failed")
+        await asyncio.sleep(0.05) # Still writing when the other one fails
+        filename = os.path.join(workdir, f"{video_id}.txt")
+        with open(filename, "w") as f:
+            f.write("chat")
+        written.append(filename)
+        return video_id, filename, 1
+
+    cog.get_streams_details = get_streams_details
+    cog._bulk_fetch = bulk_fetch
+    interaction = make_interaction()
+    urls = "https://youtu.be/failing0001 https://youtu.be/slowvideo01"
+    try:
+        asyncio.run(YouTubeFeatures.bulk_transcript.callback(cog, interaction, urls, "text"))
+    finally:
+        cog.chat_index.close()
+
+    assert len(written) == 1 and not os.path.exists(written[0]) # Written, then cleaned up with the workdir
+    assert interaction.followup.sent[-1].startswith("❌ An error occurred while generating the transcripts.")
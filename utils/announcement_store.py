@@ -0,0 +1,192 @@
+# utils/announcement_store.py
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scheduled_announcements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    author_id INTEGER NOT NULL,
+    author_name TEXT NOT NULL,
+    author_avatar TEXT,
+    message TEXT NOT NULL,
+    title TEXT,
+    color INTEGER,
+    ping_role_id INTEGER,
+    next_run REAL NOT NULL,
+    interval_seconds INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scheduled_next_run ON scheduled_announcements (next_run);
+CREATE TABLE IF NOT EXISTS broadcasts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    author_id INTEGER NOT NULL,
+    author_name TEXT NOT NULL,
+    author_avatar TEXT,
+    message TEXT NOT NULL,
+    title TEXT,
+    color INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS broadcast_messages (
+    broadcast_id INTEGER NOT NULL REFERENCES broadcasts (id) ON DELETE CASCADE,
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    PRIMARY KEY (broadcast_id, channel_id)
+);
+"""
+
+class ScheduledAnnouncement:
+    def __init__(self, row: sqlite3.Row):
+        self.id: int = row["id"]
+        self.guild_id: int = row["guild_id"]
+        self.channel_id: int = row["channel_id"]
+        self.author_id: int = row["author_id"]
+        self.author_name: str = row["author_name"]
+        self.author_avatar: Optional[str] = row["author_avatar"]
+        self.message: str = row["message"]
+        self.title: Optional[str] = row["title"]
+        self.color: Optional[int] = row["color"]
+        self.ping_role_id: Optional[int] = row["ping_role_id"]
+        self.next_run: float = row["next_run"]
+        self.interval_seconds: int = row["interval_seconds"]
+
+    @property
+    def recurring(self) -> bool:
+        return self.interval_seconds > 0
+
+class Broadcast:
+    def __init__(self, row: sqlite3.Row, copies: List[Tuple[int, int, int]]):
+        self.id: int = row["id"]
+        self.author_id: int = row["author_id"]
+        self.author_name: str = row["author_name"]
+        self.author_avatar: Optional[str] = row["author_avatar"]
+        self.message: str = row["message"]
+        self.title: Optional[str] = row["title"]
+        self.color: Optional[int] = row["color"]
+        self.copies = copies # (guild_id, channel_id, message_id) for every sent copy
+
+class AnnouncementStore:
+    """Durable SQLite store for scheduled/recurring announcements and broadcast message IDs."""
+    def __init__(self, path: str = "announcements.db"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params=(), fetch: bool = False):
+        with self._lock:
+            cur = self._conn.execute(sql, params)
+            rows = cur.fetchall() if fetch else None
+            self._conn.commit()
+            return rows if fetch else cur.lastrowid
+
+    async def add(self, guild_id: int, channel_id: int, author_id: int, author_name: str,
+                  author_avatar: Optional[str], message: str, title: Optional[str], color: Optional[int],
+                  ping_role_id: Optional[int], next_run: float, interval_seconds: int = 0) -> int:
+        return await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO scheduled_announcements (guild_id, channel_id, author_id, author_name, author_avatar, "
+            "message, title, color, ping_role_id, next_run, interval_seconds, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (guild_id, channel_id, author_id, author_name, author_avatar, message, title, color,
+             ping_role_id, next_run, interval_seconds, time.time())
+        )
+
+    async def get(self, announcement_id: int) -> Optional[ScheduledAnnouncement]:
+        rows = await asyncio.to_thread(
+            self._execute, "SELECT * FROM scheduled_announcements WHERE id = ?", (announcement_id,), True
+        )
+        return ScheduledAnnouncement(rows[0]) if rows else None
+
+    async def all(self, guild_id: Optional[int] = None) -> List[ScheduledAnnouncement]:
+        if guild_id is None:
+            rows = await asyncio.to_thread(
+                self._execute, "SELECT * FROM scheduled_announcements ORDER BY next_run", (), True
+            )
+        else:
+            rows = await asyncio.to_thread(
+                self._execute, "SELECT * FROM scheduled_announcements WHERE guild_id = ? ORDER BY next_run",
+                (guild_id,), True
+            )
+        return [ScheduledAnnouncement(row) for row in rows]
+
+    async def set_next_run(self, announcement_id: int, next_run: float):
+        await asyncio.to_thread(
+            self._execute, "UPDATE scheduled_announcements SET next_run = ? WHERE id = ?", (next_run, announcement_id)
+        )
+
+    async def delete(self, announcement_id: int):
+        await asyncio.to_thread(
+            self._execute, "DELETE FROM scheduled_announcements WHERE id = ?", (announcement_id,)
+        )
+
+    # --- Broadcasts ---
+    def _add_broadcast(self, author_id: int, author_name: str, author_avatar: Optional[str], message: str,
+                       title: Optional[str], color: Optional[int], copies: List[Tuple[int, int, int]]) -> int:
+        with self._lock:
+            with self._conn: # One transaction for the broadcast and all of its copies
+                cur = self._conn.execute(
+                    "INSERT INTO broadcasts (author_id, author_name, author_avatar, message, title, color, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (author_id, author_name, author_avatar, message, title, color, time.time())
+                )
+                broadcast_id = cur.lastrowid
+                self._conn.executemany(
+                    "INSERT INTO broadcast_messages (broadcast_id, guild_id, channel_id, message_id) VALUES (?, ?, ?, ?)",
+                    [(broadcast_id, *copy) for copy in copies]
+                )
+            return broadcast_id
+
+    async def add_broadcast(self, author_id: int, author_name: str, author_avatar: Optional[str], message: str,
+                            title: Optional[str], color: Optional[int], copies: List[Tuple[int, int, int]]) -> int:
+        return await asyncio.to_thread(
+            self._add_broadcast, author_id, author_name, author_avatar, message, title, color, copies
+        )
+
+    def _get_broadcast(self, broadcast_id: int) -> Optional[Broadcast]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM broadcasts WHERE id = ?", (broadcast_id,)).fetchone()
+            if not row:
+                return None
+            copies = self._conn.execute(
+                "SELECT guild_id, channel_id, message_id FROM broadcast_messages WHERE broadcast_id = ?",
+                (broadcast_id,)
+            ).fetchall()
+        return Broadcast(row, [tuple(c) for c in copies])
+
+    async def get_broadcast(self, broadcast_id: int) -> Optional[Broadcast]:
+        return await asyncio.to_thread(self._get_broadcast, broadcast_id)
+
+    async def update_broadcast(self, broadcast_id: int, message: str, title: Optional[str], color: Optional[int]):
+        await asyncio.to_thread(
+            self._execute, "UPDATE broadcasts SET message = ?, title = ?, color = ? WHERE id = ?",
+            (message, title, color, broadcast_id)
+        )
+
+    async def remove_broadcast_copies(self, broadcast_id: int, channel_ids: List[int]):
+        def remove():
+            with self._lock:
+                with self._conn:
+                    self._conn.executemany(
+                        "DELETE FROM broadcast_messages WHERE broadcast_id = ? AND channel_id = ?",
+                        [(broadcast_id, channel_id) for channel_id in channel_ids]
+                    )
+                    remaining = self._conn.execute(
+                        "SELECT COUNT(*) FROM broadcast_messages WHERE broadcast_id = ?", (broadcast_id,)
+                    ).fetchone()[0]
+                    if not remaining:
+                        self._conn.execute("DELETE FROM broadcasts WHERE id = ?", (broadcast_id,))
+        await asyncio.to_thread(remove)
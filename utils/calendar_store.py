@@ -0,0 +1,138 @@
+# utils/calendar_store.py
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    description TEXT,
+    location TEXT,
+    html_link TEXT,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    all_day INTEGER NOT NULL DEFAULT 0,
+    updated TEXT,
+    PRIMARY KEY (calendar_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_events_start ON events (start_ts);
+CREATE TABLE IF NOT EXISTS sync_state (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token TEXT,
+    last_sync REAL,
+    full_syncs INTEGER NOT NULL DEFAULT 0,
+    incremental_syncs INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Column order used by CalendarStore.apply_changes
+EVENT_COLUMNS = ("event_id", "summary", "description", "location", "html_link", "start_ts", "end_ts", "all_day", "updated")
+
+class CalendarEvent:
+    def __init__(self, row: sqlite3.Row):
+        self.calendar_id: str = row["calendar_id"]
+        self.id: str = row["event_id"]
+        self.summary: str = row["summary"]
+        self.description: Optional[str] = row["description"]
+        self.location: Optional[str] = row["location"]
+        self.html_link: Optional[str] = row["html_link"]
+        self.start_ts: float = row["start_ts"]
+        self.end_ts: float = row["end_ts"]
+        self.all_day: bool = bool(row["all_day"])
+
+    @classmethod
+    def from_values(cls, calendar_id: str, values: Tuple) -> 'CalendarEvent':
+        """Build from a tuple in EVENT_COLUMNS order, as passed to apply_changes."""
+        return cls(dict(zip(("calendar_id", *EVENT_COLUMNS), (calendar_id, *values))))
+
+class CalendarStore:
+    """
+    Local SQLite copy of synced calendar events, indexed by start time, plus the
+    sync token for each calendar so the next sync only asks for changes.
+    """
+    def __init__(self, path: str = "calendar.db"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _fetch(self, sql: str, params=()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def get_sync_token(self, calendar_id: str) -> Optional[str]:
+        rows = await asyncio.to_thread(
+            self._fetch, "SELECT sync_token FROM sync_state WHERE calendar_id = ?", (calendar_id,)
+        )
+        return rows[0]["sync_token"] if rows else None
+
+    def _apply_changes(self, calendar_id: str, upserts: List[Tuple], deleted_ids: Iterable[str],
+                       sync_token: Optional[str], full: bool):
+        with self._lock:
+            with self._conn: # Events and the token are committed together, or not at all
+                if full:
+                    self._conn.execute("DELETE FROM events WHERE calendar_id = ?", (calendar_id,))
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO events (calendar_id, {', '.join(EVENT_COLUMNS)}) "
+                    f"VALUES (?, {', '.join('?' for _ in EVENT_COLUMNS)})",
+                    [(calendar_id, *row) for row in upserts]
+                )
+                self._conn.executemany(
+                    "DELETE FROM events WHERE calendar_id = ? AND event_id = ?",
+                    [(calendar_id, event_id) for event_id in deleted_ids]
+                )
+                counter = "full_syncs" if full else "incremental_syncs"
+                self._conn.execute(
+                    f"INSERT INTO sync_state (calendar_id, sync_token, last_sync, {counter}) VALUES (?, ?, ?, 1) "
+                    f"ON CONFLICT (calendar_id) DO UPDATE SET sync_token = excluded.sync_token, "
+                    f"last_sync = excluded.last_sync, {counter} = {counter} + 1",
+                    (calendar_id, sync_token, time.time())
+                )
+
+    async def apply_changes(self, calendar_id: str, upserts: List[Tuple], deleted_ids: Iterable[str],
+                            sync_token: Optional[str], full: bool = False):
+        """
+        Store one sync's worth of changes. `upserts` are tuples in EVENT_COLUMNS order.
+        A full sync replaces everything stored for the calendar.
+        """
+        await asyncio.to_thread(self._apply_changes, calendar_id, upserts, list(deleted_ids), sync_token, full)
+
+    async def events_between(self, start_ts: float, end_ts: float, calendar_id: Optional[str] = None) -> List[CalendarEvent]:
+        """Events overlapping [start_ts, end_ts), earliest first."""
+        sql = "SELECT * FROM events WHERE start_ts < ? AND end_ts > ?"
+        params: tuple = (end_ts, start_ts)
+        if calendar_id is not None:
+            sql += " AND calendar_id = ?"
+            params += (calendar_id,)
+        rows = await asyncio.to_thread(self._fetch, sql + " ORDER BY start_ts, summary", params)
+        return [CalendarEvent(row) for row in rows]
+
+    async def upcoming_events(self, after_ts: float, calendar_id: Optional[str] = None) -> List[CalendarEvent]:
+        """Events starting at or after `after_ts`, earliest first (a range scan on the start index)."""
+        sql = "SELECT * FROM events WHERE start_ts >= ?"
+        params: tuple = (after_ts,)
+        if calendar_id is not None:
+            sql += " AND calendar_id = ?"
+            params += (calendar_id,)
+        rows = await asyncio.to_thread(self._fetch, sql + " ORDER BY start_ts", params)
+        return [CalendarEvent(row) for row in rows]
+
+    async def stats(self, calendar_id: str) -> dict:
+        rows = await asyncio.to_thread(
+            self._fetch,
+            "SELECT s.last_sync, s.full_syncs, s.incremental_syncs, "
+            "(SELECT COUNT(*) FROM events WHERE calendar_id = s.calendar_id) AS events "
+            "FROM sync_state s WHERE s.calendar_id = ?",
+            (calendar_id,)
+        )
+        return dict(rows[0]) if rows else {"last_sync": None, "full_syncs": 0, "incremental_syncs": 0, "events": 0}
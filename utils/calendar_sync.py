@@ -0,0 +1,166 @@
+# utils/calendar_sync.py
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+import pytz
+from googleapiclient.errors import HttpError
+
+from utils.calendar_store import CalendarEvent, CalendarStore
+from utils.resilience import Resilience
+
+log = logging.getLogger(__name__)
+
+PAGE_SIZE = 2500 # Max events per page the Calendar API allows
+
+@dataclass
+class SyncResult:
+    full: bool # True when the whole calendar was fetched (first run or expired token)
+    updated: int # Events added or changed
+    deleted: int # Events removed
+    pages: int # API requests made
+
+def parse_event(item: dict, tz) -> Optional[Tuple]:
+    """Convert a Calendar API event into a CalendarStore row, or None if it has no usable start/end."""
+    start, end = item.get("start") or {}, item.get("end") or {}
+    if "dateTime" in start:
+        start_ts = datetime.fromisoformat(start["dateTime"]).timestamp()
+        end_ts = datetime.fromisoformat(end["dateTime"]).timestamp() if "dateTime" in end else start_ts
+        all_day = False
+    elif "date" in start:
+        # All-day events have no timezone, they start at midnight in the calendar's timezone
+        start_ts = tz.localize(datetime.fromisoformat(start["date"])).timestamp()
+        end_ts = tz.localize(datetime.fromisoformat(end["date"])).timestamp() if "date" in end else start_ts + 86400
+        all_day = True
+    else:
+        return None
+    return (
+        item["id"],
+        item.get("summary") or "(No title)",
+        item.get("description"),
+        item.get("location"),
+        item.get("htmlLink"),
+        start_ts,
+        end_ts,
+        int(all_day),
+        item.get("updated"),
+    )
+
+class CalendarSync:
+    """
+    Incremental Google Calendar sync into a CalendarStore.
+
+    The first run lists the whole calendar and keeps the returned nextSyncToken; later
+    runs send that token so Google only returns events changed since the last run.
+    When Google expires the token (410 Gone) the store is rebuilt with a full sync.
+    """
+    def __init__(self, store: CalendarStore, calendar_id: Optional[str], timezone: str,
+                 service_factory: Optional[Callable] = None, resilience: Optional[Resilience] = None):
+        self.store = store
+        self.calendar_id = calendar_id
+        self.tz = pytz.timezone(timezone)
+        self._service_factory = service_factory
+        self._service = None
+        self.resilience = resilience # Retries and a circuit breaker around events.list, when given
+        self._lock = asyncio.Lock() # One sync at a time, a second caller waits and reuses the fresh store
+        self._listeners: List[Callable[[bool, List[CalendarEvent], List[str]], None]] = []
+
+    @classmethod
+    def from_config(cls, config, store: CalendarStore, service_factory: Optional[Callable] = None,
+                    resilience: Optional[Resilience] = None) -> 'CalendarSync':
+        if service_factory is None:
+            credentials_file = config.calendar_credentials_file
+            api_key = os.getenv('GOOGLE_API_KEY') or os.getenv('YOUTUBE_API_KEY')
+            if credentials_file or api_key:
+                service_factory = lambda: build_calendar_service(credentials_file, api_key)
+        return cls(store, config.calendar_id, config.calendar_timezone, service_factory, resilience)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.calendar_id and self._service_factory)
+
+    def add_listener(self, callback: Callable[[bool, List[CalendarEvent], List[str]], None]):
+        """
+        Call `callback(full, events, deleted_ids)` after each sync with just what changed.
+        On a full sync `events` is the whole calendar and replaces anything seen before.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _fetch(self, sync_token: Optional[str]) -> Tuple[List[dict], Optional[str], int]:
+        """Page through events.list. Runs in a worker thread, googleapiclient is blocking."""
+        if self._service is None:
+            self._service = self._service_factory()
+        # Incremental requests must repeat the initial request's parameters, so none vary per run
+        params = {"calendarId": self.calendar_id, "singleEvents": True, "maxResults": PAGE_SIZE}
+        if sync_token:
+            params["syncToken"] = sync_token
+
+        items, pages = [], 0
+        while True:
+            response = self._service.events().list(**params).execute()
+            pages += 1
+            items.extend(response.get("items", []))
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return items, response.get("nextSyncToken"), pages
+            params["pageToken"] = page_token
+
+    async def _fetch_in_thread(self, sync_token: Optional[str]) -> Tuple[List[dict], Optional[str], int]:
+        if self.resilience is None:
+            return await asyncio.to_thread(self._fetch, sync_token)
+        return await self.resilience.call("calendar.events.list", asyncio.to_thread, self._fetch, sync_token)
+
+    async def sync(self) -> SyncResult:
+        if not self.enabled:
+            raise RuntimeError("Calendar sync is not configured")
+        async with self._lock:
+            sync_token = await self.store.get_sync_token(self.calendar_id)
+            try:
+                items, next_token, pages = await self._fetch_in_thread(sync_token)
+            except HttpError as e:
+                if e.resp.status != 410 or not sync_token:
+                    raise
+                log.info(f"Calendar sync token for {self.calendar_id} expired, running a full sync")
+                sync_token = None
+                items, next_token, pages = await self._fetch_in_thread(None)
+
+            upserts, deleted = [], []
+            for item in items:
+                row = parse_event(item, self.tz) if item.get("status") != "cancelled" else None
+                if row:
+                    upserts.append(row)
+                else:
+                    deleted.append(item["id"])
+
+            full = sync_token is None
+            await self.store.apply_changes(self.calendar_id, upserts, deleted, next_token, full=full)
+            result = SyncResult(full=full, updated=len(upserts), deleted=len(deleted), pages=pages)
+            log.info(f"Calendar {'full' if full else 'incremental'} sync: {result.updated} updated, "
+                     f"{result.deleted} deleted in {result.pages} request(s)")
+
+            if self._listeners:
+                events = [CalendarEvent.from_values(self.calendar_id, row) for row in upserts]
+                for listener in list(self._listeners):
+                    try:
+                        listener(full, events, deleted)
+                    except Exception as e:
+                        log.exception(f"Calendar sync listener {listener!r} failed: {e}")
+            return result
+
+def build_calendar_service(credentials_file: Optional[str], api_key: Optional[str]):
+    """Calendar API client: service account credentials for private calendars, an API key for public ones."""
+    from googleapiclient.discovery import build
+    if credentials_file:
+        from google.oauth2 import service_account
+        credentials = service_account.Credentials.from_service_account_file(
+            credentials_file, scopes=["https://www.googleapis.com/auth/calendar.readonly"]
+        )
+        return build("calendar", "v3", credentials=credentials, cache_discovery=False)
+    return build("calendar", "v3", developerKey=api_key, cache_discovery=False)
@@ -0,0 +1,181 @@
+# utils/chat_index.py
+import asyncio
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+import pytz
+
+log = logging.getLogger(__name__)
+
+INGEST_BATCH_SIZE = 500 # Rows per executemany call inside the ingest transaction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    title TEXT,
+    start_ts REAL,
+    last_message_ts REAL NOT NULL DEFAULT 0,
+    message_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS chat_fts USING fts5(
+    message,
+    author,
+    video_id UNINDEXED,
+    ts UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+class SearchResult:
+    def __init__(self, video_id: str, title: str, author: str, message: str,
+                 timestamp: datetime, offset_seconds: Optional[int]):
+        self.video_id = video_id
+        self.title = title
+        self.author = author
+        self.message = message
+        self.timestamp = timestamp
+        self.offset_seconds = offset_seconds
+
+    @property
+    def vod_url(self) -> str:
+        """Link to the VOD, jumping to the message when the stream start is known."""
+        url = f"https://youtu.be/{self.video_id}"
+        if self.offset_seconds is not None and self.offset_seconds >= 0:
+            url += f"?t={self.offset_seconds}"
+        return url
+
+def _quote(term: str) -> str:
+    """Quote a term for an FTS5 query so user input can't inject query syntax."""
+    return '"' + term.replace('"', '""') + '"'
+
+def build_match_query(query: str, phrase: bool = False, author: Optional[str] = None) -> Optional[str]:
+    """Build an FTS5 MATCH expression from user input."""
+    parts = []
+    if query and query.strip():
+        if phrase:
+            parts.append(f"message : {_quote(query.strip())}")
+        else:
+            terms = " AND ".join(_quote(t) for t in query.split())
+            parts.append(f"message : ({terms})")
+    if author and author.strip():
+        parts.append(f"author : {_quote(author.strip())}")
+    if not parts:
+        return None
+    return " AND ".join(parts)
+
+def _parse_iso(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (ValueError, TypeError):
+        return None
+
+class ChatIndex:
+    """
+    SQLite FTS5 index over stored chat transcripts.
+    All blocking SQLite work runs in a worker thread so the event loop stays free.
+    """
+    def __init__(self, path: str = "chat_index.db"):
+        self.path = path
+        self._lock = threading.Lock() # sqlite3 connections aren't safe for concurrent use
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Ingestion ---
+    def _ingest(self, video_id: str, stream_details: dict, messages: Iterable) -> int:
+        with self._lock:
+            cur = self._conn.cursor()
+            row = cur.execute(
+                "SELECT last_message_ts FROM videos WHERE video_id = ?", (video_id,)
+            ).fetchone()
+            last_ts = row[0] if row else 0.0
+
+            inserted = 0
+            newest_ts = last_ts
+            batch = []
+            try:
+                cur.execute("BEGIN")
+                cur.execute(
+                    "INSERT INTO videos (video_id, title, start_ts) VALUES (?, ?, ?) "
+                    "ON CONFLICT(video_id) DO UPDATE SET title = excluded.title, "
+                    "start_ts = COALESCE(excluded.start_ts, videos.start_ts)",
+                    (video_id, stream_details.get('title'), _parse_iso(stream_details.get('start_time')))
+                )
+                for msg in messages:
+                    ts = msg.timestamp.timestamp()
+                    # Only messages newer than what we've already indexed for this video
+                    if ts <= last_ts:
+                        continue
+                    batch.append((msg.message, msg.author, video_id, ts))
+                    newest_ts = max(newest_ts, ts)
+                    if len(batch) >= INGEST_BATCH_SIZE:
+                        cur.executemany(
+                            "INSERT INTO chat_fts (message, author, video_id, ts) VALUES (?, ?, ?, ?)", batch
+                        )
+                        inserted += len(batch)
+                        batch.clear()
+                if batch:
+                    cur.executemany(
+                        "INSERT INTO chat_fts (message, author, video_id, ts) VALUES (?, ?, ?, ?)", batch
+                    )
+                    inserted += len(batch)
+                cur.execute(
+                    "UPDATE videos SET last_message_ts = ?, message_count = message_count + ? WHERE video_id = ?",
+                    (newest_ts, inserted, video_id)
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+            return inserted
+
+    async def ingest(self, video_id: str, stream_details: dict, messages: Iterable) -> int:
+        """Incrementally index messages for a video. Returns the number of new rows."""
+        inserted = await asyncio.to_thread(self._ingest, video_id, stream_details, messages)
+        log.info(f"Indexed {inserted} new chat messages for video {video_id}")
+        return inserted
+
+    # --- Search ---
+    def _search(self, match: str, video_id: Optional[str], limit: int) -> List[SearchResult]:
+        sql = (
+            "SELECT c.video_id, v.title, c.author, c.message, c.ts, v.start_ts "
+            "FROM chat_fts c LEFT JOIN videos v ON v.video_id = c.video_id "
+            "WHERE chat_fts MATCH ?"
+        )
+        params = [match]
+        if video_id:
+            sql += " AND c.video_id = ?"
+            params.append(video_id)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        results = []
+        for vid, title, author, message, ts, start_ts in rows:
+            offset = int(ts - start_ts) if start_ts else None
+            results.append(SearchResult(
+                vid, title or vid, author, message,
+                datetime.fromtimestamp(ts, pytz.UTC), offset
+            ))
+        return results
+
+    async def search(self, query: str, phrase: bool = False, author: Optional[str] = None,
+                     video_id: Optional[str] = None, limit: int = 10) -> List[SearchResult]:
+        """Search indexed chat. Returns an empty list when no filters are given."""
+        match = build_match_query(query, phrase, author)
+        if not match:
+            return []
+        return await asyncio.to_thread(self._search, match, video_id, limit)
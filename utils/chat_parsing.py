@@ -0,0 +1,109 @@
+# utils/chat_parsing.py
+# Pure, CPU-bound parsing helpers for YouTube watch pages and chat payloads.
+# Everything here is module-level and picklable so it can run in the offload process pool.
+import json
+import re
+from datetime import datetime
+from typing import List, Optional
+
+import pytz
+
+YTCFG_PATTERN = re.compile(r'ytcfg\.set\s*\(\s*({.+?})\s*\)\s*;')
+INITIAL_DATA_PATTERN = re.compile(r'window\["ytInitialData"\]\s*=\s*({.+?});')
+DEFAULT_CLIENT_VERSION = "2.20240201.01.00"
+
+class ChatMessage:
+    def __init__(self, timestamp: datetime, author: str, message: str):
+        self.timestamp = timestamp
+        self.author = author
+        self.message = message
+
+    def __str__(self):
+        return f"[{self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {self.author}: {self.message}"
+
+class WatchPageInfo:
+    def __init__(self, api_key: Optional[str] = None, client_version: str = DEFAULT_CLIENT_VERSION,
+                 continuation_token: Optional[str] = None, error: Optional[str] = None):
+        self.api_key = api_key
+        self.client_version = client_version
+        self.continuation_token = continuation_token
+        self.error = error
+
+def parse_watch_page(html: str) -> WatchPageInfo:
+    """Extract the innertube API key, client version and transcript continuation token."""
+    info = WatchPageInfo()
+
+    for match in YTCFG_PATTERN.finditer(html):
+        try:
+            cfg_data = json.loads(match.group(1))
+            if 'INNERTUBE_API_KEY' in cfg_data:
+                info.api_key = cfg_data['INNERTUBE_API_KEY']
+            if 'INNERTUBE_CLIENT_VERSION' in cfg_data:
+                info.client_version = cfg_data['INNERTUBE_CLIENT_VERSION']
+        except json.JSONDecodeError:
+            continue
+
+    if not info.api_key:
+        info.error = "Could not find API key"
+        return info
+
+    data_match = INITIAL_DATA_PATTERN.search(html)
+    if not data_match:
+        info.error = "Could not find initial data"
+        return info
+
+    try:
+        initial_data = json.loads(data_match.group(1))
+    except json.JSONDecodeError as e:
+        info.error = f"Error parsing initial data: {e}"
+        return info
+
+    # Try to find the transcript continuation token
+    transcript_renderer = None
+    try:
+        for tab in initial_data['engagementPanels']:
+            if 'engagementPanelSectionListRenderer' in tab:
+                content = tab['engagementPanelSectionListRenderer'].get('content', {})
+                if 'continuationItemRenderer' in content:
+                    transcript_renderer = content['continuationItemRenderer']
+                    break
+    except Exception as e:
+        info.error = f"Error finding transcript renderer: {e}"
+        return info
+
+    if not transcript_renderer:
+        info.error = "Could not find transcript renderer"
+        return info
+
+    try:
+        info.continuation_token = transcript_renderer['continuationEndpoint']['continuationCommand']['token']
+    except (KeyError, TypeError) as e:
+        info.error = f"Transcript renderer has no continuation token: {e}"
+    return info
+
+def parse_chat_payload(payload: str) -> List[ChatMessage]:
+    """Decode a get_transcript response body into chat messages sorted by time."""
+    chat_data = json.loads(payload)
+    messages = []
+    for action in chat_data['actions']:
+        if 'addChatItemAction' not in action:
+            continue
+
+        item = action['addChatItemAction']['item']
+        if 'liveChatTextMessageRenderer' not in item:
+            continue
+
+        renderer = item['liveChatTextMessageRenderer']
+        author = renderer.get('authorName', {}).get('simpleText', 'Unknown')
+
+        # Get message text
+        message_runs = renderer.get('message', {}).get('runs', [])
+        message_text = ' '.join(run.get('text', '') for run in message_runs if 'text' in run)
+
+        # Get timestamp
+        timestamp_usec = int(renderer.get('timestampUsec', 0)) // 1000
+        msg_time = datetime.fromtimestamp(timestamp_usec / 1000000, pytz.UTC)
+
+        messages.append(ChatMessage(msg_time, author, message_text))
+
+    return sorted(messages, key=lambda x: x.timestamp)
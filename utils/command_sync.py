@@ -0,0 +1,71 @@
+# utils/command_sync.py
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Optional
+
+import discord
+from discord import app_commands
+
+log = logging.getLogger(__name__)
+
+def command_tree_hash(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """Stable hash of the command payloads Discord would receive from `tree.sync(guild=guild)`."""
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: (command.get("type", 1), command["name"])
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+class CommandSyncState:
+    """Hashes of the last successfully synced command tree per application and scope, kept in a JSON file."""
+    def __init__(self, path: str):
+        self.path = path
+        self.data = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                log.warning(f"Could not read command sync state {path}, commands will be synced: {e}")
+
+    def get(self, key: str) -> dict:
+        return self.data.get(key, {})
+
+    def set(self, key: str, entry: dict):
+        self.data[key] = entry
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+async def sync_if_changed(tree: app_commands.CommandTree, application_id: int, state_path: str,
+                          guild: Optional[discord.abc.Snowflake] = None, force: bool = False) -> bool:
+    """
+    Sync the command tree only if it differs from the last sync recorded in `state_path`.
+    With a guild, global commands are copied to it first so changes show up instantly (for development).
+    Returns True if a sync was sent.
+    """
+    if guild is not None:
+        tree.copy_global_to(guild=guild)
+    scope = f"guild:{guild.id}" if guild is not None else "global"
+    key = f"{application_id}:{scope}"
+
+    state = CommandSyncState(state_path)
+    previous = state.get(key)
+    current_hash = command_tree_hash(tree, guild)
+
+    if not force and previous.get("hash") == current_hash:
+        log.info(f"Command tree unchanged ({scope}), skipped sync. "
+                 f"Saved ~{previous.get('duration', 0):.2f}s at startup.")
+        return False
+
+    started = time.perf_counter()
+    synced = await tree.sync(guild=guild)
+    duration = time.perf_counter() - started
+    state.set(key, {"hash": current_hash, "duration": duration, "commands": len(synced), "synced_at": time.time()})
+    log.info(f"Synced {len(synced)} application command(s) ({scope}) in {duration:.2f}s")
+    return True
@@ -0,0 +1,96 @@
+# utils/fake_calendar.py
+# In-memory stand-in for the Google Calendar API `events().list()` surface, including
+# syncToken incremental sync, pagination and 410 token expiry. Used to exercise
+# CalendarSync locally without credentials:
+#
+#   fake = FakeCalendarService()
+#   fake.upsert({"id": "e1", "summary": "Stream", "start": {...}, "end": {...}})
+#   sync = CalendarSync(store, "primary", "UTC", service_factory=lambda: fake)
+import copy
+import itertools
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+class _Request:
+    def __init__(self, service: 'FakeCalendarService', params: dict):
+        self._service = service
+        self._params = params
+
+    def execute(self) -> dict:
+        return self._service._list(**self._params)
+
+class _Events:
+    def __init__(self, service: 'FakeCalendarService'):
+        self._service = service
+
+    def list(self, **params) -> _Request:
+        return _Request(self._service, params)
+
+class FakeCalendarService:
+    def __init__(self, page_size: Optional[int] = None):
+        self.page_size = page_size # Overrides maxResults to force pagination
+        self._events: Dict[str, dict] = {}
+        self._changed_at: Dict[str, int] = {} # Event ID -> version of its last change
+        self._version = 0
+        self._oldest_valid_version = 0 # Tokens older than this get 410 Gone
+        self._ids = itertools.count(1)
+        self.requests = 0 # events.list calls served
+        self.items_sent = 0 # Events returned across all calls
+
+    def events(self) -> _Events:
+        return _Events(self)
+
+    # --- Mutations ---
+    def _touch(self, event_id: str):
+        self._version += 1
+        self._changed_at[event_id] = self._version
+        self._events[event_id]["updated"] = datetime.now(timezone.utc).isoformat()
+
+    def upsert(self, event: dict) -> dict:
+        event = copy.deepcopy(event)
+        event.setdefault("id", f"evt{next(self._ids)}")
+        event["status"] = "confirmed"
+        self._events[event["id"]] = event
+        self._touch(event["id"])
+        return event
+
+    def delete(self, event_id: str):
+        self._events[event_id] = {"id": event_id, "status": "cancelled"}
+        self._touch(event_id)
+
+    def expire_tokens(self):
+        """Invalidate every issued sync token, like Google does after long gaps or ACL changes."""
+        # Bump the version so tokens issued from now on compare newer than every expired one
+        self._version += 1
+        self._oldest_valid_version = self._version
+
+    # --- events.list ---
+    def _list(self, calendarId: str, syncToken: Optional[str] = None, pageToken: Optional[str] = None,
+              maxResults: int = 250, singleEvents: bool = False, **unused) -> dict:
+        self.requests += 1
+        if pageToken:
+            since, offset = (int(part) for part in pageToken.split(":"))
+        else:
+            since, offset = (int(syncToken[1:]) if syncToken else -1), 0
+            if syncToken and since < self._oldest_valid_version:
+                raise HttpError(httplib2.Response({"status": "410"}), b'{"error": {"code": 410, "message": "Gone"}}')
+
+        if since < 0:
+            # Full sync: live events only
+            ids = [event_id for event_id, event in self._events.items() if event["status"] != "cancelled"]
+        else:
+            ids = [event_id for event_id, version in self._changed_at.items() if version > since]
+        ids.sort(key=lambda event_id: self._changed_at[event_id])
+
+        page_size = self.page_size or maxResults
+        page = ids[offset:offset + page_size]
+        self.items_sent += len(page)
+        response = {"kind": "calendar#events", "items": [copy.deepcopy(self._events[i]) for i in page]}
+        if offset + page_size < len(ids):
+            response["nextPageToken"] = f"{since}:{offset + page_size}"
+        else:
+            response["nextSyncToken"] = f"v{self._version}"
+        return response
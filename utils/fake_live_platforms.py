@@ -0,0 +1,130 @@
+# utils/fake_live_platforms.py
+# Local stand-in HTTP server for the Twitch (OAuth token + Helix get-streams) and Kick
+# (channel) endpoints the live-status providers call, including token expiry, added
+# latency and injected 5xx errors. Used to exercise the providers without credentials
+# or network access:
+#
+#   async with FakeLivePlatforms() as fake:
+#       kick = KickProvider("streamer", "https://kick.com/streamer", http, resilience, base_url=fake.kick_api_url)
+#       fake.go_live("Kick", "streamer", title="Hello")
+#       status = await kick.check()
+import asyncio
+import itertools
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+
+class FakeLivePlatforms:
+    def __init__(self, latency: float = 0.0, token_ttl: int = 3600, fail_every: int = 0):
+        self.latency = latency # Seconds added to every response
+        self.token_ttl = token_ttl # expires_in for issued Twitch tokens
+        self.fail_every = fail_every # Answer every Nth request with a 503 (0 = never)
+        self.streams: Dict[Tuple[str, str], dict] = {} # (platform, channel) -> current stream
+        self.requests: Counter = Counter() # Requests served, by platform
+        self.failures = 0
+        self._tokens = set()
+        self._ids = itertools.count(1)
+        self._served = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    async def __aenter__(self) -> 'FakeLivePlatforms':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post("/twitch/oauth2/token", self._twitch_token)
+        app.router.add_get("/twitch/helix/streams", self._twitch_streams)
+        app.router.add_get("/kick/api/v2/channels/{slug}", self._kick_channel)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_host, bound_port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{bound_host}:{bound_port}"
+
+    async def close(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def twitch_api_url(self) -> str:
+        return f"{self.base_url}/twitch/helix"
+
+    @property
+    def twitch_auth_url(self) -> str:
+        return f"{self.base_url}/twitch/oauth2/token"
+
+    @property
+    def kick_api_url(self) -> str:
+        return f"{self.base_url}/kick/api/v2"
+
+    # --- State ---
+    def go_live(self, platform: str, channel: str, title: str = "Live now", viewers: int = 0) -> dict:
+        stream = {
+            "id": str(next(self._ids)),
+            "title": title,
+            "viewers": viewers,
+            "started_at": datetime.now(timezone.utc).replace(microsecond=0),
+        }
+        self.streams[(platform, channel.lower())] = stream
+        return stream
+
+    def go_offline(self, platform: str, channel: str):
+        self.streams.pop((platform, channel.lower()), None)
+
+    def expire_tokens(self):
+        self._tokens.clear()
+
+    # --- Handlers ---
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        platform = "Twitch" if request.path.startswith("/twitch") else "Kick"
+        self.requests[platform] += 1
+        self._served += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail_every and self._served % self.fail_every == 0:
+            self.failures += 1
+            return web.json_response({"error": "Service Unavailable"}, status=503)
+        return await handler(request)
+
+    async def _twitch_token(self, request: web.Request) -> web.Response:
+        if request.query.get("grant_type") != "client_credentials" or not request.query.get("client_secret"):
+            return web.json_response({"status": 400, "message": "invalid client secret"}, status=400)
+        token = f"token{next(self._ids)}"
+        self._tokens.add(token)
+        return web.json_response({"access_token": token, "expires_in": self.token_ttl, "token_type": "bearer"})
+
+    async def _twitch_streams(self, request: web.Request) -> web.Response:
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if token not in self._tokens or not request.headers.get("Client-Id"):
+            return web.json_response({"error": "Unauthorized", "status": 401, "message": "Invalid OAuth token"}, status=401)
+        data = []
+        for login in request.query.getall("user_login", []):
+            stream = self.streams.get(("Twitch", login.lower()))
+            if stream:
+                data.append({
+                    "id": stream["id"], "user_login": login.lower(), "user_name": login, "type": "live",
+                    "title": stream["title"], "viewer_count": stream["viewers"],
+                    "started_at": stream["started_at"].isoformat().replace("+00:00", "Z"),
+                })
+        return web.json_response({"data": data, "pagination": {}})
+
+    async def _kick_channel(self, request: web.Request) -> web.Response:
+        slug = request.match_info["slug"].lower()
+        stream = self.streams.get(("Kick", slug))
+        livestream = None
+        if stream:
+            livestream = {
+                "id": int(stream["id"]), "is_live": True, "session_title": stream["title"],
+                "viewer_count": stream["viewers"], "created_at": stream["started_at"].strftime("%Y-%m-%d %H:%M:%S"),
+            }
+        return web.json_response({"slug": slug, "user": {"username": slug}, "livestream": livestream})
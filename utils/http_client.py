@@ -0,0 +1,122 @@
+# utils/http_client.py
+import logging
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Optional
+
+import aiohttp
+
+log = logging.getLogger(__name__)
+
+class HTTPClient:
+    """
+    Bot-wide pooled aiohttp session. Owned by the bot and shared by every cog that
+    does outbound HTTP, so connections, TLS sessions and DNS results are reused.
+    """
+    def __init__(self, limit: int = 100, limit_per_host: int = 10, dns_cache_ttl: int = 300,
+                 keepalive_timeout: float = 30, total_timeout: float = 60, connect_timeout: float = 10):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # Request-level timing counters, used to verify connection reuse
+        self.requests = 0
+        self.errors = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+        self.recent_timings = deque(maxlen=100) # (method, host, status, seconds, reused)
+
+    @classmethod
+    def from_config(cls, config) -> 'HTTPClient':
+        return cls(
+            limit=config.http_pool_limit,
+            limit_per_host=config.http_pool_limit_per_host,
+            dns_cache_ttl=config.http_dns_cache_ttl_seconds,
+            keepalive_timeout=config.http_keepalive_timeout_seconds,
+            total_timeout=config.http_total_timeout_seconds,
+            connect_timeout=config.http_connect_timeout_seconds,
+        )
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session, created on first use inside the running event loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                trace_configs=[self._trace_config()],
+            )
+            log.debug("Created shared HTTP session.")
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+            log.debug("Closed shared HTTP session.")
+        self._session = None
+
+    def stats(self) -> dict:
+        timings = [t[3] for t in self.recent_timings]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "dns_cache_hits": self.dns_cache_hits,
+            "dns_cache_misses": self.dns_cache_misses,
+            "avg_request_seconds": sum(timings) / len(timings) if timings else None,
+        }
+
+    # --- Trace hooks ---
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig(trace_config_ctx_factory=lambda trace_request_ctx: SimpleNamespace(
+            trace_request_ctx=trace_request_ctx, start=0.0, reused=False
+        ))
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_request_end.append(self._on_request_end)
+        trace.on_request_exception.append(self._on_request_exception)
+        trace.on_connection_create_end.append(self._on_connection_create_end)
+        trace.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        trace.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(self._on_dns_cache_miss)
+        return trace
+
+    async def _on_request_start(self, session, ctx, params):
+        ctx.start = time.perf_counter()
+        self.requests += 1
+
+    async def _on_request_end(self, session, ctx, params):
+        elapsed = time.perf_counter() - ctx.start
+        self.recent_timings.append((params.method, params.url.host, params.response.status, elapsed, ctx.reused))
+        log.debug(f"{params.method} {params.url.host}{params.url.path} -> {params.response.status} "
+                  f"in {elapsed * 1000:.1f}ms ({'reused' if ctx.reused else 'new'} connection)")
+
+    async def _on_request_exception(self, session, ctx, params):
+        self.errors += 1
+        log.debug(f"{params.method} {params.url.host}{params.url.path} failed after "
+                  f"{(time.perf_counter() - ctx.start) * 1000:.1f}ms: {params.exception!r}")
+
+    async def _on_connection_create_end(self, session, ctx, params):
+        self.connections_created += 1
+
+    async def _on_connection_reuseconn(self, session, ctx, params):
+        ctx.reused = True
+        self.connections_reused += 1
+
+    async def _on_dns_cache_hit(self, session, ctx, params):
+        self.dns_cache_hits += 1
+
+    async def _on_dns_cache_miss(self, session, ctx, params):
+        self.dns_cache_misses += 1
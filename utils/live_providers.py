@@ -0,0 +1,167 @@
+# utils/live_providers.py
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+log = logging.getLogger(__name__)
+
+class LiveStatus:
+    """One platform's current live stream."""
+    def __init__(self, platform: str, stream_id: str, url: str, streamer_name: str, title: str = "",
+                 started_at: Optional[datetime] = None, viewers: Optional[int] = None):
+        self.platform = platform
+        self.stream_id = stream_id # Changes when the streamer starts a new stream
+        self.url = url
+        self.streamer_name = streamer_name
+        self.title = title
+        self.started_at = started_at
+        self.viewers = viewers
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+    except ValueError:
+        return None
+
+class RateLimiter:
+    """Spaces calls at least 60/`per_minute` seconds apart, waiting rather than failing when called faster."""
+    def __init__(self, per_minute: float):
+        self.interval = 60 / per_minute
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+        self.waited = 0.0 # Total seconds spent waiting, for benchmarks and /perf
+
+    async def wait(self):
+        async with self._lock:
+            delay = self._next - time.monotonic()
+            if delay > 0:
+                self.waited += delay
+                await asyncio.sleep(delay)
+            self._next = max(time.monotonic(), self._next) + self.interval
+
+class LiveProvider:
+    """
+    Live status of one channel on one platform, polled through the bot's shared HTTP session
+    and the "live.<platform>" breaker. Providers of the same platform share a rate limiter.
+    `base_url` points a provider at a local stand-in server (utils/fake_live_platforms.py).
+    """
+    platform = ""
+    api_url = ""
+    requests_per_minute = 30.0
+
+    def __init__(self, channel: str, url: str, http, resilience, rate_limiter: Optional[RateLimiter] = None,
+                 base_url: Optional[str] = None):
+        self.channel = channel
+        self.url = url
+        self.http = http
+        self.resilience = resilience
+        self.rate_limiter = rate_limiter or RateLimiter(self.requests_per_minute)
+        self.base_url = (base_url or self.api_url).rstrip("/")
+
+    @staticmethod
+    def channel_from_url(url: str) -> Optional[str]:
+        """Channel name from a profile URL like https://www.twitch.tv/name or https://kick.com/name."""
+        parts = [part for part in urlparse(url).path.split("/") if part]
+        return parts[0].lower() if parts else None
+
+    async def _fetch_json(self, method: str, url: str, **kwargs):
+        async with self.http.session.request(method, url, **kwargs) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def _request(self, method: str, url: str, **kwargs):
+        await self.rate_limiter.wait()
+        return await self.resilience.call(f"live.{self.platform.lower()}", self._fetch_json, method, url, **kwargs)
+
+    async def check(self) -> Optional[LiveStatus]:
+        """The channel's current stream, None while offline. Raises when the status couldn't be fetched."""
+        raise NotImplementedError
+
+class TwitchProvider(LiveProvider):
+    """Twitch Helix get-streams, authenticated with an app access token (client credentials)."""
+    platform = "Twitch"
+    api_url = "https://api.twitch.tv/helix"
+    auth_url = "https://id.twitch.tv/oauth2/token"
+    requests_per_minute = 60.0 # Helix allows 800 points a minute per app token, leave room for other apps
+
+    def __init__(self, channel: str, url: str, http, resilience, client_id: str, client_secret: str,
+                 rate_limiter: Optional[RateLimiter] = None, base_url: Optional[str] = None, auth_url: Optional[str] = None):
+        super().__init__(channel, url, http, resilience, rate_limiter, base_url)
+        self.client_id = client_id
+        self.client_secret = client_secret
+        if auth_url:
+            self.auth_url = auth_url
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+
+    async def _access_token(self) -> str:
+        if self._token is None or time.monotonic() >= self._token_expires:
+            data = await self._request("POST", self.auth_url, params={
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "grant_type": "client_credentials",
+            })
+            self._token = data["access_token"]
+            # Refresh a minute early rather than racing the expiry
+            self._token_expires = time.monotonic() + max(0, data.get("expires_in", 3600) - 60)
+        return self._token
+
+    async def check(self) -> Optional[LiveStatus]:
+        headers = {"Client-Id": self.client_id, "Authorization": f"Bearer {await self._access_token()}"}
+        try:
+            data = await self._request("GET", f"{self.base_url}/streams", params={"user_login": self.channel}, headers=headers)
+        except aiohttp.ClientResponseError as e:
+            if e.status == 401:
+                self._token = None # Revoked or expired early, fetch a new one on the next poll
+            raise
+        streams = data.get("data", [])
+        if not streams:
+            return None
+        stream = streams[0]
+        return LiveStatus(self.platform, stream["id"], self.url, stream.get("user_name") or self.channel,
+                          stream.get("title", ""), _parse_time(stream.get("started_at")), stream.get("viewer_count"))
+
+class KickProvider(LiveProvider):
+    """Kick's public channel endpoint, which includes the current livestream (null while offline)."""
+    platform = "Kick"
+    api_url = "https://kick.com/api/v2"
+    requests_per_minute = 20.0 # Unofficial endpoint behind Cloudflare, keep it gentle
+
+    async def check(self) -> Optional[LiveStatus]:
+        data = await self._request("GET", f"{self.base_url}/channels/{self.channel}", headers={"Accept": "application/json"})
+        stream = data.get("livestream")
+        if not stream or not stream.get("is_live", True):
+            return None
+        return LiveStatus(self.platform, str(stream["id"]), self.url, (data.get("user") or {}).get("username") or self.channel,
+                          stream.get("session_title", ""), _parse_time(stream.get("created_at")), stream.get("viewer_count"))
+
+def providers_from_config(config, http, resilience) -> List[LiveProvider]:
+    """
+    Providers for the platforms in youtube_monitor_platform_links that have one. Twitch needs
+    TWITCH_CLIENT_ID and TWITCH_CLIENT_SECRET; platforms without a provider (TikTok) stay static links.
+    """
+    if not config.live_detection_enabled:
+        return []
+    rates: Dict[str, float] = config.live_provider_requests_per_minute or {}
+    providers = []
+    for name, url in (config.youtube_monitor_platform_links or {}).items():
+        channel = LiveProvider.channel_from_url(url)
+        if not channel:
+            continue
+        if name == TwitchProvider.platform:
+            client_id, client_secret = os.getenv("TWITCH_CLIENT_ID"), os.getenv("TWITCH_CLIENT_SECRET")
+            if not (client_id and client_secret):
+                log.warning("TWITCH_CLIENT_ID / TWITCH_CLIENT_SECRET not set, Twitch will be listed but not checked for live status.")
+                continue
+            providers.append(TwitchProvider(channel, url, http, resilience, client_id, client_secret,
+                                            RateLimiter(rates.get(name, TwitchProvider.requests_per_minute))))
+        elif name == KickProvider.platform:
+            providers.append(KickProvider(channel, url, http, resilience,
+                                          RateLimiter(rates.get(name, KickProvider.requests_per_minute))))
+    return providers
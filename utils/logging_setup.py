@@ -0,0 +1,142 @@
+# utils/logging_setup.py
+import contextlib
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+TEXT_FORMAT = '%(asctime)s:%(levelname)s:%(name)s: %(message)s'
+
+# Fields attached to every record logged while they are set, e.g. guild_id / video_id
+_context: contextvars.ContextVar[Dict[str, object]] = contextvars.ContextVar("log_context", default={})
+
+# Attributes every LogRecord has, anything else was passed through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "context", "suppressed"}
+
+@contextlib.contextmanager
+def log_context(**fields):
+    """Add fields to every record logged inside the block (and in tasks it starts)."""
+    token = _context.set({**_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+def bind_log_context(**fields):
+    """Add fields for the rest of the current task, for when a `with` block doesn't fit."""
+    _context.set({**_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+
+class ContextFilter(logging.Filter):
+    """Captures the context on the logging thread, before the record crosses the queue."""
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.context = _context.get()
+        return True
+
+class DebugRateLimitFilter(logging.Filter):
+    """
+    Lets through at most `per_minute` DEBUG records per call site each minute, so debug
+    logging in hot paths can stay enabled. The next record let through from that call site
+    carries how many were dropped. Other levels always pass.
+    """
+    def __init__(self, per_minute: int):
+        super().__init__()
+        self.per_minute = per_minute
+        self._windows: Dict[Tuple[str, int], list] = {} # call site -> [window start, count, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.DEBUG or self.per_minute <= 0:
+            return True
+        now = time.monotonic()
+        window = self._windows.setdefault((record.pathname, record.lineno), [now, 0, 0])
+        if now - window[0] >= 60:
+            window[0], window[1] = now, 0
+        if window[1] >= self.per_minute:
+            window[2] += 1
+            return False
+        window[1] += 1
+        if window[2]:
+            record.suppressed, window[2] = window[2], 0
+        return True
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, context fields and `extra=` fields."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "context", None) or {})
+        entry.update({k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS and not k.startswith("_")})
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    """The classic console format, with context fields appended."""
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        text = super().formatMessage(record)
+        fields = dict(getattr(record, "context", None) or {})
+        if getattr(record, "suppressed", 0):
+            fields["suppressed"] = record.suppressed
+        if fields:
+            text += " [" + " ".join(f"{k}={v}" for k, v in fields.items()) + "]"
+        return text
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() flattens the record into a formatted string, but the JSON
+        # formatter needs the fields. Only resolve the message and traceback here.
+        record = logging.makeLogRecord(vars(record))
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def setup_logging(config) -> logging.handlers.QueueListener:
+    """
+    Route all logging through a queue. Callers (including the event loop) only enqueue
+    records, a listener thread does the console and file I/O. Returns the started listener,
+    stop it on shutdown to flush.
+    """
+    level = getattr(logging, str(config.log_level).upper(), logging.INFO)
+
+    console = logging.StreamHandler()
+    console.setFormatter(JSONFormatter() if config.log_console_format == "json" else TextFormatter(TEXT_FORMAT))
+    handlers = [console]
+    if config.log_file:
+        log_dir = os.path.dirname(config.log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            config.log_file, maxBytes=config.log_max_bytes, backupCount=config.log_backup_count, encoding="utf-8"
+        )
+        file_handler.setFormatter(JSONFormatter())
+        handlers.append(file_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(DebugRateLimitFilter(config.log_debug_rate_per_minute))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    logging.getLogger("discord").setLevel(max(level, logging.INFO)) # discord.py's DEBUG output is gateway traffic
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
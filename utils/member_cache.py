@@ -0,0 +1,74 @@
+# utils/member_cache.py
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+
+import discord
+
+log = logging.getLogger(__name__)
+
+class MemberLRU:
+    """
+    Small LRU of recently active members, used when the bot runs without a full
+    member cache. Interactions already carry a fresh Member object, so those are
+    remembered for free; anything else falls back to fetch_member.
+    """
+    def __init__(self, maxsize: int = 2000):
+        self.maxsize = maxsize
+        self._members: "OrderedDict[Tuple[int, int], discord.Member]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+
+    def __len__(self):
+        return len(self._members)
+
+    def remember(self, member: discord.Member):
+        key = (member.guild.id, member.id)
+        self._members[key] = member
+        self._members.move_to_end(key)
+        while len(self._members) > self.maxsize:
+            self._members.popitem(last=False)
+
+    def forget(self, guild_id: int, member_id: int):
+        self._members.pop((guild_id, member_id), None)
+
+    def get(self, guild: discord.Guild, member_id: int) -> Optional[discord.Member]:
+        """Cached member from the LRU or discord.py's own cache, without any API call."""
+        key = (guild.id, member_id)
+        member = self._members.get(key)
+        if member is not None:
+            self._members.move_to_end(key)
+            self.hits += 1
+            return member
+        member = guild.get_member(member_id)
+        if member is not None:
+            self.hits += 1
+        return member
+
+    async def resolve(self, guild: discord.Guild, user: Union[discord.Member, discord.User, int]) -> discord.Member:
+        """Return a Member for the user, fetching it from the API only when it isn't cached anywhere."""
+        if isinstance(user, discord.Member):
+            self.remember(user)
+            return user
+
+        member_id = user if isinstance(user, int) else user.id
+        member = self.get(guild, member_id)
+        if member is not None:
+            return member
+
+        self.misses += 1
+        self.fetches += 1
+        member = await guild.fetch_member(member_id)
+        self.remember(member)
+        return member
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._members),
+            "hits": self.hits,
+            "misses": self.misses,
+            "fetches": self.fetches,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
@@ -0,0 +1,125 @@
+# utils/metadata_cache.py
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from cachetools import TLRUCache
+
+log = logging.getLogger(__name__)
+
+_MISSING = object() # Negative-cache marker for IDs the API says don't exist
+
+Fetcher = Callable[[List[str]], Awaitable[Dict[str, dict]]]
+
+class MetadataCache:
+    """
+    Shared in-process cache for YouTube video resources.
+    Live videos expire quickly, ended ones are kept much longer, missing IDs are
+    negatively cached, and concurrent misses for the same ID share one fetch.
+    """
+    def __init__(self, live_ttl: float = 60, ended_ttl: float = 21600, negative_ttl: float = 600,
+                 maxsize: int = 5000):
+        self.live_ttl = live_ttl
+        self.ended_ttl = ended_ttl
+        self.negative_ttl = negative_ttl
+        self._cache = TLRUCache(maxsize=maxsize, ttu=self._expires_at, timer=time.monotonic)
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.fetches = 0
+
+    @classmethod
+    def from_config(cls, config) -> 'MetadataCache':
+        return cls(
+            live_ttl=config.metadata_cache_live_ttl_seconds,
+            ended_ttl=config.metadata_cache_ended_ttl_seconds,
+            negative_ttl=config.metadata_cache_negative_ttl_seconds,
+            maxsize=config.metadata_cache_max_entries,
+        )
+
+    def _expires_at(self, key: tuple, value, now: float) -> float:
+        if value is _MISSING:
+            return now + self.negative_ttl
+        details = value.get('liveStreamingDetails') or {}
+        # Live or upcoming streams change (end time, viewer state); ended ones don't
+        if details and not details.get('actualEndTime'):
+            return now + self.live_ttl
+        return now + self.ended_ttl
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "fetches": self.fetches,
+            "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else None,
+        }
+
+    def invalidate(self, kind: str, resource_id: str):
+        self._cache.pop((kind, resource_id), None)
+
+    async def get_videos(self, video_ids: Iterable[str], fetch: Fetcher) -> Dict[str, Optional[dict]]:
+        return await self._get_many("video", video_ids, fetch)
+
+    async def _get_many(self, kind: str, ids: Iterable[str], fetch: Fetcher) -> Dict[str, Optional[dict]]:
+        """
+        Return {id: resource or None}. Only IDs that are neither cached nor already
+        being fetched are passed to `fetch`, in a single call.
+        """
+        results: Dict[str, Optional[dict]] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        to_fetch: List[str] = []
+
+        for resource_id in dict.fromkeys(ids):
+            key = (kind, resource_id)
+            value = self._cache.get(key)
+            if value is _MISSING:
+                self.negative_hits += 1
+                results[resource_id] = None
+            elif value is not None:
+                self.hits += 1
+                results[resource_id] = value
+            elif key in self._inflight:
+                self.coalesced += 1
+                waiting[resource_id] = self._inflight[key]
+            else:
+                self.misses += 1
+                to_fetch.append(resource_id)
+
+        if to_fetch:
+            loop = asyncio.get_running_loop()
+            futures = {rid: loop.create_future() for rid in to_fetch}
+            for rid, future in futures.items():
+                self._inflight[(kind, rid)] = future
+            try:
+                self.fetches += 1
+                fetched = await fetch(to_fetch)
+                for rid, future in futures.items():
+                    value = fetched.get(rid)
+                    self._cache[(kind, rid)] = value if value is not None else _MISSING
+                    future.set_result(value)
+                    results[rid] = value
+            except BaseException as e:
+                for future in futures.values():
+                    if future.done():
+                        continue
+                    if isinstance(e, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        future.set_exception(e)
+                        future.exception() # Mark retrieved so unawaited futures don't warn
+                raise
+            finally:
+                for rid in to_fetch:
+                    self._inflight.pop((kind, rid), None)
+
+        for rid, future in waiting.items():
+            results[rid] = await future
+        return results
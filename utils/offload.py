@@ -0,0 +1,50 @@
+# utils/offload.py
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+log = logging.getLogger(__name__)
+
+class ProcessOffload:
+    """
+    Runs CPU-bound transforms (JSON parsing, transcript encoding) in a process pool
+    so they don't stall the gateway. Callers pass whole batches (a page, a payload,
+    a transcript) so each stage costs a single IPC round trip.
+    With workers=0 the transforms run inline on the event loop thread.
+    """
+    def __init__(self, workers: int = 2):
+        self.workers = max(0, workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_config(cls, config) -> 'ProcessOffload':
+        return cls(workers=config.offload_process_workers)
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn avoids forking a process that has a running event loop and helper threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            log.info(f"Started offload process pool with {self.workers} worker(s).")
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a picklable module-level function in the pool and await its result."""
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), partial(fn, *args, **kwargs))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
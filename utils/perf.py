@@ -0,0 +1,256 @@
+# utils/perf.py
+import asyncio
+import functools
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import traceback
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TaskStats:
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.running = False
+        self.last_started: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+# Per-iteration stats for background loops decorated with track_task, by name
+TASK_STATS: Dict[str, TaskStats] = {}
+
+def track_task(name: str):
+    """
+    Record run count, duration and last error of each iteration of a background loop.
+    Goes under @tasks.loop(...):
+
+        @tasks.loop(minutes=5)
+        @track_task("youtube-monitor")
+        async def monitor_loop(self): ...
+    """
+    stats = TASK_STATS.setdefault(name, TaskStats())
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            stats.running = True
+            stats.last_started = time.time()
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                stats.failures += 1
+                stats.last_error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                stats.runs += 1
+                stats.running = False
+                stats.last_duration = time.perf_counter() - started
+        return wrapper
+    return decorator
+
+class LoopLagMonitor:
+    """Measures event-loop lag: how late a short sleep wakes up, sampled continuously."""
+    def __init__(self, interval: float = 0.5, window: int = 1200):
+        self.interval = interval
+        self.samples = deque(maxlen=window) # Lag in seconds, ~10 minutes at the default interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+    def percentiles(self) -> dict:
+        ordered = sorted(self.samples)
+        def pct(p):
+            return ordered[min(len(ordered) - 1, int(len(ordered) * p))] if ordered else None
+        return {"p50": pct(0.5), "p95": pct(0.95), "p99": pct(0.99), "max": ordered[-1] if ordered else None,
+                "samples": len(ordered)}
+
+def rss_mb() -> float:
+    """Current resident set size, falling back to the peak where /proc isn't available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+def top_allocations(limit: int = 10) -> Optional[List[str]]:
+    """Largest allocation sites by size, or None if tracemalloc isn't tracing."""
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    lines = []
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 1024:9.1f} KiB {stat.count:7d} blocks  {frame.filename}:{frame.lineno}")
+    return lines
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread (the event loop's) from a helper thread at a fixed
+    interval, without instrumenting the code being profiled. The result is in folded-stack
+    format ("outer;inner;leaf count" per line), which flamegraph tools read directly.
+    """
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        if stack:
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def run(self, duration: float):
+        """Sample for `duration` seconds. Blocks, so call it from a worker thread."""
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            self._sample()
+            time.sleep(self.interval)
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def top_functions(self, limit: int = 10) -> List[tuple]:
+        """(leaf frame, share of samples) for the frames most often on top of the stack."""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return [(leaf, count / self.samples) for leaf, count in leaves.most_common(limit)] if self.samples else []
+
+async def profile_event_loop(duration: float, interval: float = 0.005) -> SamplingProfiler:
+    """Profile the event loop's thread for `duration` seconds while it keeps running."""
+    profiler = SamplingProfiler(threading.get_ident(), interval)
+    await asyncio.to_thread(profiler.run, duration)
+    return profiler
+
+def _call_site(frames: List[traceback.FrameSummary]) -> str:
+    """The innermost frame in our own code, which is the call to fix even when a library does the blocking."""
+    for frame in reversed(frames):
+        if frame.filename.startswith(PROJECT_ROOT) and "site-packages" not in frame.filename:
+            return f"{os.path.relpath(frame.filename, PROJECT_ROOT)}:{frame.lineno} ({frame.name})"
+    return f"{os.path.basename(frames[-1].filename)}:{frames[-1].lineno} ({frames[-1].name})" if frames else "unknown"
+
+class BlockingSite:
+    def __init__(self, stack: str):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.stack = stack # Stack of the longest stall seen here
+
+class LoopWatchdog:
+    """
+    Finds code that blocks the event loop. A helper thread schedules a heartbeat on the loop
+    every `interval` seconds; when the last one ran more than `threshold` seconds ago the loop
+    is stuck, and the thread captures the loop thread's stack while it still is. When the loop
+    recovers the stall is logged and counted by call site.
+    """
+    def __init__(self, threshold: float = 0.25, interval: float = 0.05):
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = 0
+        self.sites: Dict[str, BlockingSite] = {}
+        self._sites_lock = threading.Lock() # Sites are recorded on the watchdog thread and read by /perf on the loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, asyncio_debug: bool = False):
+        """Start watching the running loop. asyncio_debug also turns on asyncio's own slow-callback warnings."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        if asyncio_debug:
+            # Debug mode has real overhead (e.g. a traceback per created coroutine), meant for staging
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.threshold
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _beat(self):
+        self._last_beat = time.monotonic()
+
+    def _run(self):
+        stall_since: Optional[float] = None
+        stack: Optional[List[traceback.FrameSummary]] = None
+        while not self._stopped.wait(self.interval):
+            try:
+                self._loop.call_soon_threadsafe(self._beat)
+            except RuntimeError:
+                return # Loop closed
+            last_beat = self._last_beat
+            if time.monotonic() - last_beat >= self.threshold:
+                if stall_since is None:
+                    stall_since = last_beat
+                    frame = sys._current_frames().get(self._loop_thread_id)
+                    stack = traceback.extract_stack(frame) if frame is not None else []
+            elif stall_since is not None:
+                self._record(last_beat - stall_since, stack)
+                stall_since = stack = None
+
+    def _record(self, seconds: float, frames: List[traceback.FrameSummary]):
+        site_name = _call_site(frames)
+        stack = "".join(traceback.format_list(frames))
+        with self._sites_lock:
+            self.stalls += 1
+            site = self.sites.get(site_name)
+            new_site = site is None
+            if new_site:
+                site = self.sites[site_name] = BlockingSite(stack)
+            site.count += 1
+            site.total_seconds += seconds
+            if seconds > site.max_seconds:
+                site.max_seconds, site.stack = seconds, stack
+
+        if new_site:
+            log.warning(f"Event loop blocked for {seconds:.2f}s at {site_name}\n{stack.rstrip()}",
+                        extra={"blocked_seconds": round(seconds, 3), "call_site": site_name})
+        else:
+            log.warning(f"Event loop blocked for {seconds:.2f}s at {site_name} ({site.count} times so far)",
+                        extra={"blocked_seconds": round(seconds, 3), "call_site": site_name})
+
+    def top_sites(self, limit: int = 10) -> List[tuple]:
+        """(call site, BlockingSite) for the sites that blocked the loop longest in total."""
+        with self._sites_lock:
+            sites = list(self.sites.items())
+        return sorted(sites, key=lambda item: item[1].total_seconds, reverse=True)[:limit]
@@ -0,0 +1,182 @@
+# utils/quota.py
+import asyncio
+import logging
+import os
+import random
+import threading
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional
+
+import pytz
+
+from utils.resilience import is_quota_error
+
+log = logging.getLogger(__name__)
+
+PACIFIC = pytz.timezone("America/Los_Angeles") # YouTube Data API quotas reset at midnight Pacific time
+
+# Quota cost of the YouTube Data API methods the bot calls
+METHOD_COSTS = {
+    "search.list": 100,
+    "videos.list": 1,
+    "channels.list": 1,
+    "playlistItems.list": 1,
+}
+
+def pacific_today() -> date:
+    return datetime.now(PACIFIC).date()
+
+class QuotaExhaustedError(Exception):
+    """Every YouTube API key has used up today's quota."""
+
+def is_daily_limit_error(error: Exception) -> bool:
+    """quotaExceeded / dailyLimitExceeded: the key is done until midnight Pacific (unlike rateLimitExceeded)."""
+    if not is_quota_error(error):
+        return False
+    text = str(getattr(error, "content", b"") or error).lower()
+    return "quotaexceeded" in text or "dailylimitexceeded" in text
+
+def build_youtube_client(api_key: str):
+    """YouTube Data API client for one key. Imported here, googleapiclient.discovery is slow to import."""
+    from googleapiclient.discovery import build
+    return build("youtube", "v3", developerKey=api_key)
+
+class QuotaLedger:
+    """YouTube Data API units used since the last Pacific midnight, in total and per method."""
+    def __init__(self, daily_limit: int = 10000):
+        self.daily_limit = daily_limit
+        self._day: Optional[date] = None
+        self.used = 0
+        self.by_method: Counter = Counter()
+
+    def _roll_over(self):
+        today = pacific_today()
+        if today != self._day:
+            self._day = today
+            self.used = 0
+            self.by_method.clear()
+
+    def charge(self, method: str, calls: int = 1) -> int:
+        """Record `calls` requests to an API method and return the units they cost."""
+        self._roll_over()
+        units = METHOD_COSTS.get(method, 1) * calls
+        self.used += units
+        self.by_method[method] += units
+        return units
+
+    def remaining(self) -> int:
+        self._roll_over()
+        return max(0, self.daily_limit - self.used)
+
+    def stats(self) -> dict:
+        self._roll_over()
+        return {
+            "day": self._day.isoformat(),
+            "used": self.used,
+            "limit": self.daily_limit,
+            "remaining": self.remaining(),
+            "by_method": dict(self.by_method),
+        }
+
+class PooledKey:
+    def __init__(self, api_key: str, name: str, daily_limit: int):
+        self.api_key = api_key
+        self.name = name # Shown in logs and /perf instead of the key itself
+        self.ledger = QuotaLedger(daily_limit)
+        # googleapiclient's httplib2 transport isn't thread-safe and requests run on worker
+        # threads, so each thread builds its own client on first use
+        self.clients = threading.local()
+        self.exhausted_on: Optional[date] = None # Pacific day Google last answered quotaExceeded
+
+    def available(self) -> int:
+        """Units this key can still spend today, 0 once Google said it's out."""
+        return 0 if self.exhausted_on == pacific_today() else self.ledger.remaining()
+
+class YouTubeKeyPool:
+    """
+    YouTube Data API keys, each with its own daily quota ledger. Every request goes to a key
+    picked at random weighted by its remaining units, so keys drain evenly, and a key that
+    comes back with quotaExceeded is switched out until Pacific midnight. The ledgers only
+    see this process's calls since it started; quotaExceeded catches keys spent elsewhere.
+    """
+    def __init__(self, api_keys: List[str], resilience, daily_limit: int = 10000,
+                 client_factory: Callable[[str], Any] = build_youtube_client):
+        api_keys = list(dict.fromkeys(key for key in api_keys if key))
+        self.keys = [PooledKey(key, f"#{i + 1} …{key[-4:]}", daily_limit) for i, key in enumerate(api_keys)]
+        self.resilience = resilience
+        self.client_factory = client_factory
+        self.switches = 0
+
+    @classmethod
+    def from_config(cls, config, resilience, client_factory: Callable[[str], Any] = build_youtube_client) -> 'YouTubeKeyPool':
+        """Keys from YOUTUBE_API_KEYS (comma-separated) and YOUTUBE_API_KEY."""
+        api_keys = [key.strip() for key in os.getenv("YOUTUBE_API_KEYS", "").split(",")]
+        api_keys.append(os.getenv("YOUTUBE_API_KEY", "").strip())
+        return cls(api_keys, resilience, config.youtube_daily_quota, client_factory)
+
+    def __bool__(self) -> bool:
+        return bool(self.keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def used(self) -> int:
+        return sum(key.ledger.stats()["used"] for key in self.keys)
+
+    def choose(self, units: int = 1) -> PooledKey:
+        """A key with at least `units` left, weighted toward the ones with the most remaining."""
+        candidates = [(key, key.available()) for key in self.keys]
+        candidates = [(key, available) for key, available in candidates if available >= units]
+        if not candidates:
+            raise QuotaExhaustedError(f"All {len(self.keys)} YouTube API key(s) are out of quota until midnight Pacific")
+        keys, weights = zip(*candidates)
+        return random.choices(keys, weights=weights)[0]
+
+    def _client(self, key: PooledKey):
+        client = getattr(key.clients, "client", None)
+        if client is None:
+            client = key.clients.client = self.client_factory(key.api_key)
+        return client
+
+    def _execute(self, key: PooledKey, make_request: Callable[[Any], Any]) -> dict:
+        """Runs on a worker thread, building and executing the request on that thread's client."""
+        return make_request(self._client(key)).execute()
+
+    async def execute(self, method: str, make_request: Callable[[Any], Any]) -> dict:
+        """
+        Build a request with `make_request(client)` for a pool key and execute it on a worker
+        thread, with that thread's own client, through the "youtube.<method>" breaker, moving
+        on to the next key when one is out of quota.
+        Raises QuotaExhaustedError once no key has quota left.
+        """
+        units = METHOD_COSTS.get(method, 1)
+        while True:
+            key = self.choose(units)
+
+            async def attempt(key: PooledKey = key) -> dict:
+                # YouTube bills failed and retried requests too, so every attempt is charged
+                key.ledger.charge(method)
+                return await asyncio.to_thread(self._execute, key, make_request)
+
+            try:
+                response = await self.resilience.call(f"youtube.{method}", attempt)
+            except Exception as e:
+                if not is_daily_limit_error(e):
+                    raise
+                key.exhausted_on = pacific_today()
+                self.switches += 1
+                log.warning(f"YouTube API key {key.name} is out of quota until midnight Pacific "
+                            f"({key.ledger.used} units counted here), switching keys")
+                continue
+            return response
+
+    def stats(self) -> dict:
+        return {
+            "day": pacific_today().isoformat(),
+            "used": self.used,
+            "remaining": sum(key.available() for key in self.keys),
+            "switches": self.switches,
+            "keys": {key.name: {**key.ledger.stats(), "exhausted": key.exhausted_on == pacific_today()} for key in self.keys},
+        }
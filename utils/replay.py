@@ -0,0 +1,392 @@
+# utils/replay.py
+# Record/replay of YouTube API and Discord HTTP exchanges, for running cogs end to end
+# without network access. Recording: set RECORD_EXCHANGES=path.json when running the bot,
+# every YouTube monitor API call and Discord HTTP request is saved with its latency and
+# response when the bot shuts down. Replay: benchmarks/announce_latency.py runs the cogs
+# against fixtures in that format on a virtual clock.
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import selectors
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+import discord
+
+log = logging.getLogger(__name__)
+
+# --- Recording ---
+class ExchangeRecorder:
+    """Collects API exchanges in the fixture format: offset from start, service, method, latency, response."""
+    def __init__(self, path: str):
+        self.path = path
+        self.started = time.time()
+        self.exchanges: List[dict] = []
+
+    @classmethod
+    def from_env(cls) -> Optional['ExchangeRecorder']:
+        path = os.getenv("RECORD_EXCHANGES")
+        return cls(path) if path else None
+
+    def record(self, started: float, service: str, method: str, latency: float, status: int, response: Any, **fields):
+        self.exchanges.append({
+            "at": round(started - self.started, 3),
+            "service": service,
+            "method": method,
+            **fields,
+            "latency": round(latency, 4),
+            "status": status,
+            "response": response,
+        })
+
+    def wrap_google(self, resource, service: str):
+        """Wrap a googleapiclient resource (e.g. the built YouTube client) so every execute() is recorded."""
+        return _RecordingResource(resource, self, service, [])
+
+    def install_discord(self, http: discord.http.HTTPClient):
+        """Record every request made through the bot's Discord HTTP client."""
+        original = http.request
+
+        async def request(route: discord.http.Route, **kwargs):
+            started, status, response = time.time(), 200, None
+            try:
+                response = await original(route, **kwargs)
+                return response
+            except discord.HTTPException as e:
+                status, response = e.status, {"message": e.text, "code": e.code}
+                raise
+            finally:
+                self.record(started, "discord", route.method, time.time() - started, status, response,
+                            path=route.path)
+        http.request = request
+
+    def save(self):
+        # Fill in the scenario, config overrides and events (e.g. when the stream went live) by hand
+        fixture = {"scenario": None, "description": "", "recorded_at": self.started, "config": {}, "events": {},
+                   "exchanges": self.exchanges}
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, indent=2, default=str)
+        log.info(f"Saved {len(self.exchanges)} recorded exchanges to {self.path}")
+
+class _RecordingResource:
+    def __init__(self, resource, recorder: ExchangeRecorder, service: str, path: List[str]):
+        self._resource = resource
+        self._recorder = recorder
+        self._service = service
+        self._path = path
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._resource, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                return _RecordingRequest(result, self._recorder, self._service, ".".join(self._path + [name]), kwargs)
+            return _RecordingResource(result, self._recorder, self._service, self._path + [name])
+        return call
+
+class _RecordingRequest:
+    def __init__(self, request, recorder: ExchangeRecorder, service: str, method: str, params: dict):
+        self._request = request
+        self._recorder = recorder
+        self._service = service
+        self._method = method
+        self._params = params
+
+    def execute(self, *args, **kwargs):
+        started, status, response = time.time(), 200, None
+        try:
+            response = self._request.execute(*args, **kwargs)
+            return response
+        except Exception as e:
+            status = getattr(getattr(e, "resp", None), "status", 0)
+            response = {"error": str(e)}
+            raise
+        finally:
+            self._recorder.record(started, self._service, self._method, time.time() - started, status, response,
+                                  params=self._params)
+
+def load_fixture(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+# --- Virtual clock ---
+class VirtualClock:
+    """
+    Time that only moves when the code under test waits. Sleeps and timeouts complete
+    instantly but advance the clock by their duration, blocking calls advance it by their
+    recorded latency, so a replay of hours of bot activity runs in milliseconds and gives
+    the same timings every run.
+    """
+    def __init__(self, start: float):
+        self.start = start
+        self._elapsed = 0.0 # Kept apart from `start`, an epoch float is too coarse for sub-microsecond timer deadlines
+
+    @property
+    def now(self) -> float:
+        return self.start + self._elapsed
+
+    def time(self) -> float:
+        return self.now
+
+    def elapsed(self) -> float:
+        return self._elapsed
+
+    def advance(self, seconds: float):
+        self._elapsed += max(0.0, seconds)
+
+    def datetime_class(self):
+        """A datetime subclass whose now() reads this clock, to patch into modules that call datetime.now()."""
+        clock = self
+
+        class VirtualDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.fromtimestamp(clock.now, tz)
+        return VirtualDatetime
+
+    @contextlib.contextmanager
+    def patch(self, *modules):
+        """Route time.time(), time.monotonic() and `datetime` in the given modules to this clock."""
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(mock.patch("time.time", self.time))
+            stack.enter_context(mock.patch("time.monotonic", self.elapsed))
+            virtual_datetime = self.datetime_class()
+            for module in modules:
+                stack.enter_context(mock.patch.object(module, "datetime", virtual_datetime))
+            yield
+
+    def run(self, coro, *modules):
+        """Run a coroutine to completion on an event loop driven by this clock."""
+        loop = _VirtualTimeLoop(self)
+        try:
+            with self.patch(*modules):
+                return loop.run_until_complete(coro)
+        finally:
+            loop.close()
+
+class _VirtualSelector(selectors.DefaultSelector):
+    def __init__(self, clock: VirtualClock):
+        super().__init__()
+        self.clock = clock
+        self.loop: Optional['_VirtualTimeLoop'] = None
+
+    def select(self, timeout=None):
+        if timeout is None or (self.loop is not None and self.loop.in_flight):
+            # Work is running in a thread (e.g. SQLite via to_thread) and takes no virtual
+            # time: wait for it for real instead of jumping ahead to the next timer
+            return super().select(timeout if timeout is None else min(timeout, 0.05))
+        ready = super().select(0)
+        if not ready and timeout > 0:
+            self.clock.advance(timeout)
+        return ready
+
+class _VirtualTimeLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock: VirtualClock):
+        selector = _VirtualSelector(clock)
+        super().__init__(selector)
+        selector.loop = self
+        self.clock = clock
+        self.in_flight = 0
+
+    def time(self) -> float:
+        return self.clock.elapsed()
+
+    def run_in_executor(self, executor, func, *args):
+        future = super().run_in_executor(executor, func, *args)
+        self.in_flight += 1
+        future.add_done_callback(self._executor_done)
+        return future
+
+    def _executor_done(self, future):
+        self.in_flight -= 1
+
+# --- Replay ---
+class ReplayLog:
+    """Every replayed call, with the virtual time it was made and finished, for reporting."""
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self.calls: List[dict] = []
+
+    def add(self, service: str, method: str, started: float, **fields):
+        self.calls.append({"service": service, "method": method, "at": started,
+                           "done": self.clock.elapsed(), **fields})
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for call in self.calls:
+            key = f"{call['service']} {call['method']}"
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+class ReplayGoogleService:
+    """
+    Stands in for a googleapiclient service built from recorded exchanges. A call returns
+    the most recent response recorded for the same method at or before the current virtual
+    time (the API's state at that moment) and blocks for its recorded latency, like the
+    real synchronous execute().
+    """
+    def __init__(self, exchanges: List[dict], service: str, clock: VirtualClock, replay_log: ReplayLog):
+        self._exchanges = [e for e in exchanges if e["service"] == service]
+        self._service = service
+        self._clock = clock
+        self._log = replay_log
+
+    def _respond(self, method: str, params: dict):
+        recorded = [e for e in self._exchanges if e["method"] == method]
+        if not recorded:
+            raise LookupError(f"No recorded {self._service} {method} exchange to replay")
+        exchange = recorded[0]
+        for candidate in recorded:
+            if candidate["at"] <= self._clock.elapsed():
+                exchange = candidate
+        started = self._clock.elapsed()
+        self._clock.advance(exchange["latency"])
+        self._log.add(self._service, method, started, params=params)
+        if exchange["status"] >= 400:
+            from googleapiclient.errors import HttpError
+            raise HttpError(SimpleNamespace(status=exchange["status"], reason="Replayed error"),
+                            json.dumps(exchange["response"]).encode())
+        return exchange["response"]
+
+    def __getattr__(self, resource: str):
+        service = self
+
+        class _Resource:
+            def __getattr__(self, name):
+                def method(**params):
+                    return SimpleNamespace(execute=lambda: service._respond(f"{resource}.{name}", params))
+                return method
+        return lambda: _Resource()
+
+class ReplayDiscord:
+    """
+    Recorded Discord HTTP exchanges, matched by method and route template and consumed in
+    order (the last one repeats). Waits the recorded latency without blocking the loop.
+    """
+    def __init__(self, exchanges: List[dict], clock: VirtualClock, replay_log: ReplayLog):
+        self._routes: Dict[tuple, List[dict]] = {}
+        for exchange in exchanges:
+            if exchange["service"] == "discord":
+                self._routes.setdefault((exchange["method"], exchange["path"]), []).append(exchange)
+        self._clock = clock
+        self._log = replay_log
+
+    async def request(self, method: str, path: str, **fields) -> Any:
+        recorded = self._routes.get((method, path))
+        if not recorded:
+            raise LookupError(f"No recorded Discord {method} {path} exchange to replay")
+        exchange = recorded.pop(0) if len(recorded) > 1 else recorded[0]
+        started = self._clock.elapsed()
+        await asyncio.sleep(exchange["latency"])
+        self._log.add("discord", f"{method} {path}", started, **fields)
+        if exchange["status"] >= 400:
+            response = SimpleNamespace(status=exchange["status"], reason="Replayed error")
+            raise discord.HTTPException(response, exchange.get("response") or "")
+        return exchange["response"]
+
+class ReplayTextChannel(discord.TextChannel):
+    """A text channel whose sends go through ReplayDiscord. Passes isinstance checks for TextChannel."""
+    def __init__(self, channel_id: int, guild, discord_replay: ReplayDiscord, name: str = "announcements"):
+        self.id = channel_id
+        self.guild = guild
+        self.name = name
+        self._replay = discord_replay
+
+    def permissions_for(self, obj, /) -> discord.Permissions:
+        return discord.Permissions.all()
+
+    async def send(self, content=None, **kwargs):
+        response = await self._replay.request("POST", "/channels/{channel_id}/messages",
+                                              channel_id=self.id, content=content)
+        return ReplayMessage(int((response or {}).get("id", 0)), self, content)
+
+class ReplayMessage:
+    def __init__(self, message_id: int, channel: ReplayTextChannel, content: Optional[str]):
+        self.id = message_id
+        self.channel = channel
+        self.content = content
+
+    async def edit(self, content=None, **kwargs) -> 'ReplayMessage':
+        await self.channel._replay.request("PATCH", "/channels/{channel_id}/messages/{message_id}",
+                                           channel_id=self.channel.id, message_id=self.id, content=content)
+        self.content = content
+        return self
+
+class ReplayRole:
+    def __init__(self, role_id: int, name: str):
+        self.id = role_id
+        self.name = name
+
+class ReplayMember:
+    def __init__(self, member_id: int, guild, discord_replay: ReplayDiscord):
+        self.id = member_id
+        self.guild = guild
+        self.roles: List[ReplayRole] = []
+        self.guild_permissions = discord.Permissions.none()
+        self._replay = discord_replay
+
+    async def add_roles(self, *roles, reason=None):
+        for role in roles:
+            await self._replay.request("PUT", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}",
+                                       member_id=self.id, role_id=role.id)
+            self.roles.append(role)
+
+    async def remove_roles(self, *roles, reason=None):
+        for role in roles:
+            await self._replay.request("DELETE", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}",
+                                       member_id=self.id, role_id=role.id)
+            self.roles.remove(role)
+
+class ReplayGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.me = SimpleNamespace(id=0)
+        self.roles: Dict[int, ReplayRole] = {}
+        self.members: Dict[int, ReplayMember] = {}
+
+    def get_role(self, role_id: int) -> Optional[ReplayRole]:
+        return self.roles.get(role_id)
+
+    def get_member(self, member_id: int) -> Optional[ReplayMember]:
+        return self.members.get(member_id)
+
+    async def fetch_member(self, member_id: int) -> ReplayMember:
+        return self.members[member_id]
+
+class ReplayInteraction:
+    """The parts of a component interaction the role buttons use."""
+    def __init__(self, client, guild: ReplayGuild, user: ReplayMember):
+        self.client = client
+        self.guild = guild
+        self.user = user
+        self.responses: List[str] = []
+        self.response = SimpleNamespace(send_message=self._send_message)
+
+    async def _send_message(self, content=None, **kwargs):
+        self.responses.append(content)
+
+    async def edit_original_response(self, content=None, **kwargs):
+        self.responses.append(content)
+
+class ReplayBot:
+    """The bot attributes cogs use, backed by replay objects instead of a gateway connection."""
+    def __init__(self, config, **services):
+        self.config = config
+        self.channels: Dict[int, ReplayTextChannel] = {}
+        self.cogs: Dict[str, Any] = {}
+        for name, service in services.items():
+            setattr(self, name, service)
+
+    def get_channel(self, channel_id: int) -> Optional[ReplayTextChannel]:
+        return self.channels.get(channel_id)
+
+    def get_cog(self, name: str):
+        return self.cogs.get(name)
@@ -0,0 +1,263 @@
+# utils/resilience.py
+import asyncio
+import contextlib
+import contextvars
+import inspect
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, Optional
+
+import aiohttp
+import discord
+
+log = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+# Absolute (monotonic) deadline for the work running in this context, inherited by tasks it starts
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+class CircuitOpenError(Exception):
+    """Raised without making the call while an endpoint's breaker is open."""
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"{endpoint} is failing, not retrying for another {retry_in:.0f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The caller's deadline passed (or would pass) before the call could complete."""
+
+@contextlib.contextmanager
+def deadline(seconds: float):
+    """Bound all resilient calls made inside the block (and tasks it starts) to `seconds` from now. Nested deadlines only shrink."""
+    current = _deadline.get()
+    token = _deadline.set(min(current, time.monotonic() + seconds) if current is not None else time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def time_left() -> Optional[float]:
+    """Seconds until the current deadline, None without one."""
+    current = _deadline.get()
+    return None if current is None else current - time.monotonic()
+
+def _status(error: Exception) -> Optional[int]:
+    if isinstance(error, discord.HTTPException):
+        return error.status
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status
+    resp = getattr(error, "resp", None) # googleapiclient.errors.HttpError, not imported to keep discovery lazy
+    return getattr(resp, "status", None) if resp is not None else None
+
+def is_transient(error: Exception) -> bool:
+    """Failures that say the endpoint is unhealthy and may succeed later: 429, 5xx, timeouts, connection errors."""
+    status = _status(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError, ConnectionError, OSError))
+
+def is_quota_error(error: Exception) -> bool:
+    """YouTube's quotaExceeded / rateLimitExceeded, which come back as 403s."""
+    return _status(error) == 403 and "exceeded" in str(getattr(error, "content", b"") or error).lower()
+
+def _is_async(func: Callable[..., Any]) -> bool:
+    """Coroutine functions, including objects with an async __call__."""
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(getattr(func, "__call__", None))
+
+class CircuitBreaker:
+    """
+    Per-endpoint breaker. After `failure_threshold` consecutive failures it opens and calls
+    fail fast for `reset_timeout` seconds, then one trial call is let through (half-open):
+    success closes the breaker, failure opens it again.
+    """
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+
+        self.calls = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.opens = 0
+
+    def check(self):
+        """Raise CircuitOpenError if a call shouldn't be made now."""
+        if self.state == OPEN:
+            retry_in = self.opened_at + self.reset_timeout - time.monotonic()
+            if retry_in > 0:
+                self.short_circuited += 1
+                raise CircuitOpenError(self.name, retry_in)
+            self.state = HALF_OPEN
+            log.info(f"Circuit for {self.name} half-open, letting a trial call through")
+        if self.state == HALF_OPEN:
+            if self._trial_running:
+                self.short_circuited += 1
+                raise CircuitOpenError(self.name, 0)
+            self._trial_running = True
+        self.calls += 1
+
+    def record_success(self):
+        if self.state != CLOSED:
+            log.info(f"Circuit for {self.name} closed again")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._trial_running = False
+
+    def record_failure(self, error: Exception):
+        self.failures += 1
+        self.consecutive_failures += 1
+        self._trial_running = False
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.consecutive_failures >= self.failure_threshold):
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.opens += 1
+            log.warning(f"Circuit for {self.name} opened after {self.consecutive_failures} failures "
+                        f"(last: {error!r}), failing fast for {self.reset_timeout:.0f}s")
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "calls": self.calls,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "short_circuited": self.short_circuited,
+            "opens": self.opens,
+        }
+
+class RetryBudget:
+    """
+    Caps retries across every endpoint to a fraction of successful calls, so retries
+    can't multiply load on an API that is already struggling. Each success deposits
+    `ratio` tokens, each retry costs one, and `min_per_minute` tokens trickle in so
+    quiet periods can still retry.
+    """
+    def __init__(self, ratio: float = 0.2, min_per_minute: float = 10, max_tokens: float = 50):
+        self.ratio = ratio
+        self.min_per_second = min_per_minute / 60
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._refilled = time.monotonic()
+        self.retries = 0
+        self.exhausted = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._refilled) * self.min_per_second)
+        self._refilled = now
+
+    def deposit(self):
+        self._refill()
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        self._refill()
+        if self.tokens < 1:
+            self.exhausted += 1
+            return False
+        self.tokens -= 1
+        self.retries += 1
+        return True
+
+class Resilience:
+    """Shared breakers and retry budget for outbound YouTube, scraping and Discord calls."""
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0, max_attempts: int = 3,
+                 base_delay: float = 0.5, max_delay: float = 10.0, budget: Optional[RetryBudget] = None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def from_config(cls, config) -> 'Resilience':
+        return cls(
+            failure_threshold=config.breaker_failure_threshold,
+            reset_timeout=config.breaker_reset_seconds,
+            max_attempts=config.retry_max_attempts,
+            base_delay=config.retry_base_delay_seconds,
+            max_delay=config.retry_max_delay_seconds,
+            budget=RetryBudget(config.retry_budget_ratio, config.retry_budget_min_per_minute),
+        )
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = self.breakers[endpoint] = CircuitBreaker(endpoint, self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    async def call(self, endpoint: str, func: Callable[..., Any], *args, max_attempts: Optional[int] = None, **kwargs) -> Any:
+        """
+        Call `func(*args, **kwargs)` (sync or async) through the endpoint's breaker. Transient
+        failures are retried with full-jitter backoff while the retry budget and the current
+        deadline allow. Other errors (4xx, Forbidden, quota, ...) are raised straight away
+        and don't count against the breaker, the endpoint itself is healthy. Sync callables
+        (googleapiclient's execute) run in a worker thread so they don't block the loop.
+        Either kind is abandoned at the deadline, though a thread can't be interrupted and
+        finishes in the background.
+        """
+        breaker = self.breaker(endpoint)
+        attempts = max_attempts or self.max_attempts
+        for attempt in range(1, attempts + 1):
+            remaining = time_left()
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceeded(f"Deadline passed before calling {endpoint}")
+            breaker.check()
+            try:
+                if _is_async(func):
+                    call = func(*args, **kwargs)
+                else:
+                    call = asyncio.to_thread(func, *args, **kwargs)
+                if remaining is None:
+                    result = await call
+                else:
+                    try:
+                        result = await asyncio.wait_for(call, remaining)
+                    except asyncio.TimeoutError:
+                        left = time_left()
+                        if left is not None and left <= 0:
+                            # The caller ran out of time, that says nothing about the endpoint
+                            raise DeadlineExceeded(f"Deadline passed while calling {endpoint}") from None
+                        raise # The endpoint's own timeout (aiohttp's), a transient failure
+            except (asyncio.CancelledError, DeadlineExceeded):
+                breaker._trial_running = False
+                raise
+            except Exception as e:
+                if is_quota_error(e):
+                    # The key is out of quota, not the endpoint unhealthy; YouTubeKeyPool switches keys
+                    breaker._trial_running = False
+                    raise
+                if not is_transient(e):
+                    breaker.record_success()
+                    raise
+                breaker.record_failure(e)
+                if attempt == attempts or breaker.state == OPEN:
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                remaining = time_left()
+                if remaining is not None and delay >= remaining:
+                    raise
+                if not self.budget.withdraw():
+                    log.warning(f"Retry budget exhausted, not retrying {endpoint} after {e!r}")
+                    raise
+                log.info(f"{endpoint} failed ({e!r}), retry {attempt}/{attempts - 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            else:
+                breaker.record_success()
+                self.budget.deposit()
+                return result
+
+    def stats(self) -> dict:
+        return {
+            "breakers": {name: breaker.stats() for name, breaker in sorted(self.breakers.items())},
+            "retries": self.budget.retries,
+            "retry_budget_tokens": round(self.budget.tokens, 1),
+            "retry_budget_exhausted": self.budget.exhausted,
+        }
@@ -0,0 +1,158 @@
+# utils/role_queue.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import discord
+
+log = logging.getLogger(__name__)
+
+class PendingToggle:
+    def __init__(self, guild: discord.Guild, member_id: int, role: discord.Role, add: bool,
+                 interaction: Optional[discord.Interaction] = None):
+        self.guild = guild
+        self.member_id = member_id
+        self.role = role
+        self.add = add
+        self.interaction = interaction # Used to report a failure back to the member
+        self.queued_at = time.monotonic()
+
+class RoleToggleQueue:
+    """
+    Per-guild queue of role changes. Button handlers acknowledge immediately and
+    enqueue the change; repeated toggles by the same member for the same role
+    collapse into one entry (last write wins), and each guild's worker applies
+    changes at a fixed rate with retries.
+    """
+    def __init__(self, rate_per_second: float = 5.0, max_attempts: int = 3, member_cache=None):
+        self.member_cache = member_cache # Optional MemberLRU used to resolve members that aren't cached
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self.max_attempts = max_attempts
+        self._pending: Dict[int, "OrderedDict[Tuple[int, int], PendingToggle]"] = {}
+        self._wakeups: Dict[int, asyncio.Event] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+
+        self.applied = 0
+        self.coalesced = 0
+        self.skipped = 0 # Already in the desired state when dequeued
+        self.failed = 0
+
+    @classmethod
+    def from_config(cls, config, member_cache=None) -> 'RoleToggleQueue':
+        return cls(
+            rate_per_second=config.role_toggle_rate_per_second,
+            max_attempts=config.role_toggle_max_attempts,
+            member_cache=member_cache,
+        )
+
+    def pending_count(self, guild_id: Optional[int] = None) -> int:
+        if guild_id is not None:
+            return len(self._pending.get(guild_id, ()))
+        return sum(len(p) for p in self._pending.values())
+
+    def will_have_role(self, member: discord.Member, role: discord.Role) -> bool:
+        """The member's role state once queued changes are applied."""
+        pending = self._pending.get(member.guild.id, {}).get((member.id, role.id))
+        if pending:
+            return pending.add
+        return role in member.roles
+
+    def toggle(self, member: discord.Member, role: discord.Role,
+               interaction: Optional[discord.Interaction] = None) -> bool:
+        """Queue the opposite of the member's (pending) role state. Returns True if the role will be added."""
+        add = not self.will_have_role(member, role)
+        self.submit(member.guild, member.id, role, add, interaction)
+        return add
+
+    def submit(self, guild: discord.Guild, member_id: int, role: discord.Role, add: bool,
+               interaction: Optional[discord.Interaction] = None):
+        queue = self._pending.setdefault(guild.id, OrderedDict())
+        key = (member_id, role.id)
+        if key in queue:
+            # Keep the original queue position, only the final state matters
+            self.coalesced += 1
+            queue[key].add = add
+            queue[key].interaction = interaction or queue[key].interaction
+        else:
+            queue[key] = PendingToggle(guild, member_id, role, add, interaction)
+
+        self._wakeups.setdefault(guild.id, asyncio.Event()).set()
+        worker = self._workers.get(guild.id)
+        if worker is None or worker.done():
+            self._workers[guild.id] = asyncio.create_task(self._worker(guild.id))
+
+    async def close(self):
+        for worker in self._workers.values():
+            worker.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+
+    async def _worker(self, guild_id: int):
+        queue = self._pending[guild_id]
+        wakeup = self._wakeups[guild_id]
+        while True:
+            if not queue:
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+
+            _, toggle = queue.popitem(last=False)
+            started = time.monotonic()
+            try:
+                if await self._apply(toggle):
+                    # Only pace actual API calls, skipped no-ops are free
+                    await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception(f"Unexpected error applying role change in guild {guild_id}: {e}")
+
+    async def _apply(self, toggle: PendingToggle) -> bool:
+        """Apply one change. Returns True if a Discord API call was made."""
+        try:
+            if self.member_cache is not None:
+                member = await self.member_cache.resolve(toggle.guild, toggle.member_id)
+            else:
+                member = toggle.guild.get_member(toggle.member_id) or await toggle.guild.fetch_member(toggle.member_id)
+        except discord.HTTPException as e:
+            log.warning(f"Could not fetch member {toggle.member_id} for role change: {e}")
+            self.failed += 1
+            return True
+
+        if (toggle.role in member.roles) == toggle.add:
+            self.skipped += 1
+            return False
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                if toggle.add:
+                    await member.add_roles(toggle.role, reason="Self-assign role button")
+                else:
+                    await member.remove_roles(toggle.role, reason="Self-assign role button")
+                self.applied += 1
+                if self.member_cache is not None:
+                    # Uncached members don't receive role updates, drop the stale copy
+                    self.member_cache.forget(toggle.guild.id, member.id)
+                return True
+            except discord.Forbidden as e:
+                log.error(f"Missing permissions to change role {toggle.role.id} for member {member.id}: {e}")
+                break
+            except discord.HTTPException as e:
+                if attempt == self.max_attempts:
+                    log.error(f"Giving up on role change for member {member.id} after {attempt} attempts: {e}")
+                    break
+                backoff = 2 ** attempt
+                log.warning(f"Role change for member {member.id} failed ({e}), retrying in {backoff}s")
+                await asyncio.sleep(backoff)
+
+        self.failed += 1
+        if toggle.interaction:
+            try:
+                await toggle.interaction.edit_original_response(
+                    content=f"❌ Couldn't update the {toggle.role.name} role, please try again later."
+                )
+            except discord.HTTPException:
+                pass
+        return True
@@ -0,0 +1,157 @@
+# utils/sharding.py
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import discord
+
+log = logging.getLogger(__name__)
+
+SAMPLE_INTERVAL = 30 # Seconds between per-shard event rate samples
+
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    """The shard Discord routes a guild to."""
+    return (guild_id >> 22) % shard_count
+
+def is_sharded(bot) -> bool:
+    return isinstance(bot, discord.AutoShardedClient)
+
+def owns_guild(bot, guild_id: int) -> bool:
+    """Whether this process runs the shard for a guild (always true unless shards are split across processes)."""
+    if not is_sharded(bot) or bot.shard_ids is None or not bot.shard_count:
+        return True
+    return shard_for_guild(guild_id, bot.shard_count) in bot.shard_ids
+
+def owns_channel(bot, channel_id: Optional[int]) -> bool:
+    """
+    Whether the guild of a configured channel is served by this process. Only guilds on our own
+    shards are cached, so the channel resolves here exactly when we own it. Call after ready.
+    """
+    if not channel_id:
+        return False
+    if not is_sharded(bot) or bot.shard_ids is None:
+        return True
+    return bot.get_channel(channel_id) is not None
+
+class ShardStats:
+    def __init__(self):
+        self.connects = 0
+        self.disconnects = 0
+        self.resumes = 0
+        self.last_connect: Optional[float] = None
+        self.last_disconnect: Optional[float] = None
+        self.samples = deque(maxlen=2 * 60 * 60 // SAMPLE_INTERVAL) # (monotonic time, gateway sequence)
+
+    @property
+    def reconnects(self) -> int:
+        return max(0, self.connects - 1) + self.resumes
+
+class ShardTelemetry:
+    """
+    Per-shard gateway health: latency, event rate and connect/disconnect/resume counts.
+    The event rate comes from each shard's gateway sequence number, which Discord increments
+    for every dispatched event, so nothing is added to the event hot path.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.shards: Dict[int, ShardStats] = {}
+        self._sampler: Optional[asyncio.Task] = None
+
+        for event in ("connect", "disconnect", "resumed"):
+            # Sharded clients add the shard ID, a single connection dispatches the plain events
+            bot.add_listener(getattr(self, f"_on_{event}"), f"on_shard_{event}")
+            bot.add_listener(self._unsharded(getattr(self, f"_on_{event}")), f"on_{event}")
+
+    def _unsharded(self, handler):
+        async def listener():
+            if not is_sharded(self.bot):
+                await handler(0)
+        return listener
+
+    def _stats(self, shard_id: int) -> ShardStats:
+        return self.shards.setdefault(shard_id, ShardStats())
+
+    async def _on_connect(self, shard_id: int):
+        stats = self._stats(shard_id)
+        stats.connects += 1
+        stats.last_connect = time.time()
+        if stats.connects > 1:
+            log.warning(f"Shard {shard_id} reconnected (connect #{stats.connects})")
+
+    async def _on_disconnect(self, shard_id: int):
+        stats = self._stats(shard_id)
+        stats.disconnects += 1
+        stats.last_disconnect = time.time()
+
+    async def _on_resumed(self, shard_id: int):
+        self._stats(shard_id).resumes += 1
+
+    def start(self):
+        if self._sampler is None or self._sampler.done():
+            self._sampler = asyncio.create_task(self._sample_loop())
+
+    def stop(self):
+        if self._sampler:
+            self._sampler.cancel()
+
+    def _sequences(self) -> Dict[int, int]:
+        """Current gateway sequence number per shard."""
+        if is_sharded(self.bot):
+            sequences = {}
+            for shard_id, shard in self.bot.shards.items():
+                # discord.py doesn't expose the shard's websocket publicly
+                ws = getattr(getattr(shard, "_parent", None), "ws", None)
+                if ws is not None and ws.sequence is not None:
+                    sequences[shard_id] = ws.sequence
+            return sequences
+        ws = self.bot.ws
+        return {0: ws.sequence} if ws is not None and ws.sequence is not None else {}
+
+    async def _sample_loop(self):
+        while True:
+            now = time.monotonic()
+            for shard_id, sequence in self._sequences().items():
+                self._stats(shard_id).samples.append((now, sequence))
+            await asyncio.sleep(SAMPLE_INTERVAL)
+
+    @staticmethod
+    def _rate(stats: ShardStats, window: float) -> Optional[float]:
+        """Events per second over roughly the last `window` seconds."""
+        if len(stats.samples) < 2:
+            return None
+        end_time, end_seq = stats.samples[-1]
+        start_time, start_seq = stats.samples[0]
+        for sample_time, sample_seq in reversed(stats.samples):
+            if end_time - sample_time >= window:
+                start_time, start_seq = sample_time, sample_seq
+                break
+        if end_seq < start_seq or end_time <= start_time:
+            return None # New session, the sequence restarted
+        return (end_seq - start_seq) / (end_time - start_time)
+
+    def snapshot(self) -> List[dict]:
+        latencies = dict(self.bot.latencies) if is_sharded(self.bot) else {0: self.bot.latency}
+        guild_counts: Dict[int, int] = {}
+        for guild in self.bot.guilds:
+            guild_counts[guild.shard_id or 0] = guild_counts.get(guild.shard_id or 0, 0) + 1
+
+        rows = []
+        for shard_id in sorted(set(latencies) | set(self.shards)):
+            stats = self._stats(shard_id)
+            latency = latencies.get(shard_id)
+            rate = self._rate(stats, 300)
+            rows.append({
+                "shard_id": shard_id,
+                "latency_ms": latency * 1000 if latency is not None and math.isfinite(latency) else None,
+                "guilds": guild_counts.get(shard_id, 0),
+                "events_per_min": rate * 60 if rate is not None else None,
+                "connects": stats.connects,
+                "disconnects": stats.disconnects,
+                "resumes": stats.resumes,
+                "reconnects": stats.reconnects,
+                "last_disconnect": stats.last_disconnect,
+            })
+        return rows
@@ -0,0 +1,108 @@
+# utils/timer_heap.py
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+class TimerHeap:
+    """
+    Single-task scheduler backed by a min-heap of due times (epoch seconds).
+    However many items are pending, there is one sleeping task that wakes once
+    per due item (or when an earlier item is added). Cancelled or rescheduled
+    items are dropped lazily when they reach the top of the heap.
+    """
+    def __init__(self, callback: Callable[[Hashable, float], Awaitable[Any]], name: str = "timer"):
+        self._callback = callback
+        self.name = name
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._live: Dict[Hashable, int] = {} # item -> sequence number of its current heap entry
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running_callbacks: set = set()
+
+        # Firing jitter (actual - due) in seconds, for metrics
+        self.fired = 0
+        self.jitter = deque(maxlen=500)
+
+    def __len__(self):
+        return len(self._live)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def schedule(self, item: Hashable, due: float):
+        """Schedule (or reschedule) an item to fire at the given epoch time."""
+        seq = next(self._counter)
+        self._live[item] = seq
+        heapq.heappush(self._heap, (due, seq, item))
+        if self._heap[0][1] == seq:
+            self._wakeup.set() # New earliest item, re-arm the sleep
+
+    def cancel(self, item: Hashable):
+        self._live.pop(item, None)
+
+    def next_due(self) -> Optional[float]:
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def stats(self) -> dict:
+        ordered = sorted(self.jitter)
+        def pct(p):
+            return ordered[min(len(ordered) - 1, int(len(ordered) * p))] if ordered else None
+        return {
+            "pending": len(self._live),
+            "fired": self.fired,
+            "jitter_p50_s": pct(0.5),
+            "jitter_p99_s": pct(0.99),
+            "jitter_max_s": ordered[-1] if ordered else None,
+        }
+
+    def _discard_stale(self):
+        while self._heap and self._live.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+
+    async def _run(self):
+        while True:
+            self._discard_stale()
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            due, seq, item = self._heap[0]
+            delay = due - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue # Either due now or the heap changed, re-check the top
+
+            heapq.heappop(self._heap)
+            del self._live[item]
+            self.fired += 1
+            self.jitter.append(max(0.0, time.time() - due))
+
+            # Callbacks run as tasks so one slow send doesn't delay the next timer
+            task = asyncio.create_task(self._fire(item, due))
+            self._running_callbacks.add(task)
+            task.add_done_callback(self._running_callbacks.discard)
+
+    async def _fire(self, item: Hashable, due: float):
+        try:
+            await self._callback(item, due)
+        except Exception as e:
+            log.exception(f"{self.name}: callback for {item!r} failed: {e}")
@@ -0,0 +1,323 @@
+# utils/transcript_formats.py
+import bisect
+import csv
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Optional, Type
+
+import pytz
+
+from utils.chat_parsing import ChatMessage, parse_chat_payload
+
+# --- Columnar binary layout (all little-endian, every section 8-byte aligned) ---
+# header | timestamps int64[count] (usec since epoch) | author ids uint32[count]
+# | message offsets uint64[count + 1] | message blob (utf-8)
+# | author offsets uint64[authors + 1] | author blob (utf-8) | metadata JSON
+COLUMNAR_MAGIC = b"LSCT"
+COLUMNAR_VERSION = 1
+COLUMNAR_HEADER = struct.Struct("<4sHHQQ7Q")
+
+class TranscriptEncoder:
+    """
+    Base class for transcript encoders. Encoders consume the message iterable once,
+    writing as they go, so the full transcript is never held in memory.
+    """
+    name = ""
+    extension = ""
+    binary = False
+    appendable = True # Line-based encoders can be written in chunks: the header once, then messages appended
+
+    def __init__(self, video_id: str, stream_details: dict):
+        self.video_id = video_id
+        self.stream_details = stream_details
+        self.generated = datetime.now()
+
+    def metadata(self) -> dict:
+        return {
+            "title": self.stream_details.get('title'),
+            "video_id": self.video_id,
+            "start_time": self.stream_details.get('start_time'),
+            "end_time": self.stream_details.get('end_time'),
+            "generated": self.generated.isoformat(timespec='seconds'),
+        }
+
+    def write(self, f, messages: Iterable) -> int:
+        """Write the header and messages to the open file. Returns the number of messages written."""
+        self.write_header(f)
+        return self.write_messages(f, messages)
+
+    def write_header(self, f):
+        pass
+
+    def write_messages(self, f, messages: Iterable) -> int:
+        raise NotImplementedError
+
+class TextEncoder(TranscriptEncoder):
+    name = "text"
+    extension = "txt"
+
+    def write_header(self, f):
+        f.write(f"YouTube Livestream Chat Transcript\n")
+        f.write(f"Stream Title: {self.stream_details['title']}\n")
+        f.write(f"Video ID: {self.video_id}\n")
+        f.write(f"Stream Start: {self.stream_details.get('start_time', 'Unknown')}\n")
+        f.write(f"Stream End: {self.stream_details.get('end_time', 'Unknown')}\n")
+        f.write(f"Generated: {self.generated.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write("-" * 80 + "\n\n")
+
+    def write_messages(self, f, messages: Iterable) -> int:
+        count = 0
+        for msg in messages:
+            f.write(f"{str(msg)}\n")
+            count += 1
+        return count
+
+class JSONLEncoder(TranscriptEncoder):
+    name = "jsonl"
+    extension = "jsonl"
+
+    def write_header(self, f):
+        # First line carries the stream metadata, every following line is one message
+        f.write(json.dumps({"type": "metadata", **self.metadata()}, ensure_ascii=False) + "\n")
+
+    def write_messages(self, f, messages: Iterable) -> int:
+        count = 0
+        for msg in messages:
+            f.write(json.dumps({
+                "type": "message",
+                "timestamp": msg.timestamp.isoformat(),
+                "author": msg.author,
+                "message": msg.message,
+            }, ensure_ascii=False) + "\n")
+            count += 1
+        return count
+
+class CSVEncoder(TranscriptEncoder):
+    name = "csv"
+    extension = "csv"
+
+    def write_header(self, f):
+        csv.writer(f).writerow(["timestamp", "author", "message"])
+
+    def write_messages(self, f, messages: Iterable) -> int:
+        writer = csv.writer(f)
+        count = 0
+        for msg in messages:
+            writer.writerow([msg.timestamp.isoformat(), msg.author, msg.message])
+            count += 1
+        return count
+
+def _pad(f, position: int) -> int:
+    """Pad the file to the next 8-byte boundary. Returns the new position."""
+    padding = -position % 8
+    if padding:
+        f.write(b"\0" * padding)
+    return position + padding
+
+class ColumnarEncoder(TranscriptEncoder):
+    """
+    Compact columnar binary format that can be memory-mapped and read zero-copy
+    with `ColumnarTranscript`. Columns are spilled to temporary files while
+    streaming because the header needs the final row count.
+    """
+    name = "columnar"
+    extension = "lsct"
+    binary = True
+    appendable = False # Header needs the final row count
+
+    def write(self, f, messages: Iterable) -> int:
+        authors: Dict[str, int] = {}
+        count = 0
+        blob_size = 0
+        with tempfile.TemporaryFile() as ts_col, \
+             tempfile.TemporaryFile() as author_col, \
+             tempfile.TemporaryFile() as offset_col, \
+             tempfile.TemporaryFile() as blob_col:
+            offset_col.write(struct.pack("<Q", 0))
+            for msg in messages:
+                ts_col.write(struct.pack("<q", int(msg.timestamp.timestamp() * 1_000_000)))
+                author_col.write(struct.pack("<I", authors.setdefault(msg.author, len(authors))))
+                encoded = msg.message.encode('utf-8')
+                blob_col.write(encoded)
+                blob_size += len(encoded)
+                offset_col.write(struct.pack("<Q", blob_size))
+                count += 1
+
+            author_offsets = array("Q", [0])
+            author_blob = bytearray()
+            for author in authors: # dicts keep insertion order, which matches the ids
+                author_blob += author.encode('utf-8')
+                author_offsets.append(len(author_blob))
+            if author_offsets.itemsize != 8:
+                raise RuntimeError("Platform array('Q') is not 64-bit")
+
+            meta = json.dumps(self.metadata(), ensure_ascii=False).encode('utf-8')
+
+            # Compute section offsets up front so the header is written once
+            sections = []
+            position = COLUMNAR_HEADER.size
+            for size in (count * 8, count * 4, (count + 1) * 8, blob_size,
+                         len(author_offsets) * 8, len(author_blob), len(meta)):
+                position += -position % 8
+                sections.append(position)
+                position += size
+
+            f.write(COLUMNAR_HEADER.pack(
+                COLUMNAR_MAGIC, COLUMNAR_VERSION, 0, count, len(authors), *sections
+            ))
+            position = COLUMNAR_HEADER.size
+            for col in (ts_col, author_col, offset_col, blob_col):
+                position = _pad(f, position)
+                col.seek(0)
+                shutil.copyfileobj(col, f)
+                position += col.tell()
+            for data in (author_offsets.tobytes(), bytes(author_blob), meta):
+                position = _pad(f, position)
+                f.write(data)
+                position += len(data)
+        return count
+
+class ColumnarTranscript:
+    """
+    Zero-copy reader for the columnar transcript format. Messages are decoded one at a
+    time (iter_messages) and searched in place in the mapping (find), so reading a
+    transcript back never builds the full message list.
+    """
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        if os.fstat(self._file.fileno()).st_size < COLUMNAR_HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path} is too short to be a columnar transcript")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        # Unpacked straight from the mapping, so no view is exported yet if the header is wrong
+        (magic, version, _, self.count, author_count,
+         ts_off, author_idx_off, msg_off_off, blob_off,
+         author_off_off, author_blob_off, meta_off) = COLUMNAR_HEADER.unpack_from(self._mmap)
+        if magic != COLUMNAR_MAGIC or version != COLUMNAR_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a columnar transcript (version {COLUMNAR_VERSION})")
+
+        buf = memoryview(self._mmap)
+        self.timestamps_usec = buf[ts_off:ts_off + self.count * 8].cast('q')
+        self.author_ids = buf[author_idx_off:author_idx_off + self.count * 4].cast('I')
+        self._msg_offsets = buf[msg_off_off:msg_off_off + (self.count + 1) * 8].cast('Q')
+        self._blob_off = blob_off
+        self._blob = buf[blob_off:blob_off + self._msg_offsets[-1]]
+        self._author_offsets = buf[author_off_off:author_off_off + (author_count + 1) * 8].cast('Q')
+        self._author_blob = buf[author_blob_off:author_blob_off + self._author_offsets[-1]]
+        self.metadata = json.loads(bytes(buf[meta_off:]))
+        buf.release()
+
+    def message_bytes(self, i: int) -> memoryview:
+        return self._blob[self._msg_offsets[i]:self._msg_offsets[i + 1]]
+
+    def message(self, i: int) -> str:
+        return str(self.message_bytes(i), 'utf-8')
+
+    def author(self, i: int) -> str:
+        a = self.author_ids[i]
+        return str(self._author_blob[self._author_offsets[a]:self._author_offsets[a + 1]], 'utf-8')
+
+    def timestamp(self, i: int) -> datetime:
+        return datetime.fromtimestamp(self.timestamps_usec[i] / 1_000_000, pytz.UTC)
+
+    def iter_messages(self, indices: Optional[Iterable[int]] = None) -> Iterator[ChatMessage]:
+        """Decode messages lazily, e.g. to feed write_transcript_file or ChatIndex.ingest."""
+        for i in (range(self.count) if indices is None else indices):
+            yield ChatMessage(self.timestamp(i), self.author(i), self.message(i))
+
+    def find(self, term: str) -> Iterator[int]:
+        """Indices of messages containing `term` (case-sensitive), searched in the mapping without decoding."""
+        needle = term.encode('utf-8')
+        if not needle or not self.count:
+            return
+        start = self._blob_off
+        end = start + self._msg_offsets[-1]
+        position = self._mmap.find(needle, start, end)
+        while position != -1:
+            i = bisect.bisect_right(self._msg_offsets, position - start) - 1
+            message_end = start + self._msg_offsets[i + 1]
+            if position + len(needle) <= message_end:
+                yield i
+                position = self._mmap.find(needle, message_end, end)
+            else: # Match straddles two messages
+                position = self._mmap.find(needle, position + 1, end)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        # Views must be released before the mmap can be closed
+        for name in ('timestamps_usec', 'author_ids', '_msg_offsets', '_blob', '_author_offsets', '_author_blob'):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+ENCODERS: Dict[str, Type[TranscriptEncoder]] = {
+    encoder.name: encoder for encoder in (TextEncoder, JSONLEncoder, CSVEncoder, ColumnarEncoder)
+}
+
+def get_encoder(name: str) -> Type[TranscriptEncoder]:
+    try:
+        return ENCODERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown transcript format '{name}'. Available: {', '.join(ENCODERS)}")
+
+def write_transcript_file(filename: str, fmt: str, video_id: str, stream_details: dict,
+                          messages: Iterable, header: bool = True, append: bool = False) -> int:
+    """
+    Encode messages to a file. Module-level so it can run in the offload process pool.
+    Appendable formats can be built from several calls: the first writes the header,
+    later ones pass header=False, append=True.
+    """
+    encoder = get_encoder(fmt)(video_id, stream_details)
+    if append and not encoder.appendable:
+        raise ValueError(f"Transcript format '{fmt}' can't be written in chunks")
+    if encoder.binary:
+        f = open(filename, 'ab' if append else 'wb')
+    else:
+        f = open(filename, 'a' if append else 'w', encoding='utf-8', newline='')
+    with f:
+        if not encoder.appendable:
+            return encoder.write(f, messages)
+        if header:
+            encoder.write_header(f)
+        return encoder.write_messages(f, messages)
+
+class TranscriptSummary:
+    """What write_chat_payload hands back from the offload pool: where the file is and what's in it, never the messages."""
+    def __init__(self, path: str, count: int, first: Optional[datetime] = None, last: Optional[datetime] = None):
+        self.path = path
+        self.count = count
+        self.first = first # Timestamp of the earliest message
+        self.last = last
+
+def write_chat_payload(payload: str, filename: str, fmt: str, video_id: str, stream_details: dict) -> TranscriptSummary:
+    """
+    Parse a get_transcript response and encode it straight to a file, so the parsed
+    messages never cross back over IPC. Module-level so it can run in the offload pool.
+    """
+    messages = parse_chat_payload(payload)
+    count = write_transcript_file(filename, fmt, video_id, stream_details, messages)
+    if not messages:
+        return TranscriptSummary(filename, 0)
+    return TranscriptSummary(filename, count, messages[0].timestamp, messages[-1].timestamp)
+
+def convert_transcript_file(source: str, filename: str, fmt: str, video_id: str, stream_details: dict) -> int:
+    """Re-encode a columnar transcript into another format, decoding one message at a time. Module-level for the offload pool."""
+    with ColumnarTranscript(source) as transcript:
+        return write_transcript_file(filename, fmt, video_id, stream_details, transcript.iter_messages())
@@ -0,0 +1,198 @@
+# utils/transcript_jobs.py
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import discord
+
+log = logging.getLogger(__name__)
+
+PROGRESS_EDIT_INTERVAL = 2.0 # Seconds between non-final progress edits, to stay clear of rate limits
+
+class JobWaiter:
+    """A requester waiting on a transcript job, plus the followup message used for progress."""
+    def __init__(self, interaction: discord.Interaction, message: Optional[discord.WebhookMessage], fmt: str):
+        self.interaction = interaction
+        self.message = message
+        self.fmt = fmt
+        self.user_id = interaction.user.id
+
+class TranscriptJob:
+    def __init__(self, video_id: str, stream_details: dict):
+        self.video_id = video_id
+        self.stream_details = stream_details
+        self.waiters: List[JobWaiter] = []
+        self.state = "queued" # queued -> running -> done/failed/cancelled
+        self.status = "Queued"
+        self.created_at = time.monotonic()
+        self.task: Optional[asyncio.Task] = None
+        self.accepting = True # False once every waiter has been served, later requests start a new job
+        self._last_edit = 0.0
+
+    async def deliver(self, send_format: Callable[[str, List[JobWaiter]], Awaitable[None]]):
+        """
+        Call send_format(fmt, waiters) once per requested format. Waiters that join while
+        earlier formats are being sent (possibly asking for another format) are served in
+        a further pass, and the job stops accepting waiters once nobody is left unserved.
+        """
+        served = set()
+        while True:
+            pending = [w for w in self.waiters if id(w) not in served]
+            if not pending:
+                # No await between the last check and closing, so nobody can slip in unserved
+                self.accepting = False
+                return
+            for fmt in dict.fromkeys(w.fmt for w in pending):
+                group = [w for w in pending if w.fmt == fmt]
+                served.update(id(w) for w in group)
+                await send_format(fmt, group)
+
+    async def update(self, status: str, force: bool = False):
+        """Edit every waiter's followup message with the new status (throttled unless forced)."""
+        self.status = status
+        now = time.monotonic()
+        if not force and now - self._last_edit < PROGRESS_EDIT_INTERVAL:
+            return
+        self._last_edit = now
+        await asyncio.gather(*(self._edit(w, status) for w in self.waiters))
+
+    async def _edit(self, waiter: JobWaiter, status: str):
+        if not waiter.message:
+            return
+        try:
+            await waiter.message.edit(content=status)
+        except discord.HTTPException as e:
+            log.debug(f"Could not update progress message for job {self.video_id}: {e}")
+
+class TranscriptJobQueue:
+    """
+    Bounded worker pool for transcript generation. Concurrent requests for the
+    same video share a single job (single-flight), and every waiter gets the result.
+    """
+    def __init__(self, runner: Callable[[TranscriptJob], Awaitable[None]], workers: int = 2, max_pending: int = 20):
+        self._runner = runner
+        self._worker_count = max(1, workers)
+        self._max_pending = max_pending
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._jobs: Dict[str, TranscriptJob] = {} # video_id -> queued or running job
+        self._pending: List[TranscriptJob] = [] # Queued jobs in order, used for positions
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self._worker_count)]
+        log.info(f"Transcript job queue started with {self._worker_count} worker(s).")
+
+    async def stop(self):
+        for job in list(self._jobs.values()):
+            job.state = "cancelled"
+            if job.task:
+                job.task.cancel()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._jobs.clear()
+        self._pending.clear()
+
+    def get(self, video_id: str) -> Optional[TranscriptJob]:
+        return self._jobs.get(video_id)
+
+    def position(self, job: TranscriptJob) -> int:
+        """1-based queue position, or 0 if the job is already running."""
+        try:
+            return self._pending.index(job) + 1
+        except ValueError:
+            return 0
+
+    def describe(self, job: TranscriptJob) -> str:
+        position = self.position(job)
+        if position:
+            return f"⏳ Transcript queued — position {position} of {len(self._pending)}."
+        return f"📝 {job.status}"
+
+    async def submit(self, video_id: str, stream_details: dict, waiter: JobWaiter) -> Tuple[TranscriptJob, bool]:
+        """
+        Attach the waiter to the existing job for this video, or queue a new one.
+        Returns (job, created). Raises asyncio.QueueFull when too many jobs are pending.
+        """
+        job = self._jobs.get(video_id)
+        if job and job.accepting:
+            job.waiters.append(waiter)
+            return job, False
+
+        if len(self._pending) >= self._max_pending:
+            raise asyncio.QueueFull()
+
+        job = TranscriptJob(video_id, stream_details)
+        job.waiters.append(waiter)
+        self._jobs[video_id] = job
+        self._pending.append(job)
+        self._queue.put_nowait(job)
+        return job, True
+
+    async def cancel(self, video_id: str, user_id: int) -> bool:
+        """
+        Remove the user from the job's waiters. The job itself is cancelled once
+        nobody is waiting on it. Returns False if the user wasn't waiting.
+        """
+        job = self._jobs.get(video_id)
+        if not job:
+            return False
+        remaining = [w for w in job.waiters if w.user_id != user_id]
+        if len(remaining) == len(job.waiters):
+            return False
+        job.waiters = remaining
+
+        if not remaining:
+            job.state = "cancelled"
+            self._forget(job)
+            if job.task:
+                job.task.cancel()
+            await self._refresh_positions()
+        return True
+
+    def _forget(self, job: TranscriptJob):
+        if self._jobs.get(job.video_id) is job:
+            del self._jobs[job.video_id]
+        if job in self._pending:
+            self._pending.remove(job)
+
+    async def _refresh_positions(self):
+        await asyncio.gather(*(job.update(self.describe(job), force=True) for job in self._pending))
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job: TranscriptJob = await self._queue.get()
+            try:
+                if job.state == "cancelled":
+                    continue
+                if job in self._pending:
+                    self._pending.remove(job)
+                job.state = "running"
+                await self._refresh_positions()
+
+                job.task = asyncio.create_task(self._runner(job))
+                await asyncio.wait({job.task})
+                job.accepting = False # Whatever the outcome, later requests start a fresh job
+                if job.task.cancelled():
+                    log.info(f"Transcript job for {job.video_id} was cancelled.")
+                elif job.task.exception():
+                    job.state = "failed"
+                    log.error(f"Transcript job for {job.video_id} failed: {job.task.exception()!r}")
+                    await job.update(
+                        "❌ An error occurred while generating the transcript. "
+                        "Please try again later or contact the bot owner.",
+                        force=True
+                    )
+                elif job.state == "running":
+                    job.state = "done"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception(f"Transcript worker {worker_id} error: {e}")
+            finally:
+                self._forget(job)
+                self._queue.task_done()